@@ -0,0 +1 @@
+"""End-to-end benchmarks of the orchestration graphs against a scripted model and local MCP servers."""
@@ -0,0 +1,95 @@
+"""A scripted chat model, so the benchmarks measure the graphs rather than an LLM provider."""
+
+import asyncio
+import time
+import uuid
+from typing import Any, Callable, Optional, Sequence
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from langgraph_mcp.planner_style.graph import TASK_COMPLETE_TAG
+from langgraph_mcp.utils import get_message_text, register_chat_model_provider
+from langgraph_mcp.with_planner.graph import TASK_COMPLETE_TAG as ORCHESTRATE_TASK_COMPLETE_TAG
+
+# Name of the MCP server (expert) the scripted plans assign their task to
+EXPERT = "stub"
+
+# A script turns the prompt and the bound tools (`bind_tools` dicts) into the response
+Script = Callable[[list[BaseMessage], list[dict[str, Any]]], AIMessage]
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model that answers with a script after a fixed `latency` (seconds)."""
+
+    script: Script
+    model: str = "scripted"
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Sequence[Any], *, tool_choice: Optional[Any] = None, **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _generate(self, messages: list[BaseMessage], stop: Optional[list[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self.script(messages, kwargs.get("tools") or []))])
+
+    async def _agenerate(self, messages: list[BaseMessage], stop: Optional[list[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self.script(messages, kwargs.get("tools") or []))])
+
+
+def _call(name: str, args: dict[str, Any]) -> AIMessage:
+    return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": f"call_{uuid.uuid4().hex[:12]}"}])
+
+
+def _request(messages: list[BaseMessage]) -> str:
+    return next((get_message_text(m) for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+
+
+def plan(messages: list[BaseMessage], tools: list[dict[str, Any]]) -> AIMessage:
+    """Structured output (the schema is the only bound tool): one task for the stub expert."""
+    return _call(tools[0]["function"]["name"], {
+        "decision": "replace",
+        "plan": [{"expert": EXPERT, "task": "Echo the user's request"}],
+        "next_task": 0,
+    })
+
+
+def execute(tag: str) -> Script:
+    """Call `echo` with the user's request, then report the task complete with `tag`."""
+    def script(messages: list[BaseMessage], tools: list[dict[str, Any]]) -> AIMessage:
+        if isinstance(messages[-1], ToolMessage):
+            return AIMessage(content=f"{tag} {get_message_text(messages[-1])}")
+        names = [tool["function"]["name"] for tool in tools]
+        return _call("echo" if "echo" in names else names[0], {"text": _request(messages)})
+    return script
+
+
+def assess(messages: list[BaseMessage], tools: list[dict[str, Any]]) -> AIMessage:
+    return _call(tools[0]["function"]["name"], {"is_completed": True, "explanation": "echoed", "confidence": 1.0})
+
+
+def respond(messages: list[BaseMessage], tools: list[dict[str, Any]]) -> AIMessage:
+    return AIMessage(content=f"Done: {_request(messages)}")
+
+
+SCRIPTS: dict[str, Script] = {
+    "planner": plan,
+    "executor": execute(TASK_COMPLETE_TAG),
+    "orchestrator": execute(ORCHESTRATE_TASK_COMPLETE_TAG),
+    "assessor": assess,
+    "responder": respond,
+}
+
+
+def register(latency: float = 0.0, provider: str = "fake") -> None:
+    """Make `<provider>/<script>` model names (e.g. `fake/planner`) load scripted models."""
+    register_chat_model_provider(
+        provider, lambda model, **kwargs: ScriptedChatModel(script=SCRIPTS[model], model=model, latency=latency)
+    )
@@ -0,0 +1,234 @@
+"""Drive many concurrent conversations through a graph and watch latency and resources.
+
+Usage: python -m benchmarks.load [--graph NAME] [--threads N] [--turns N] [--transport T] [gates...]
+
+Every thread is a conversation of `--turns` turns run against the compiled graph in-process,
+with scripted models and the stub MCP server. While the threads run, open file descriptors,
+child processes and RSS are sampled every `--sample-interval` seconds.
+
+With gates (`--max-p95-ms`, `--min-throughput`, `--max-children`, `--baseline`, ...), the
+run fails (exit code 1) when a gate is missed, so it can guard against regressions in CI.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks import fake_chat_model
+from benchmarks.run import GRAPHS, stub_server, summarize
+from langgraph_mcp.mcp_wrapper import get_session_pool
+
+
+def open_fds() -> Optional[int]:
+    for path in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(path))
+        except OSError:
+            continue
+    return None
+
+
+def child_processes() -> Optional[int]:
+    """Number of direct children of this process (e.g. stdio MCP servers); None where /proc is missing."""
+    if not os.path.isdir("/proc"):
+        return None
+    pid, count = str(os.getpid()), 0
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # the command name may contain spaces, so split after its closing parenthesis: state, ppid, ...
+        if stat.rsplit(")", 1)[-1].split()[1] == pid:
+            count += 1
+    return count
+
+
+def rss_mb() -> float:
+    """Resident set size; peak RSS where /proc is missing."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def sample(started: float, in_flight: int) -> dict[str, Any]:
+    return {
+        "t": round(time.perf_counter() - started, 3),
+        "in_flight": in_flight,
+        "fds": open_fds(),
+        "children": child_processes(),
+        "rss_mb": round(rss_mb(), 1),
+    }
+
+
+class LoadRun:
+    """Runs the conversations and collects turn latencies, errors and resource samples."""
+
+    def __init__(self, graph_name: str, server_config: dict, configurable: dict[str, Any]):
+        self.graph, models = GRAPHS[graph_name]
+        self.configurable = {"mcp_server_config": {fake_chat_model.EXPERT: server_config}, **models, **configurable}
+        self.latencies: list[float] = []
+        self.errors: dict[str, int] = {}
+        self.samples: list[dict[str, Any]] = []
+        self.in_flight = 0
+
+    async def conversation(self, thread: int, turns: int, delay: float) -> None:
+        await asyncio.sleep(delay)
+        config = {"configurable": {**self.configurable, "thread_id": f"load-{thread}"}}
+        messages: list = []
+        for turn in range(turns):
+            messages = messages + [HumanMessage(content=f"echo thread {thread} turn {turn}")]
+            self.in_flight += 1
+            started = time.perf_counter()
+            try:
+                result = await self.graph.ainvoke({"messages": messages}, config)
+                messages = result["messages"]
+                self.latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                self.errors[type(e).__name__] = self.errors.get(type(e).__name__, 0) + 1
+            finally:
+                self.in_flight -= 1
+
+    async def sampler(self, started: float, interval: float) -> None:
+        while True:
+            self.samples.append(sample(started, self.in_flight))
+            await asyncio.sleep(interval)
+
+    async def run(self, threads: int, turns: int, ramp_up: float, interval: float) -> dict[str, Any]:
+        before = sample(time.perf_counter(), 0)
+        started = time.perf_counter()
+        sampler = asyncio.create_task(self.sampler(started, interval))
+        await asyncio.gather(*(
+            self.conversation(thread, turns, ramp_up * thread / threads) for thread in range(threads)
+        ))
+        elapsed = time.perf_counter() - started
+        sampler.cancel()
+        self.samples.append(sample(started, 0))
+        pool_stats = vars(get_session_pool().stats).copy()
+        await get_session_pool().close()
+        after = sample(started, 0)
+        total = len(self.latencies) + sum(self.errors.values())
+
+        def peak(key: str) -> Any:
+            values = [s[key] for s in self.samples if s[key] is not None]
+            return max(values) if values else None
+
+        return {
+            "threads": threads,
+            "turns": total,
+            "errors": self.errors,
+            "error_rate": sum(self.errors.values()) / total if total else 0.0,
+            "elapsed_s": elapsed,
+            "throughput": len(self.latencies) / elapsed if elapsed else 0.0,
+            "latency": summarize(self.latencies),
+            "peak": {key: peak(key) for key in ("fds", "children", "rss_mb")},
+            "before": before,
+            "after_close": after,
+            "pool": pool_stats,
+            "samples": self.samples,
+        }
+
+
+def gate(result: dict[str, Any], args: argparse.Namespace) -> list[str]:
+    """The gates the run missed."""
+    failures = []
+    latency, peak = result["latency"], result["peak"]
+
+    def check(name: str, value: Optional[float], limit: Optional[float], higher_is_worse: bool = True) -> None:
+        if limit is None or value is None:
+            return
+        if (value > limit) if higher_is_worse else (value < limit):
+            failures.append(f"{name} {value:.2f} {'>' if higher_is_worse else '<'} {limit:.2f}")
+
+    check("p95 ms", latency.get("p95_ms"), args.max_p95_ms)
+    check("p99 ms", latency.get("p99_ms"), args.max_p99_ms)
+    check("throughput", result["throughput"], args.min_throughput, higher_is_worse=False)
+    check("error rate", result["error_rate"], args.max_error_rate)
+    check("peak fds", peak["fds"], args.max_fds)
+    if peak["children"] is not None:
+        # the streamable_http stub server is a child from the start
+        check("peak children spawned", peak["children"] - (result["before"]["children"] or 0), args.max_children)
+    check("peak rss mb", peak["rss_mb"], args.max_rss_mb)
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        check("p95 ms vs baseline", latency.get("p95_ms"), baseline["latency"]["p95_ms"] * (1 + args.tolerance))
+        check("throughput vs baseline", result["throughput"], baseline["throughput"] * (1 - args.tolerance), higher_is_worse=False)
+    return failures
+
+
+def report(result: dict[str, Any]) -> str:
+    latency, peak = result["latency"], result["peak"]
+    lines = [
+        f"threads: {result['threads']}   turns: {result['turns']}   errors: {result['errors'] or 0}",
+        f"throughput: {result['throughput']:.1f} turns/sec over {result['elapsed_s']:.1f} s",
+    ]
+    if latency.get("n"):
+        lines.append(
+            f"turn latency ms: p50 {latency['p50_ms']:.1f}   p95 {latency['p95_ms']:.1f}"
+            f"   p99 {latency['p99_ms']:.1f}   max {latency['max_ms']:.1f}"
+        )
+    lines.append(f"peak: fds {peak['fds']}   children {peak['children']}   rss {peak['rss_mb']} MB")
+    lines.append(f"before: {result['before']}")
+    lines.append(f"after pool close: {result['after_close']}")
+    lines.append(f"pool: {result['pool']}")
+    lines.append(f"  {'t':>8} {'in flight':>10} {'fds':>6} {'children':>9} {'rss MB':>8}")
+    samples = result["samples"]
+    step = max(1, len(samples) // 20)  # at most ~20 rows
+    for s in samples[::step]:
+        lines.append(f"  {s['t']:>8.2f} {s['in_flight']:>10} {s['fds']!s:>6} {s['children']!s:>9} {s['rss_mb']:>8}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--graph", choices=list(GRAPHS), default="planner_style_agent")
+    parser.add_argument("--transport", choices=["stdio", "streamable_http"], default="stdio")
+    parser.add_argument("--threads", type=int, default=50, help="concurrent conversations")
+    parser.add_argument("--turns", type=int, default=3, help="turns per conversation")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="seconds over which the threads start")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds every scripted model call takes")
+    parser.add_argument("--sample-interval", type=float, default=0.5, help="seconds between resource samples")
+    parser.add_argument("--configurable", type=json.loads, default={}, help='extra configuration, e.g. \'{"parallel_tasks": true}\'')
+    parser.add_argument("--port", type=int, default=8765, help="port of the streamable_http stub server")
+    parser.add_argument("--json", help="also write the results to this file (usable as a --baseline)")
+    gates = parser.add_argument_group("regression gates")
+    gates.add_argument("--max-p95-ms", type=float)
+    gates.add_argument("--max-p99-ms", type=float)
+    gates.add_argument("--min-throughput", type=float, help="turns/sec")
+    gates.add_argument("--max-error-rate", type=float, default=0.0)
+    gates.add_argument("--max-fds", type=int)
+    gates.add_argument("--max-children", type=int, help="child processes spawned by the run (e.g. stdio servers)")
+    gates.add_argument("--max-rss-mb", type=float)
+    gates.add_argument("--baseline", help="results of an earlier run (--json) to compare p95 and throughput with")
+    gates.add_argument("--tolerance", type=float, default=0.2, help="allowed regression against the baseline")
+    args = parser.parse_args(argv)
+
+    fake_chat_model.register(latency=args.llm_latency)
+    with stub_server(args.transport, args.port) as server_config:
+        run = LoadRun(args.graph, server_config, args.configurable)
+        result = asyncio.run(run.run(args.threads, args.turns, args.ramp_up, args.sample_interval))
+    print(report(result))
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, indent=2))
+    failures = gate(result, args)
+    for failure in failures:
+        print(f"GATE FAILED: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
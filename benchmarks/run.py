@@ -0,0 +1,202 @@
+"""Run the orchestration graphs end-to-end against a scripted model and local MCP servers.
+
+Usage: python -m benchmarks.run [--graphs ...] [--transports ...] [--turns N] [--llm-latency S] [--json PATH]
+
+Reports, per transport:
+- MCP connect time (spawn / connect + `initialize`, one fresh session per sample),
+- tool-call time (`echo` on a pooled session),
+- per graph: turn latency, turns/sec, and the latency of every node, model call and tool call
+  (from the spans of `langgraph_mcp.instrumentation`).
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks import fake_chat_model
+from langgraph_mcp import old_planner_agent, planner_style_agent
+from langgraph_mcp.instrumentation import CALL_TOOL, GRAPH_NODE, MODEL_CALL, SpanRecorder, add_trace_hook, remove_trace_hook
+from langgraph_mcp.mcp_wrapper import RunTool, apply, get_session_pool, open_session
+
+STUB_SERVER = str(Path(__file__).with_name("stub_mcp_server.py"))
+
+GRAPHS = {
+    "planner_style_agent": (planner_style_agent, {
+        "planner_model": "fake/planner",
+        "execute_task_model": "fake/executor",
+        "generate_response_model": "fake/responder",
+    }),
+    "old_planner_agent": (old_planner_agent, {
+        "planner_model": "fake/planner",
+        "orchestrate_model": "fake/orchestrator",
+        "task_assessment_model": "fake/assessor",
+        "generate_response_model": "fake/responder",
+    }),
+}
+
+
+def summarize(samples: list[float]) -> dict[str, Any]:
+    """Count, mean and nearest-rank percentiles of durations (seconds), in milliseconds."""
+    if not samples:
+        return {"n": 0}
+    ordered = sorted(samples)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))] * 1000
+
+    return {
+        "n": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "p50_ms": percentile(50),
+        "p95_ms": percentile(95),
+        "p99_ms": percentile(99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+async def bench_connect(server_config: dict, samples: int) -> list[float]:
+    durations = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        async with open_session("stub", server_config):
+            durations.append(time.perf_counter() - started)
+    return durations
+
+
+async def bench_tool_calls(server_config: dict, samples: int) -> list[float]:
+    await apply("stub", server_config, RunTool("echo", text="warm up"))  # open the pooled session
+    durations = []
+    for i in range(samples):
+        started = time.perf_counter()
+        await apply("stub", server_config, RunTool("echo", text=f"call {i}"))
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+async def bench_graph(name: str, server_config: dict, turns: int) -> dict[str, Any]:
+    graph, models = GRAPHS[name]
+    config = {"configurable": {"mcp_server_config": {fake_chat_model.EXPERT: server_config}, **models}}
+    await graph.ainvoke({"messages": [HumanMessage(content="warm up")]}, config)
+    recorder = add_trace_hook(SpanRecorder())
+    durations = []
+    started = time.perf_counter()
+    for i in range(turns):
+        turn_started = time.perf_counter()
+        # a distinct request per turn, so node cache hits don't flatter the numbers
+        await graph.ainvoke({"messages": [HumanMessage(content=f"echo turn {i} {uuid.uuid4().hex[:8]}")]}, config)
+        durations.append(time.perf_counter() - turn_started)
+    elapsed = time.perf_counter() - started
+    remove_trace_hook(recorder)
+    return {
+        "turns": turns,
+        "turns_per_sec": turns / elapsed if elapsed else 0.0,
+        "turn": summarize(durations),
+        "nodes": {node: summarize(samples) for node, samples in recorder.durations(GRAPH_NODE, by="node").items()},
+        "models": {model: summarize(samples) for model, samples in recorder.durations(MODEL_CALL, by="model").items()},
+        "tools": {tool: summarize(samples) for tool, samples in recorder.durations(CALL_TOOL, by="tool").items()},
+    }
+
+
+async def bench_transport(server_config: dict, args: argparse.Namespace) -> dict[str, Any]:
+    result: dict[str, Any] = {
+        "connect": summarize(await bench_connect(server_config, args.connects)),
+        "tool_call": summarize(await bench_tool_calls(server_config, args.calls)),
+        "graphs": {name: await bench_graph(name, server_config, args.turns) for name in args.graphs},
+    }
+    pool = get_session_pool()
+    result["pool"] = vars(pool.stats).copy()
+    await pool.close()
+    return result
+
+
+def _wait_for_port(port: int, process: subprocess.Popen, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"stub MCP server exited with code {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"stub MCP server did not listen on port {port} within {timeout} seconds")
+
+
+@contextmanager
+def stub_server(transport: str, port: int) -> Iterator[dict]:
+    """Config of the stub MCP server; for streamable_http, the server runs for the duration of the block."""
+    if transport == "stdio":
+        yield {"command": sys.executable, "args": [STUB_SERVER, "stdio"]}
+        return
+    process = subprocess.Popen([sys.executable, STUB_SERVER, "streamable_http", "--port", str(port)])
+    try:
+        _wait_for_port(port, process)
+        yield {"url": f"http://127.0.0.1:{port}/mcp", "transport": "streamable_http"}
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def run_transport(transport: str, args: argparse.Namespace) -> dict[str, Any]:
+    with stub_server(transport, args.port) as server_config:
+        return asyncio.run(bench_transport(server_config, args))
+
+
+def _row(label: str, stats: dict[str, Any]) -> str:
+    if not stats.get("n"):
+        return f"  {label:<28} {0:>6}"
+    return (
+        f"  {label:<28} {stats['n']:>6} {stats['mean_ms']:>10.2f} {stats['p50_ms']:>10.2f}"
+        f" {stats['p95_ms']:>10.2f} {stats['max_ms']:>10.2f}"
+    )
+
+
+def report(results: dict[str, Any]) -> str:
+    lines = []
+    for transport, result in results.items():
+        lines.append(f"== {transport} ==")
+        lines.append(f"  {'':<28} {'n':>6} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10}")
+        lines.append(_row("mcp connect + initialize", result["connect"]))
+        lines.append(_row("tool call (pooled)", result["tool_call"]))
+        for name, graph in result["graphs"].items():
+            lines.append(f"  -- {name}: {graph['turns_per_sec']:.1f} turns/sec")
+            lines.append(_row("turn", graph["turn"]))
+            for kind in ("nodes", "models", "tools"):
+                for label, stats in graph[kind].items():
+                    lines.append(_row(f"{kind[:-1]} {label}", stats))
+        lines.append(f"  pool: {result['pool']}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--graphs", nargs="+", choices=list(GRAPHS), default=list(GRAPHS))
+    parser.add_argument("--transports", nargs="+", choices=["stdio", "streamable_http"], default=["stdio", "streamable_http"])
+    parser.add_argument("--turns", type=int, default=20, help="turns per graph (after one warm-up turn)")
+    parser.add_argument("--connects", type=int, default=5, help="fresh sessions to time per transport")
+    parser.add_argument("--calls", type=int, default=50, help="tool calls to time per transport")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="seconds every scripted model call takes")
+    parser.add_argument("--port", type=int, default=8765, help="port of the streamable_http stub server")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    fake_chat_model.register(latency=args.llm_latency)
+    results = {transport: run_transport(transport, args) for transport in args.transports}
+    print(report(results))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
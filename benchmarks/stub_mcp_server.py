@@ -0,0 +1,40 @@
+"""MCP server the benchmarks run against, over stdio or streamable_http.
+
+Usage: python benchmarks/stub_mcp_server.py [stdio | streamable_http [--port PORT]]
+"""
+
+import argparse
+import asyncio
+
+from mcp.server.fastmcp import FastMCP
+from mcp.types import ToolAnnotations
+
+
+def build_server(port: int = 8765) -> FastMCP:
+    server = FastMCP("stub", port=port, log_level="WARNING")
+
+    @server.tool()
+    def echo(text: str) -> str:
+        """Echo the given text back."""
+        return text
+
+    @server.tool(annotations=ToolAnnotations(readOnlyHint=True))
+    def lookup(key: str) -> str:
+        """Look up the value stored under a key."""
+        return f"value of {key}"
+
+    @server.tool()
+    async def work(milliseconds: int) -> str:
+        """Simulate a tool that takes the given number of milliseconds."""
+        await asyncio.sleep(milliseconds / 1000)
+        return f"worked {milliseconds} ms"
+
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("transport", nargs="?", default="stdio", choices=["stdio", "streamable_http"])
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    build_server(args.port).run("stdio" if args.transport == "stdio" else "streamable-http")
@@ -0,0 +1,189 @@
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Sequence
+
+from langchain_core.messages import AnyMessage, ToolMessage
+
+# Defaults for offloading tool results; override per server with
+# `"offload": {"threshold": <chars>, "preview": <chars>}` in the server config
+# (`"threshold": null` keeps every result inline).
+DEFAULT_OFFLOAD_THRESHOLD = 32_000
+DEFAULT_PREVIEW_CHARS = 2_000
+DEFAULT_READ_LENGTH = 8_000
+# Blobs unused for this long are deleted (`$LANGGRAPH_MCP_BLOB_MAX_AGE`, in seconds; `0` keeps them forever)
+DEFAULT_BLOB_MAX_AGE = 7 * 24 * 3600
+DEFAULT_PRUNE_INTERVAL = 3600
+
+READ_TOOL_RESULT_TOOL_NAME = "read_tool_result"
+
+# Tool the LLM nodes bind (next to the expert's tools) when the conversation holds
+# offloaded results, so the model can page through them on demand.
+READ_TOOL_RESULT_TOOL = {
+    'type': 'function',
+    'function': {
+        'name': READ_TOOL_RESULT_TOOL_NAME,
+        'description': (
+            "Read a slice of a large tool result that was stored outside of the conversation. "
+            "Use the blob id from the '[stored tool result ...]' note of that result."
+        ),
+        'parameters': {
+            'type': 'object',
+            'properties': {
+                'blob_id': {'type': 'string', 'description': "Id of the stored tool result."},
+                'offset': {'type': 'integer', 'description': "Byte offset to start reading at.", 'default': 0},
+                'length': {'type': 'integer', 'description': "Number of bytes to read.", 'default': DEFAULT_READ_LENGTH},
+            },
+            'required': ['blob_id'],
+        },
+    },
+}
+
+
+@dataclass(frozen=True)
+class BlobHandle:
+    """Reference to a tool result stored in the blob store."""
+
+    blob_id: str
+    size: int
+
+    def to_artifact(self) -> dict[str, Any]:
+        return {"blob_id": self.blob_id, "size": self.size}
+
+
+class BlobStore:
+    """Content-addressed store for large tool results on local disk.
+
+    Results are written once (identical results share one blob) and read back through
+    `mmap`, so slices of multi-megabyte results can be served without loading them.
+
+    With `max_age`, blobs not written or read for that many seconds are pruned: on the
+    first `put`, then at most every `prune_interval` seconds.
+    """
+
+    def __init__(self, root: str | Path, max_age: float | None = None, prune_interval: float = DEFAULT_PRUNE_INTERVAL):
+        self.root = Path(root)
+        self.max_age = max_age
+        self.prune_interval = prune_interval
+        self._last_pruned: float | None = None
+        self._prune_lock = threading.Lock()
+
+    def _path(self, blob_id: str) -> Path:
+        if not blob_id.isalnum():
+            raise ValueError(f"Invalid blob id '{blob_id}'")
+        return self.root / blob_id[:2] / blob_id
+
+    def put(self, content: str) -> BlobHandle:
+        """Store `content` (if not already stored) and return its handle."""
+        data = content.encode()
+        blob_id = hashlib.sha256(data).hexdigest()
+        path = self._path(blob_id)
+        self.maybe_prune()
+        if path.exists():
+            path.touch()  # in use again: keep it from being pruned
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # write to a temp file first so readers never see a partial blob
+            fd, tmp = tempfile.mkstemp(dir=path.parent)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return BlobHandle(blob_id=blob_id, size=len(data))
+
+    def read(self, blob_id: str, offset: int = 0, length: int | None = None) -> str:
+        """Read `length` bytes of a blob starting at `offset` (the whole blob by default)."""
+        path = self._path(blob_id)
+        if not path.exists():
+            raise KeyError(f"No stored tool result with id '{blob_id}'")
+        path.touch()
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return ""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                end = len(mm) if length is None else min(len(mm), offset + length)
+                # slices may cut multi-byte characters at either end
+                return mm[max(0, offset):end].decode(errors="ignore")
+
+    def maybe_prune(self) -> int:
+        """Prune blobs older than `max_age`, unless that was done less than `prune_interval` ago."""
+        if not self.max_age or not self._prune_lock.acquire(blocking=False):
+            return 0
+        try:
+            now = time.monotonic()
+            if self._last_pruned is not None and now - self._last_pruned < self.prune_interval:
+                return 0
+            self._last_pruned = now
+            return self.prune(self.max_age)
+        finally:
+            self._prune_lock.release()
+
+    def prune(self, older_than: float) -> int:
+        """Delete blobs not written or read in the last `older_than` seconds."""
+        cutoff = time.time() - older_than
+        removed = 0
+        for path in self.root.glob("*/*"):
+            if path.is_file() and path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+
+_blob_store: BlobStore | None = None
+
+
+def get_blob_store() -> BlobStore:
+    """Get the process-wide blob store, rooted at `$LANGGRAPH_MCP_BLOB_DIR` (a temp dir by default).
+
+    Blobs unused for `$LANGGRAPH_MCP_BLOB_MAX_AGE` seconds (default a week) are pruned.
+    """
+    global _blob_store
+    if _blob_store is None:
+        root = os.getenv("LANGGRAPH_MCP_BLOB_DIR") or os.path.join(tempfile.gettempdir(), "langgraph-mcp-blobs")
+        max_age = float(os.getenv("LANGGRAPH_MCP_BLOB_MAX_AGE") or DEFAULT_BLOB_MAX_AGE)
+        _blob_store = BlobStore(root, max_age=max_age or None)
+    return _blob_store
+
+
+def offload(content: str, server_config: dict) -> tuple[str, BlobHandle | None]:
+    """Offload a tool result that exceeds the server's threshold.
+
+    Returns the content to put in the `ToolMessage` (the original content, or a note with
+    the blob id and a truncated preview) and the handle of the stored result, if any.
+    """
+    offload_cfg = server_config.get("offload") or {}
+    threshold = offload_cfg.get("threshold", DEFAULT_OFFLOAD_THRESHOLD)
+    if threshold is None or len(content) <= threshold:
+        return content, None
+    preview_chars = int(offload_cfg.get("preview", DEFAULT_PREVIEW_CHARS))
+    handle = get_blob_store().put(content)
+    note = (
+        f"[stored tool result blob_id={handle.blob_id} size={handle.size} bytes; "
+        f"showing the first {preview_chars} characters. "
+        f"Call {READ_TOOL_RESULT_TOOL_NAME} with this blob_id to read more.]\n"
+    )
+    return note + content[:preview_chars], handle
+
+
+def blob_handle(message: AnyMessage) -> BlobHandle | None:
+    """Handle of the offloaded result of a `ToolMessage`, if its result was offloaded."""
+    if isinstance(message, ToolMessage) and isinstance(message.artifact, dict) and "blob_id" in message.artifact:
+        return BlobHandle(blob_id=message.artifact["blob_id"], size=message.artifact["size"])
+    return None
+
+
+def has_offloaded_results(messages: Sequence[AnyMessage]) -> bool:
+    """Whether any message in the conversation refers to an offloaded tool result."""
+    return any(blob_handle(message) for message in messages)
+
+
+def load_tool_result(message: ToolMessage) -> str:
+    """Full content of a `ToolMessage`, dereferencing its offloaded result if needed."""
+    handle = blob_handle(message)
+    if handle is None:
+        return message.content if isinstance(message.content, str) else str(message.content)
+    return get_blob_store().read(handle.blob_id)
@@ -0,0 +1,102 @@
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Generic, Mapping, Optional, Type, TypeVar
+
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableConfig
+
+from langgraph_mcp.node_cache import configurable_fingerprint
+
+C = TypeVar("C")
+
+# Configuration fields named `<node>_system_prompt` are compiled into a prompt per node
+SYSTEM_PROMPT_SUFFIX = "_system_prompt"
+
+
+@dataclass(frozen=True)
+class CompiledContext(Generic[C]):
+    """Everything the nodes derive from an assistant configuration, built once.
+
+    Shared by all runs of assistants with the same configuration; treat it as read-only.
+    """
+
+    fingerprint: str
+    cfg: C
+    prompts: Mapping[str, ChatPromptTemplate]
+    """Prompt templates by node, e.g. `prompts["planner"]` from `planner_system_prompt`."""
+    experts: str
+    """The experts part of the planning prompt (`cfg.build_experts_context()`)."""
+
+    def get_server_config(self, server_name: str) -> Optional[dict[str, Any]]:
+        return self.cfg.mcp_server_config.get(server_name)
+
+
+def compile_context(cfg: C, fingerprint: str) -> CompiledContext[C]:
+    """Parse the prompt templates and render the experts list of `cfg`."""
+    prompts = {
+        name[: -len(SYSTEM_PROMPT_SUFFIX)]: ChatPromptTemplate.from_messages([
+            ("system", value),
+            ("placeholder", "{messages}"),
+        ])
+        for name, value in vars(cfg).items()
+        if name.endswith(SYSTEM_PROMPT_SUFFIX) and isinstance(value, str)
+    }
+    return CompiledContext(fingerprint=fingerprint, cfg=cfg, prompts=prompts, experts=cfg.build_experts_context())
+
+
+@dataclass
+class CompiledContextStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class CompiledContextCache:
+    """LRU of compiled contexts, keyed by configuration class and configurable fingerprint."""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self.stats = CompiledContextStats()
+        self._entries: OrderedDict[tuple[type, str], CompiledContext] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, config: Optional[RunnableConfig], config_cls: Type[C], fingerprint: str = "") -> CompiledContext[C]:
+        """Get the compiled context of `config`, compiling it on first sight.
+
+        Pass the `config_fingerprint` recorded in state, when available, to skip hashing
+        the configurable dict again.
+        """
+        fingerprint = fingerprint or configurable_fingerprint(config, config_cls)
+        key = (config_cls, fingerprint)
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return compiled
+            self.stats.misses += 1
+        compiled = compile_context(config_cls.from_runnable_config(config), fingerprint)
+        with self._lock:
+            compiled = self._entries.setdefault(key, compiled)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+        return compiled
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_compiled_contexts = CompiledContextCache()
+
+
+def get_compiled_context(config: Optional[RunnableConfig], config_cls: Type[C], fingerprint: str = "") -> CompiledContext[C]:
+    """Get the process-wide compiled context of an assistant configuration."""
+    return _compiled_contexts.get(config, config_cls, fingerprint)
+
+
+def get_compiled_context_stats() -> dict[str, Any]:
+    """Hit/miss counters of the compiled context cache."""
+    return {**asdict(_compiled_contexts.stats), "size": len(_compiled_contexts._entries)}
@@ -0,0 +1,162 @@
+from typing import Any, Optional, Sequence
+
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import RunnableConfig
+
+from langgraph_mcp.state import ConversationSummary
+from langgraph_mcp.utils import get_message_text, load_chat_model
+
+SUMMARIZE_CONVERSATION_PROMPT = """You maintain a running summary of a conversation between a user and an assistant that uses expert tools.
+
+Extend the existing summary with the new messages below. Keep facts the assistant may still need: user goals and preferences, identifiers and values the user provided, decisions made, and the key results of tool calls. Drop pleasantries and verbatim tool payloads. Reply with the updated summary only.
+
+Existing summary:
+{summary}
+
+New messages:
+{messages}
+"""
+
+
+def _units(messages: Sequence[AnyMessage]) -> list[int]:
+    """Start indexes of the units a window may start at.
+
+    An AIMessage with tool calls and the ToolMessages answering it form one unit, so a
+    window never starts at a ToolMessage whose tool call was cut off.
+    """
+    return [i for i, message in enumerate(messages) if not isinstance(message, ToolMessage)]
+
+
+def window_start(
+    messages: Sequence[AnyMessage],
+    max_messages: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+) -> int:
+    """Index of the first message of the most recent window that fits the budgets.
+
+    The last unit is always kept, even if it alone exceeds the budgets.
+    """
+    if not messages or (max_messages is None and max_tokens is None):
+        return 0
+    starts = _units(messages) or [0]
+    start = starts[-1]
+    for candidate in reversed(starts[:-1]):
+        window = messages[candidate:]
+        if max_messages is not None and len(window) > max_messages:
+            break
+        if max_tokens is not None and count_tokens_approximately(window) > max_tokens:
+            break
+        start = candidate
+    return start
+
+
+def _window_budget(cfg: Any, node: str) -> tuple[Optional[int], Optional[int]]:
+    view = (getattr(cfg, "context_windows", None) or {}).get(node) or {}
+    return (
+        view.get("max_messages", cfg.context_max_messages),
+        view.get("max_tokens", cfg.context_max_tokens),
+    )
+
+
+def _covered(messages: Sequence[AnyMessage], summary: Optional[ConversationSummary]) -> int:
+    """Number of leading messages already folded into the summary."""
+    if not summary:
+        return 0
+    # Trust the recorded count only if the message at the boundary is still the same one
+    if 0 < summary.messages_covered <= len(messages) and messages[summary.messages_covered - 1].id == summary.last_message_id:
+        return summary.messages_covered
+    return 0
+
+
+def _render(messages: Sequence[AnyMessage]) -> str:
+    lines = []
+    for message in messages:
+        if isinstance(message, AIMessage) and message.tool_calls:
+            calls = ", ".join(f"{tc['name']}({tc['args']})" for tc in message.tool_calls)
+            lines.append(f"ai: [called tools] {calls}")
+        else:
+            lines.append(f"{message.type}: {get_message_text(message)}")
+    return "\n".join(lines)
+
+
+async def _summarize(
+    cfg: Any,
+    summary: Optional[ConversationSummary],
+    messages: Sequence[AnyMessage],
+    config: RunnableConfig,
+) -> str:
+    model = load_chat_model(cfg.context_summary_model)
+    prompt = SUMMARIZE_CONVERSATION_PROMPT.format(
+        summary=summary.summary if summary else "(none yet)",
+        messages=_render(messages),
+    )
+    response = await model.ainvoke([HumanMessage(content=prompt)], config)
+    return get_message_text(response)
+
+
+async def manage_context(
+    messages: Sequence[AnyMessage],
+    summary: Optional[ConversationSummary],
+    cfg: Any,
+    node: str,
+    config: RunnableConfig,
+) -> tuple[list[AnyMessage], dict[str, Any]]:
+    """Select the messages an LLM node sends to its model.
+
+    Applies the node's window (`context_windows[node]`, else `context_max_messages` /
+    `context_max_tokens`) to the conversation. With `context_summary_model` configured,
+    messages that slide out of the window are folded into a rolling summary kept in state
+    and passed to the model in leading messages (see `_summary_messages`).
+
+    Summarization is incremental and batched: only messages not yet covered by the summary
+    are summarized, and the summary is advanced to a boundary inside the window (half its
+    budget), so the next few steps reuse it without another summarization call.
+
+    Args:
+        messages: The conversation (`state.messages`)
+        summary: The rolling summary from state, if any
+        cfg: Strategy configuration with the `context_*` fields
+        node: Name of the node the messages are for
+        config: The runnable config of the node
+
+    Returns:
+        The messages to use in the prompt, and the state update (the new summary, if any).
+    """
+    max_messages, max_tokens = _window_budget(cfg, node)
+    start = window_start(messages, max_messages, max_tokens)
+    if not cfg.context_summary_model:
+        return list(messages[start:]), {}
+
+    update: dict[str, Any] = {}
+    covered = _covered(messages, summary)
+    if start > covered:
+        boundary = window_start(
+            messages,
+            max_messages // 2 if max_messages is not None else None,
+            max_tokens // 2 if max_tokens is not None else None,
+        )
+        boundary = max(boundary, start)
+        text = await _summarize(cfg, summary if covered else None, messages[covered:boundary], config)
+        summary = ConversationSummary(
+            summary=text, messages_covered=boundary, last_message_id=messages[boundary - 1].id
+        )
+        covered = boundary
+        update["conversation_summary"] = summary
+
+    windowed = list(messages[max(start, covered):])
+    if summary and covered:
+        windowed[:0] = _summary_messages(summary, windowed)
+    return windowed, update
+
+
+def _summary_messages(summary: ConversationSummary, windowed: Sequence[AnyMessage]) -> list[AnyMessage]:
+    """The summary as a user turn (plus an acknowledgement when the window starts with a user turn).
+
+    Not a system message: the prompt templates already start with one, and some providers
+    reject or mishandle a second. User and assistant turns keep alternating.
+    """
+    messages: list[AnyMessage] = [HumanMessage(content=f"Summary of the earlier conversation:\n{summary.summary}")]
+    if not windowed or isinstance(windowed[0], HumanMessage):
+        messages.append(AIMessage(content="Noted, I'll take the earlier conversation into account."))
+    return messages
@@ -0,0 +1,30 @@
+"""Custom routes and lifespan of the LangGraph server (`"http": {"app": ...}` in langgraph.json)."""
+
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from langgraph_mcp.mcp_wrapper import get_session_pool
+from langgraph_mcp.utils import aclose_http_clients
+from langgraph_mcp.warm_start import get_readiness, start_warm_start
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    # warm the servers of $LANGGRAPH_MCP_WARM_START in the background; the server starts right away
+    start_warm_start()
+    yield
+    await get_session_pool().close()
+    await aclose_http_clients()
+
+
+async def ready(request: Request) -> JSONResponse:
+    """Readiness probe: 503 until the warm-up finished, so traffic is only routed once warm."""
+    readiness = get_readiness()
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
+
+
+app = Starlette(routes=[Route("/ready", ready)], lifespan=lifespan)
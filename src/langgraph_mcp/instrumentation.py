@@ -0,0 +1,292 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+
+logger = logging.getLogger(__name__)
+
+# Span names
+SESSION_START = "mcp.session.start"
+INITIALIZE = "mcp.initialize"
+LIST_TOOLS = "mcp.list_tools"
+DESCRIBE = "mcp.describe"
+CALL_TOOL = "mcp.call_tool"
+WARM_START = "mcp.warm_start"
+MODEL_CALL = "model.call"
+GRAPH_NODE = "graph.node"
+
+
+@dataclass
+class Span:
+    """A timed operation: its attributes (server, tool, payload sizes, ...), duration and error class."""
+
+    name: str
+    attributes: dict[str, Any] = field(default_factory=dict)
+    parent: Optional["Span"] = None
+    start_time_ns: int = field(default_factory=time.time_ns)
+    duration: Optional[float] = None
+    """Seconds, once the span ended."""
+    error: Optional[str] = None
+    """Class name of the exception the operation failed with."""
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "span": self.name,
+            "duration_ms": None if self.duration is None else round(self.duration * 1000, 3),
+            "error": self.error,
+            "parent": self.parent.name if self.parent else None,
+            **self.attributes,
+        }
+
+
+class TraceHook:
+    """Receives spans as they start and end; subclasses override what they need.
+
+    Hooks are called inline, so they should be quick; exceptions they raise are logged and ignored.
+    """
+
+    def on_span_start(self, span: Span) -> None:
+        pass
+
+    def on_span_end(self, span: Span) -> None:
+        pass
+
+
+_hooks: list[TraceHook] = []
+_hooks_lock = threading.Lock()
+_current_span: ContextVar[Optional[Span]] = ContextVar("langgraph_mcp_current_span", default=None)
+
+
+def _notify(method: str, span: Span) -> None:
+    for hook in _hooks:
+        try:
+            getattr(hook, method)(span)
+        except Exception:
+            logger.exception("Trace hook %r failed on %s", hook, span.name)
+
+
+def start_span(name: str, parent: Optional[Span] = None, **attributes: Any) -> Span:
+    """Start a span (child of `parent`, or of the current span); end it with `end_span`."""
+    span = Span(name=name, attributes=attributes, parent=parent or _current_span.get())
+    if _hooks:
+        _notify("on_span_start", span)
+    return span
+
+
+def end_span(span: Span, error: Optional[BaseException] = None) -> None:
+    span.duration = time.perf_counter() - span._started
+    if error is not None:
+        span.error = type(error).__name__
+    if _hooks:
+        _notify("on_span_end", span)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """Time the block as a span; spans started within the block are its children."""
+    current = start_span(name, **attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        _current_span.reset(token)
+        end_span(current, e)
+        raise
+    _current_span.reset(token)
+    end_span(current)
+
+
+class _GraphCallbackHandler(BaseCallbackHandler):
+    """Turns LangChain callbacks into spans for graph nodes and model calls."""
+
+    run_inline = True
+
+    def __init__(self):
+        self._spans: dict[UUID, Span] = {}
+        self._parents: dict[UUID, Optional[UUID]] = {}
+        self._tokens: dict[UUID, Token] = {}
+
+    def _parent(self, run_id: Optional[UUID]) -> Optional[Span]:
+        while run_id is not None:
+            if run_id in self._spans:
+                return self._spans[run_id]
+            run_id = self._parents.get(run_id)
+        return None
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, **kwargs) -> None:
+        if not _hooks:
+            return
+        self._parents[run_id] = parent_run_id
+        node = (metadata or {}).get("langgraph_node")
+        # a node's own run is named after the node; runs nested in the node share its metadata
+        if node and kwargs.get("name") == node:
+            node_span = self._spans[run_id] = start_span(GRAPH_NODE, parent=self._parent(parent_run_id), node=node)
+            # called inline, before the node runs in a copy of this context: the MCP spans
+            # started by the node become its children
+            self._tokens[run_id] = _current_span.set(node_span)
+
+    def _end(self, run_id: UUID, error: Optional[BaseException] = None, **attributes: Any) -> None:
+        self._parents.pop(run_id, None)
+        if (token := self._tokens.pop(run_id, None)) is not None:
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                pass  # the run ended in another context, which the node span doesn't outlive
+        if (span := self._spans.pop(run_id, None)) is not None:
+            span.set(**attributes)
+            end_span(span, error)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs) -> None:
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs) -> None:
+        self._end(run_id, error)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, metadata=None, **kwargs) -> None:
+        if not _hooks:
+            return
+        metadata = metadata or {}
+        prompt = [message for batch in messages for message in batch]
+        self._spans[run_id] = start_span(
+            MODEL_CALL,
+            parent=self._parent(parent_run_id),
+            model=metadata.get("ls_model_name") or kwargs.get("name"),
+            node=metadata.get("langgraph_node"),
+            messages=len(prompt),
+            prompt_chars=sum(len(str(message.content)) for message in prompt),
+        )
+
+    def on_llm_end(self, response, *, run_id, **kwargs) -> None:
+        attributes: dict[str, Any] = {}
+        generations = [generation for batch in response.generations for generation in batch]
+        if generations:
+            message = getattr(generations[0], "message", None)
+            attributes["response_chars"] = len(generations[0].text or str(getattr(message, "content", "")))
+            attributes["tool_calls"] = len(getattr(message, "tool_calls", None) or [])
+            if usage := getattr(message, "usage_metadata", None):
+                attributes["input_tokens"] = usage.get("input_tokens")
+                attributes["output_tokens"] = usage.get("output_tokens")
+        self._end(run_id, **attributes)
+
+    def on_llm_error(self, error, *, run_id, **kwargs) -> None:
+        self._end(run_id, error)
+
+
+_callback_handler: ContextVar[Optional[_GraphCallbackHandler]] | None = None
+
+
+def add_trace_hook(hook: TraceHook) -> TraceHook:
+    """Send spans to `hook`; the first hook also starts tracing graph nodes and model calls."""
+    global _callback_handler
+    with _hooks_lock:
+        if _callback_handler is None:
+            # a context var with a default applies to every run, in every thread and task
+            _callback_handler = ContextVar("langgraph_mcp_callback_handler", default=_GraphCallbackHandler())
+            register_configure_hook(_callback_handler, inheritable=True)
+        if hook not in _hooks:
+            _hooks.append(hook)
+    return hook
+
+
+def remove_trace_hook(hook: TraceHook) -> None:
+    with _hooks_lock:
+        if hook in _hooks:
+            _hooks.remove(hook)
+
+
+class LoggingHook(TraceHook):
+    """Logs ended spans to the `langgraph_mcp.trace` logger, with the span under `extra["span"]`."""
+
+    def __init__(self, level: int = logging.DEBUG, slow_threshold: Optional[float] = None):
+        self.logger = logging.getLogger("langgraph_mcp.trace")
+        self.level = level
+        self.slow_threshold = slow_threshold
+        """Spans slower than this many seconds (and failed spans) are logged as warnings."""
+
+    def on_span_end(self, span: Span) -> None:
+        slow = self.slow_threshold is not None and (span.duration or 0) > self.slow_threshold
+        level = logging.WARNING if span.error or slow else self.level
+        if self.logger.isEnabledFor(level):
+            self.logger.log(
+                level, "%s took %.1f ms%s", span.name, (span.duration or 0) * 1000,
+                f" ({span.error})" if span.error else "", extra={"span": span.as_dict()},
+            )
+
+
+class SpanRecorder(TraceHook):
+    """Keeps the last `max_spans` ended spans in memory, e.g. for benchmarks."""
+
+    def __init__(self, max_spans: int = 100_000):
+        self.spans: deque[Span] = deque(maxlen=max_spans)
+
+    def on_span_end(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def durations(self, name: str, by: Optional[str] = None) -> dict[str, list[float]]:
+        """Durations of the spans called `name`, grouped by the value of attribute `by`."""
+        grouped: dict[str, list[float]] = {}
+        for span in list(self.spans):
+            if span.name == name and span.duration is not None:
+                grouped.setdefault(str(span.attributes.get(by)) if by else name, []).append(span.duration)
+        return grouped
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class OpenTelemetryHook(TraceHook):
+    """Exports spans through the OpenTelemetry API (`pip install opentelemetry-api`).
+
+    Spans keep their parent/child structure and attributes; failed spans get an error
+    status and an `error.type` attribute. Configure the SDK / exporter as usual.
+    """
+
+    def __init__(self, tracer: Any = None):
+        from opentelemetry import trace
+
+        self._trace = trace
+        self._tracer = tracer or trace.get_tracer("langgraph_mcp")
+        self._spans: dict[int, Any] = {}
+
+    def on_span_start(self, span: Span) -> None:
+        parent = self._spans.get(id(span.parent)) if span.parent else None
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        self._spans[id(span)] = self._tracer.start_span(span.name, context=context, start_time=span.start_time_ns)
+
+    def on_span_end(self, span: Span) -> None:
+        otel_span = self._spans.pop(id(span), None)
+        if otel_span is None:
+            return
+        otel_span.set_attributes({key: value for key, value in span.attributes.items() if value is not None})
+        if span.error:
+            otel_span.set_attribute("error.type", span.error)
+            otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        otel_span.end(end_time=span.start_time_ns + int((span.duration or 0) * 1e9))
+
+
+_ENV_HOOKS: dict[str, Callable[[], TraceHook]] = {"log": LoggingHook, "otel": OpenTelemetryHook}
+
+
+def configure_from_env() -> None:
+    """Add the hooks listed in `$LANGGRAPH_MCP_TRACE` (comma-separated: `log`, `otel`)."""
+    for name in filter(None, (part.strip() for part in os.getenv("LANGGRAPH_MCP_TRACE", "").split(","))):
+        if name not in _ENV_HOOKS:
+            logger.warning("Unknown trace hook %r in LANGGRAPH_MCP_TRACE", name)
+            continue
+        add_trace_hook(_ENV_HOOKS[name]())
+
+
+configure_from_env()
@@ -4,11 +4,29 @@ from langchain_mcp_adapters.tools import load_mcp_tools
 from contextlib import asynccontextmanager
 from typing import cast, Any, Dict
 
+from langgraph_mcp.mcp_wrapper import infer_transport_from_config
+
+# Server config keys understood by langchain_mcp_adapters connections; the rest of an
+# expert's config (description, pool, offload, ...) is for this package only.
+CONNECTION_KEYS = {
+    "transport", "command", "args", "env", "cwd", "encoding", "encoding_error_handler",
+    "url", "headers", "timeout", "sse_read_timeout", "terminate_on_close",
+    "session_kwargs", "httpx_client_factory", "auth",
+}
+
+
+def to_connection(expert_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn an expert's server config into a langchain_mcp_adapters connection."""
+    connection = {k: v for k, v in expert_config.items() if k in CONNECTION_KEYS}
+    connection.setdefault("transport", infer_transport_from_config(expert_config))
+    return connection
+
+
 @asynccontextmanager
 async def make_graph(model: str, expert: str, expert_config: Dict[str, Any]):
     client = MultiServerMCPClient(
         cast(Dict[str, Any], {
-            expert: expert_config
+            expert: to_connection(expert_config)
         })
     )
 
@@ -18,4 +36,4 @@ async def make_graph(model: str, expert: str, expert_config: Dict[str, Any]):
         yield agent  # Execution pauses here until caller finishes its async with
 
     # This part executes **only when** the caller exits their async with.
-    # At this point, the session will be closed automatically.
\ No newline at end of file
+    # At this point, the session will be closed automatically.
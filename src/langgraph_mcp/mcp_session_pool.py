@@ -0,0 +1,286 @@
+import asyncio
+import hashlib
+import json
+import time
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable
+
+import anyio
+from mcp import ClientSession
+
+
+# Opens a transport + ClientSession for a server and yields it already initialized
+SessionOpener = Callable[[str, dict], AbstractAsyncContextManager[ClientSession]]
+
+# Errors raised when writing a request to a transport that has already gone away. The
+# request never reached the server, so it is always safe to retry it on a fresh session.
+REQUEST_NOT_SENT_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError)
+# Errors showing that a session's transport is gone. `EndOfStream` is raised while waiting
+# for a response, after the request was sent, so only the caller may decide to retry it.
+SESSION_CLOSED_ERRORS = (*REQUEST_NOT_SENT_ERRORS, anyio.EndOfStream)
+
+
+def config_fingerprint(server_config: dict) -> str:
+    """Stable hash of a server configuration, used to key pooled sessions and caches."""
+    payload = json.dumps(server_config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+@dataclass
+class PooledSession:
+    """An initialized MCP session owned by a background task of the pool."""
+
+    key: tuple[str, str]
+    ready: asyncio.Future
+    owner: asyncio.Task
+    stop: asyncio.Event
+    idle_timeout: float
+    session: ClientSession | None = None
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    in_use: bool = False
+    uses: int = 0
+
+    @property
+    def alive(self) -> bool:
+        return not self.owner.done()
+
+
+@dataclass
+class PoolStats:
+    """Counters describing how the pool has been used."""
+
+    opened: int = 0
+    reused: int = 0
+    evicted_idle: int = 0
+    discarded_unhealthy: int = 0
+    reconnects: int = 0
+
+
+class MCPSessionPool:
+    """Keeps initialized MCP sessions alive across `apply` calls.
+
+    Sessions are keyed by server name and a fingerprint of the server configuration, so
+    an assistant that changes a server's config gets a fresh session. Each session is
+    leased exclusively for the duration of one `session()` block; up to
+    `max_sessions_per_server` sessions are kept per key and callers beyond that wait for
+    one to be released.
+
+    The transport and `ClientSession` context managers are entered by a dedicated owner
+    task (anyio requires them to be exited from the task that entered them), which keeps
+    them open until the session is evicted or the pool is closed.
+    """
+
+    def __init__(
+        self,
+        opener: SessionOpener,
+        *,
+        idle_timeout: float = 300.0,
+        max_sessions_per_server: int = 4,
+        health_check_after: float = 30.0,
+        health_check_timeout: float = 5.0,
+    ):
+        self._opener = opener
+        self.idle_timeout = idle_timeout
+        self.max_sessions_per_server = max_sessions_per_server
+        self.health_check_after = health_check_after
+        self.health_check_timeout = health_check_timeout
+        self._sessions: dict[tuple[str, str], list[PooledSession]] = {}
+        self._conditions: dict[tuple[str, str], asyncio.Condition] = {}
+        self._reaper: asyncio.Task | None = None
+        self._pinned: set[tuple[str, str]] = set()
+        self.stats = PoolStats()
+
+    @asynccontextmanager
+    async def session(self, server_name: str, server_config: dict) -> AsyncIterator[ClientSession]:
+        """Lease an initialized session for `server_name`, opening one if needed."""
+        pooled = await self._acquire(server_name, server_config)
+        try:
+            yield pooled.session  # type: ignore[misc]
+        except (*SESSION_CLOSED_ERRORS, TimeoutError, asyncio.CancelledError):
+            # a timed-out or cancelled call leaves the session busy with the abandoned request;
+            # don't hand it out again
+            await self._discard(pooled)
+            raise
+        finally:
+            await self._release(pooled)
+
+    async def run(self, server_name: str, server_config: dict, fn: Callable[[ClientSession], Any]) -> Any:
+        """Run `fn(session)` on a pooled session, reconnecting once if the session was dead.
+
+        `fn` is only run again if its request could not be written to the dead session;
+        a session that dies while `fn` awaits the response fails the call.
+        """
+        try:
+            async with self.session(server_name, server_config) as session:
+                return await fn(session)
+        except REQUEST_NOT_SENT_ERRORS:
+            self.stats.reconnects += 1
+            async with self.session(server_name, server_config) as session:
+                return await fn(session)
+
+    def pin(self, server_name: str, server_config: dict) -> None:
+        """Keep one session of the server open however long it idles (e.g. a warmed session)."""
+        self._pinned.add((server_name, config_fingerprint(server_config)))
+
+    def has_session(self, server_name: str, server_config: dict) -> bool:
+        """Whether a live session of the server is pooled."""
+        return any(pooled.alive for pooled in self._sessions.get((server_name, config_fingerprint(server_config)), []))
+
+    def _limits(self, server_config: dict) -> tuple[int, float]:
+        pool_cfg = server_config.get("pool") or {}
+        max_sessions = int(pool_cfg.get("max_sessions", self.max_sessions_per_server))
+        idle_timeout = float(pool_cfg.get("idle_timeout", self.idle_timeout))
+        return max(1, max_sessions), idle_timeout
+
+    async def _acquire(self, server_name: str, server_config: dict) -> PooledSession:
+        key = (server_name, config_fingerprint(server_config))
+        max_sessions, idle_timeout = self._limits(server_config)
+        condition = self._conditions.setdefault(key, asyncio.Condition())
+        self._ensure_reaper()
+        while True:
+            async with condition:
+                sessions = self._sessions.setdefault(key, [])
+                sessions[:] = [s for s in sessions if s.alive]
+                pooled = next((s for s in sessions if not s.in_use), None)
+                if pooled is None and len(sessions) >= max_sessions:
+                    await condition.wait()
+                    continue
+                if pooled is None:
+                    # Register the new session while holding the lock so that concurrent
+                    # callers see it and respect the per-server limit.
+                    pooled = self._spawn(key, server_name, server_config, idle_timeout)
+                    sessions.append(pooled)
+                    opening = True
+                else:
+                    opening = False
+                pooled.in_use = True
+            if opening:
+                try:
+                    pooled.session = await pooled.ready
+                except BaseException:
+                    await self._discard(pooled)
+                    raise
+                self.stats.opened += 1
+                pooled.uses += 1
+                return pooled
+            if await self._healthy(pooled):
+                self.stats.reused += 1
+                pooled.uses += 1
+                return pooled
+            self.stats.discarded_unhealthy += 1
+            await self._discard(pooled)
+
+    def _spawn(self, key: tuple[str, str], server_name: str, server_config: dict, idle_timeout: float) -> PooledSession:
+        ready: asyncio.Future[ClientSession] = asyncio.get_running_loop().create_future()
+        stop = asyncio.Event()
+        owner = asyncio.create_task(
+            self._own(server_name, server_config, ready, stop),
+            name=f"mcp-session:{server_name}",
+        )
+        return PooledSession(key=key, ready=ready, owner=owner, stop=stop, idle_timeout=idle_timeout)
+
+    async def _own(
+        self,
+        server_name: str,
+        server_config: dict,
+        ready: asyncio.Future,
+        stop: asyncio.Event,
+    ) -> None:
+        try:
+            async with self._opener(server_name, server_config) as session:
+                ready.set_result(session)
+                await stop.wait()
+        except BaseException as e:
+            if not ready.done():
+                ready.set_exception(e if isinstance(e, Exception) else RuntimeError(repr(e)))
+            if isinstance(e, asyncio.CancelledError):
+                raise
+
+    async def _healthy(self, pooled: PooledSession) -> bool:
+        if not pooled.alive:
+            return False
+        if time.monotonic() - pooled.last_used < self.health_check_after:
+            return True
+        try:
+            with anyio.fail_after(self.health_check_timeout):
+                await pooled.session.send_ping()  # type: ignore[union-attr]
+            return True
+        except Exception:
+            return False
+
+    async def _release(self, pooled: PooledSession) -> None:
+        condition = self._conditions[pooled.key]
+        async with condition:
+            pooled.in_use = False
+            pooled.last_used = time.monotonic()
+            condition.notify()
+
+    async def _discard(self, pooled: PooledSession) -> None:
+        condition = self._conditions[pooled.key]
+        async with condition:
+            sessions = self._sessions.get(pooled.key, [])
+            if pooled in sessions:
+                sessions.remove(pooled)
+            condition.notify()
+        await self._stop(pooled)
+
+    async def _stop(self, pooled: PooledSession) -> None:
+        pooled.stop.set()
+        _, pending = await asyncio.wait({pooled.owner}, timeout=10)
+        if pending:
+            pooled.owner.cancel()
+
+    def _ensure_reaper(self) -> None:
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_forever(), name="mcp-session-reaper")
+
+    async def _reap_forever(self) -> None:
+        interval = max(1.0, min(self.idle_timeout / 2, 30.0))
+        while True:
+            await asyncio.sleep(interval)
+            await self.evict_idle()
+
+    async def evict_idle(self) -> int:
+        """Close sessions that have been idle longer than their idle timeout."""
+        evicted = 0
+        for key, sessions in list(self._sessions.items()):
+            now = time.monotonic()
+            async with self._conditions[key]:
+                expired = [
+                    pooled for pooled in sessions
+                    if not pooled.in_use and (not pooled.alive or now - pooled.last_used > pooled.idle_timeout)
+                ]
+                if key in self._pinned and not any(pooled.alive for pooled in sessions if pooled not in expired):
+                    # spare the most recently used live session of a pinned server
+                    spared = max((pooled for pooled in expired if pooled.alive), key=lambda p: p.last_used, default=None)
+                    if spared is not None:
+                        expired.remove(spared)
+                for pooled in expired:
+                    sessions.remove(pooled)
+            for pooled in expired:
+                await self._stop(pooled)
+            evicted += len(expired)
+        self.stats.evicted_idle += evicted
+        return evicted
+
+    def describe(self) -> dict[str, Any]:
+        """Snapshot of pooled sessions per server, for diagnostics."""
+        servers: dict[str, dict[str, int]] = {}
+        for (server_name, _), sessions in self._sessions.items():
+            entry = servers.setdefault(server_name, {"open": 0, "in_use": 0})
+            entry["open"] += len(sessions)
+            entry["in_use"] += sum(1 for s in sessions if s.in_use)
+        return {"servers": servers, "stats": vars(self.stats).copy()}
+
+    async def close(self) -> None:
+        """Close every pooled session and stop the idle reaper."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        for sessions in list(self._sessions.values()):
+            for pooled in list(sessions):
+                await self._stop(pooled)
+        self._sessions.clear()
+        self._pinned.clear()
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable
+
+from mcp.types import Tool, ToolAnnotations
+
+from langgraph_mcp.mcp_session_pool import config_fingerprint
+from langgraph_mcp.schema_compaction import CompactionReport, compact_tools
+
+logger = logging.getLogger(__name__)
+
+
+def to_openai_tool(tool: Tool) -> dict[str, Any]:
+    """Convert an MCP tool definition to the OpenAI-style function tool dict used with `bind_tools`."""
+    return {
+        'type': 'function',
+        'function': {
+            'name': tool.name,
+            'description': tool.description or "",
+            'parameters': tool.inputSchema or {}
+        }
+    }
+
+
+@dataclass
+class CatalogEntry:
+    """Tools listed by a server, as fetched and as converted for `bind_tools`."""
+
+    mcp_tools: list[Tool]
+    tools: list[dict[str, Any]]
+    fetched_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class CatalogStats:
+    """Counters describing how the catalog cache has been used."""
+
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+
+
+class ToolCatalogCache:
+    """Caches the tool catalog of each MCP server.
+
+    Entries are keyed by server name and a fingerprint of the server configuration and
+    expire after a TTL (`"tools_cache": {"ttl": <seconds>}` in the server config; `null`
+    keeps entries until invalidated, `0` disables caching for the server). Entries are
+    also dropped when the server sends `notifications/tools/list_changed`.
+
+    Tool annotations are kept apart from the entries, so they are cached (for `default_ttl`)
+    even for servers whose catalog isn't: every batch of tool calls looks them up.
+    """
+
+    def __init__(self, default_ttl: float | None = 300.0):
+        self.default_ttl = default_ttl
+        self._entries: dict[tuple[str, str], CatalogEntry] = {}
+        self._inflight: dict[tuple[str, str], asyncio.Task] = {}
+        self._waiters: dict[asyncio.Task, int] = {}
+        self._generations: dict[str, int] = {}
+        self._annotations: dict[tuple[str, str], tuple[dict[str, ToolAnnotations | None], float]] = {}
+        self.stats = CatalogStats()
+        self.compaction_reports: dict[str, CompactionReport] = {}
+
+    def ttl_for(self, server_config: dict) -> float | None:
+        cache_cfg = server_config.get("tools_cache") or {}
+        return cache_cfg.get("ttl", self.default_ttl)
+
+    async def get(
+        self,
+        server_name: str,
+        server_config: dict,
+        fetch: Callable[[], Awaitable[list[Tool]]],
+    ) -> CatalogEntry:
+        """Return the cached catalog for the server, fetching it with `fetch` on a miss."""
+        key = (server_name, config_fingerprint(server_config))
+        ttl = self.ttl_for(server_config)
+        entry = self._entries.get(key)
+        if entry is not None and (ttl is None or time.monotonic() - entry.fetched_at < ttl):
+            self.stats.hits += 1
+            return entry
+
+        self.stats.misses += 1
+        # Concurrent misses for the same server share one fetch
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = self._inflight[key] = asyncio.ensure_future(self._fetch(key, server_config, ttl, fetch))
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            abandoned = self._waiters[task] == 0
+            if abandoned:
+                del self._waiters[task]
+                if not task.done():
+                    # every caller gave up (e.g. a cancelled speculative prefetch): stop the fetch
+                    task.cancel()
+            if (abandoned or task.done()) and self._inflight.get(key) is task:
+                del self._inflight[key]
+
+    async def _fetch(
+        self,
+        key: tuple[str, str],
+        server_config: dict,
+        ttl: float | None,
+        fetch: Callable[[], Awaitable[list[Tool]]],
+    ) -> CatalogEntry:
+        generation = self._generations.get(key[0], 0)
+        mcp_tools = await fetch()
+        # compact the schemas once here, rather than on every bind_tools
+        tools, report = compact_tools([to_openai_tool(tool) for tool in mcp_tools], server_config)
+        self.compaction_reports[key[0]] = report
+        if (server_config.get("schema_compaction") or {}).get("report"):
+            logger.info(
+                "Compacted tool schemas of server '%s': %d tools, %d -> %d chars (~%d tokens saved)",
+                key[0], report.tools, report.chars_before, report.chars_after, report.tokens_saved,
+                extra={"server": key[0]},
+            )
+        entry = CatalogEntry(mcp_tools=mcp_tools, tools=tools)
+        # Don't store a catalog that was invalidated while it was being fetched
+        if generation == self._generations.get(key[0], 0):
+            if ttl != 0:
+                self._entries[key] = entry
+            self._annotations[key] = ({tool.name: tool.annotations for tool in mcp_tools}, entry.fetched_at)
+        return entry
+
+    async def annotations(
+        self,
+        server_name: str,
+        server_config: dict,
+        fetch: Callable[[], Awaitable[list[Tool]]],
+    ) -> dict[str, ToolAnnotations | None]:
+        """MCP annotations (`readOnlyHint`, ...) of the server's tools, by tool name."""
+        key = (server_name, config_fingerprint(server_config))
+        ttl = self.ttl_for(server_config) or self.default_ttl
+        cached = self._annotations.get(key)
+        if cached is not None and (ttl is None or time.monotonic() - cached[1] < ttl):
+            return cached[0]
+        entry = await self.get(server_name, server_config, fetch)
+        return {tool.name: tool.annotations for tool in entry.mcp_tools}
+
+    def invalidate(self, server_name: str | None = None) -> int:
+        """Drop cached catalogs for `server_name` (all configs), or for every server if None."""
+        keys = [key for key in self._entries if server_name is None or key[0] == server_name]
+        for name in ([server_name] if server_name is not None else {key[0] for key in self._inflight}):
+            self._generations[name] = self._generations.get(name, 0) + 1
+        for key in keys:
+            del self._entries[key]
+        for key in [key for key in self._annotations if server_name is None or key[0] == server_name]:
+            del self._annotations[key]
+        self.stats.invalidations += len(keys)
+        return len(keys)
+
+    def compaction_report(self) -> dict[str, dict[str, Any]]:
+        """Tool schema sizes before and after compaction, per server (last fetch)."""
+        return {
+            server_name: {**asdict(report), "tokens_saved": report.tokens_saved}
+            for server_name, report in self.compaction_reports.items()
+        }
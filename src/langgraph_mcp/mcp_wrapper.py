@@ -1,8 +1,14 @@
+import asyncio
+import json
+import logging
 import os
+import weakref
 from abc import ABC, abstractmethod
-from typing import Any
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator
+from langchain_core.messages import ToolCall, ToolMessage
 from langchain_core.tools import ToolException
-from mcp import ClientSession, ListPromptsResult, ListResourcesResult, ListToolsResult, StdioServerParameters, stdio_client
+from mcp import ClientSession, StdioServerParameters, stdio_client
 import mcp
 from mcp.client.streamable_http import streamablehttp_client
 from mcp.client.sse import sse_client
@@ -10,67 +16,77 @@ import pydantic_core
 import smithery
 from urllib.parse import urlparse
 
+from langgraph_mcp.blob_store import DEFAULT_READ_LENGTH, READ_TOOL_RESULT_TOOL_NAME, get_blob_store, offload
+from langgraph_mcp.instrumentation import CALL_TOOL, DESCRIBE, INITIALIZE, LIST_TOOLS, SESSION_START, span
+from langgraph_mcp.mcp_session_pool import MCPSessionPool
+from langgraph_mcp.mcp_tool_catalog import ToolCatalogCache, to_openai_tool
+from langgraph_mcp.resilience import (
+    CircuitOpenError, Phase, RetryPolicy, get_circuit_breakers, is_idempotent, is_transient, phase_timeout, unwrap,
+)
+from langgraph_mcp.server_limits import ServerBusyError, ServerLimits
+from langgraph_mcp.tool_result_cache import ToolResultCache, is_read_only
+
+logger = logging.getLogger(__name__)
 
 # Abstract base class for MCP session functions
 class MCPSessionFunction(ABC):
+    phase: Phase = "list"
+    """The phase timeout (`"timeouts"` in the server config) that bounds the function."""
+    idempotent: bool = True
+    """Whether `apply` may retry the function after a transient failure."""
+
     @abstractmethod
     async def __call__(self, server_name: str, env: dict, session: ClientSession) -> Any:
         pass
 
 class RoutingDescription(MCPSessionFunction):
-    async def __call__(self, server_name: str, env: dict, session: ClientSession) -> str:
-        tools: ListToolsResult | None = None
-        prompts: ListPromptsResult | None = None
-        resources: ListResourcesResult | None = None
+    async def __call__(self, server_name: str, env: dict, session: ClientSession) -> tuple[str, str]:
+        # The three listings are independent, so issue them concurrently on the session
+        with span(DESCRIBE, server=server_name) as s:
+            tools, prompts, resources = await asyncio.gather(
+                session.list_tools(), session.list_prompts(), session.list_resources(), return_exceptions=True
+            )
         content = ""
-        try:
-            tools = await session.list_tools()
-            if tools:
-                content += "Provides tools:\n"
-                for tool in tools.tools:
-                    content += f"- {tool.name}: {tool.description}\n"
-                content += "---\n"
-        except Exception as e:
-            print(f"Failed to fetch tools from server '{server_name}': {e}")
-        
-        try:
-            prompts = await session.list_prompts()
-            if prompts:
-                content += "Provides prompts:\n"
-                for prompt in prompts.prompts:
-                    content += f"- {prompt.name}: {prompt.description}\n"
-                content += "---\n"
-        except Exception as e:
-            print(f"Failed to fetch prompts from server '{server_name}': {e}")
+        if isinstance(tools, BaseException):
+            logger.warning("Failed to fetch tools from server '%s': %r", server_name, tools, extra={"server": server_name})
+        elif tools:
+            content += "Provides tools:\n"
+            for tool in tools.tools:
+                content += f"- {tool.name}: {tool.description}\n"
+            content += "---\n"
 
-        try:
-            resources = await session.list_resources()
-            if resources:
-                content += "Provides resources:\n"
-                for resource in resources.resources:
-                    content += f"- {resource.name}: {resource.description}\n"
-                content += "---\n"
-        except Exception as e:
-            print(f"Failed to fetch resources from server '{server_name}': {e}")
+        if isinstance(prompts, BaseException):
+            logger.warning("Failed to fetch prompts from server '%s': %r", server_name, prompts, extra={"server": server_name})
+        elif prompts:
+            content += "Provides prompts:\n"
+            for prompt in prompts.prompts:
+                content += f"- {prompt.name}: {prompt.description}\n"
+            content += "---\n"
+
+        if isinstance(resources, BaseException):
+            logger.warning("Failed to fetch resources from server '%s': %r", server_name, resources, extra={"server": server_name})
+        elif resources:
+            content += "Provides resources:\n"
+            for resource in resources.resources:
+                content += f"- {resource.name}: {resource.description}\n"
+            content += "---\n"
 
+        s.set(description_chars=len(content))
         return server_name, content
 
+async def _list_tools(server_name: str, session: ClientSession) -> list[mcp.types.Tool]:
+    with span(LIST_TOOLS, server=server_name) as s:
+        tools = await session.list_tools()
+        s.set(tools=len(tools.tools) if tools else 0)
+    return tools.tools if tools else []
+
 class GetTools(MCPSessionFunction):
     async def __call__(self, server_name: str, env: dict, session: ClientSession) -> list[dict[str, Any]]:
-        tools = await session.list_tools()
-        if tools is None:
-            return []
-        return [
-            {
-                'type': 'function',
-                'function': {
-                    'name': tool.name,
-                    'description': tool.description or "",
-                    'parameters': tool.inputSchema or {}
-                }
-            }
-            for tool in tools.tools
-        ]
+        return [to_openai_tool(tool) for tool in await _list_tools(server_name, session)]
+
+class ListTools(MCPSessionFunction):
+    async def __call__(self, server_name: str, env: dict, session: ClientSession) -> list[mcp.types.Tool]:
+        return await _list_tools(server_name, session)
 
 class GetPrompts(MCPSessionFunction):
     async def __call__(self, server_name: str, env: dict, session: ClientSession) -> dict[str, Any]:
@@ -89,20 +105,38 @@ class GetPrompts(MCPSessionFunction):
         }
 
 class RunTool(MCPSessionFunction):
+    phase = "call"
+    idempotent = False  # unless the server annotates the tool as such; see `run_tool_calls`
+
     def __init__(self, tool_name: str, **kwargs):
         self.tool_name = tool_name
         self.kwargs = kwargs
 
     async def __call__(self, server_name: str, env: dict, session: ClientSession) -> Any:
         arguments = dict(self.kwargs)
-        if env:
-            arguments["env_override"] = env
-        result = await session.call_tool(self.tool_name, arguments=arguments)
-        content = pydantic_core.to_json(result.content).decode()
+        with span(CALL_TOOL, server=server_name, tool=self.tool_name) as s:
+            s.set(args_bytes=len(json.dumps(arguments, default=str)))
+            if env:
+                arguments["env_override"] = env
+            result = await session.call_tool(self.tool_name, arguments=arguments)
+            content = pydantic_core.to_json(result.content).decode()
+            s.set(result_bytes=len(content), is_error=bool(result.isError))
         if result.isError:
             raise ToolException(content)
         return content
 
+class WithTimeout(MCPSessionFunction):
+    """Bounds another session function by a timeout, measured once a session is available."""
+
+    def __init__(self, fn: MCPSessionFunction, timeout: float | None):
+        self.fn = fn
+        self.timeout = timeout
+        self.phase = fn.phase
+        self.idempotent = fn.idempotent
+
+    async def __call__(self, server_name: str, env: dict, session: ClientSession) -> Any:
+        return await asyncio.wait_for(self.fn(server_name, env, session), timeout=self.timeout)
+
 # Utility function to infer transport from config
 def infer_transport_from_config(server_config: dict) -> str | None:
     if "command" in server_config:
@@ -111,53 +145,322 @@ def infer_transport_from_config(server_config: dict) -> str | None:
         return "streamable_http"
     return None
 
-async def apply(server_name: str, server_config: dict, fn: MCPSessionFunction) -> Any:
-    """Apply a function to an MCP server session, handling stdio, streamable_http, and sse transports.
-    
+_tool_catalog = ToolCatalogCache()
+
+def get_tool_catalog() -> ToolCatalogCache:
+    """Get the process-wide tool catalog cache."""
+    return _tool_catalog
+
+def _notification_handler(server_name: str):
+    """Build a ClientSession message handler that reacts to server notifications."""
+    async def handle(message) -> None:
+        if isinstance(message, mcp.types.ServerNotification) and isinstance(message.root, mcp.types.ToolListChangedNotification):
+            _tool_catalog.invalidate(server_name)
+    return handle
+
+@asynccontextmanager
+async def open_session(server_name: str, server_config: dict) -> AsyncIterator[ClientSession]:
+    """Open a transport to an MCP server and yield an initialized session.
+
+    Handles stdio, streamable_http, and sse transports. The session (and for stdio, the
+    server process) is closed when the context exits. Connecting is traced as an
+    `mcp.session.start` span, with the `initialize` handshake as its `mcp.initialize` child.
+    Starting the transport and the handshake are bounded by the server's `spawn` and
+    `initialize` timeouts (see `resilience.DEFAULT_TIMEOUTS`).
+
     Args:
         server_name: Name of the server to connect to
         server_config: Configuration for the server (should include 'transport', but can be inferred)
-        fn: Function to apply to the server session
     """
     env = server_config.get("env") or {}
-    transport = server_config.get("transport")
-    if not transport:
-        transport = infer_transport_from_config(server_config)
+    transport = get_transport(server_name, server_config)
+    handler = _notification_handler(server_name)
+
+    async with AsyncExitStack() as stack:
+        with span(SESSION_START, server=server_name, transport=transport):
+            async with asyncio.timeout(phase_timeout(server_config, "spawn")):
+                if transport == "stdio":
+                    server_params = StdioServerParameters(
+                        command=server_config["command"],
+                        args=server_config["args"],
+                        env={**os.environ, **env}
+                    )
+                    logger.info("Starting stdio session with (server: %s)", server_name, extra={"server": server_name, "transport": transport})
+                    read, write = await stack.enter_async_context(stdio_client(server_params))
+
+                elif transport == "streamable_http":
+                    url = server_config["url"]
+                    parsed = urlparse(url)
+                    if parsed.hostname and parsed.hostname.endswith("smithery.ai"):
+                        url = smithery.create_smithery_url(url, env) + f"&api_key={os.getenv('SMITHERY_API_KEY')}"
+                        logger.info("Starting Smithery (streamable_http) session with (server: %s)", server_name, extra={"server": server_name, "transport": transport})
+                    else:
+                        logger.info("Starting streamable_http session with (server: %s)", server_name, extra={"server": server_name, "transport": transport})
+                    read, write, _ = await stack.enter_async_context(streamablehttp_client(url))
+
+                else:  # sse
+                    logger.info("Starting SSE session with (server: %s)", server_name, extra={"server": server_name, "transport": transport})
+                    read, write = await stack.enter_async_context(sse_client(server_config["url"]))
+
+            session = await stack.enter_async_context(ClientSession(read, write, message_handler=handler))
+            with span(INITIALIZE, server=server_name):
+                async with asyncio.timeout(phase_timeout(server_config, "initialize")):
+                    await session.initialize()
+        yield session
+
+def get_transport(server_name: str, server_config: dict) -> str:
+    """Resolve the transport for a server, inferring it from the config when not specified."""
+    transport = server_config.get("transport") or infer_transport_from_config(server_config)
     if not transport:
         raise ValueError(f"No 'transport' specified and cannot be inferred from server_config for server '{server_name}'")
+    if transport not in ("stdio", "streamable_http", "sse"):
+        raise ValueError(f"Unknown transport '{transport}' for server '{server_name}'")
+    return transport
 
-    if transport == "stdio":
-        server_params = StdioServerParameters(
-            command=server_config["command"],
-            args=server_config["args"],
-            env={**os.environ, **env}
+_session_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, MCPSessionPool]" = weakref.WeakKeyDictionary()
+
+def get_session_pool() -> MCPSessionPool:
+    """Get the session pool of the running event loop (MCP sessions are bound to the loop that opened them)."""
+    loop = asyncio.get_running_loop()
+    pool = _session_pools.get(loop)
+    if pool is None:
+        pool = _session_pools[loop] = MCPSessionPool(open_session)
+    return pool
+
+_server_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ServerLimits]" = weakref.WeakKeyDictionary()
+
+def get_server_limits() -> ServerLimits:
+    """Get the per-server concurrency / rate limiters of the running event loop."""
+    loop = asyncio.get_running_loop()
+    limits = _server_limits.get(loop)
+    if limits is None:
+        limits = _server_limits[loop] = ServerLimits()
+    return limits
+
+async def apply(server_name: str, server_config: dict, fn: MCPSessionFunction) -> Any:
+    """Apply a function to an MCP server session, handling stdio, streamable_http, and sse transports.
+
+    Sessions are leased from the session pool of the running event loop, so the server
+    process / connection and the `initialize` handshake are reused across calls. Set
+    `"pool": {"enabled": false}` in the server config to connect per call instead.
+
+    With `"limits"` in the server config, calls also wait for a slot on the server (and,
+    for remote transports, for a rate limit token) and fail with `ServerBusyError` when the
+    queue is full or the wait times out; see `server_limits.ServerLimiter`.
+
+    The function is bounded by the server's timeout for its phase (`fn.phase`). Idempotent
+    functions (`fn.idempotent`) are retried with jittered backoff after transient failures
+    (`resilience.RetryPolicy`). Calls that still fail count towards the server's circuit
+    breaker; while it is open, calls fail fast with `CircuitOpenError`.
+
+    Args:
+        server_name: Name of the server to connect to
+        server_config: Configuration for the server (should include 'transport', but can be inferred)
+        fn: Function to apply to the server session
+    """
+    transport = get_transport(server_name, server_config)
+    # stdio servers get their env at spawn time; remote servers receive it with each call
+    env = {} if transport == "stdio" else (server_config.get("env") or {})
+
+    breaker = get_circuit_breakers().get(server_name, server_config)
+    if breaker is not None and not breaker.allow():
+        raise CircuitOpenError(
+            f"Server '{server_name}' is unavailable after {breaker.failures} failed calls; "
+            f"retrying in up to {breaker.reset_timeout} seconds"
         )
-        print(f"Starting stdio session with (server: {server_name})")
-        async with stdio_client(server_params) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                return await fn(server_name, {}, session)
-
-    elif transport == "streamable_http":
-        url = server_config["url"]
-        parsed = urlparse(url)
-        if parsed.hostname and parsed.hostname.endswith("smithery.ai"):
-            url = smithery.create_smithery_url(url, env) + f"&api_key={os.getenv('SMITHERY_API_KEY')}"
-            print(f"Starting Smithery (streamable_http) session with (server: {server_name})")
+    retry = RetryPolicy.from_config(server_config)
+    attempts = retry.attempts if fn.idempotent else 1
+    limiter = get_server_limits().limiter(server_name, server_config, transport)
+    timeout = phase_timeout(server_config, fn.phase)
+
+    for attempt in range(1, attempts + 1):
+        try:
+            if limiter is None:
+                result = await _apply(server_name, server_config, env, fn, timeout)
+            else:
+                async with limiter.slot(server_name):
+                    result = await _apply(server_name, server_config, env, fn, timeout)
+        except Exception as e:
+            if not is_transient(e):
+                if breaker is not None and not isinstance(e, ServerBusyError):
+                    # the server answered (e.g. with a tool error), so it is up
+                    breaker.record_success()
+                raise
+            if attempt == attempts:
+                if breaker is not None and breaker.record_failure():
+                    logger.warning(
+                        "Circuit of server '%s' opened after %d failed calls: %r", server_name, breaker.failures, unwrap(e),
+                        extra={"server": server_name},
+                    )
+                if unwrap(e) is not e:
+                    raise unwrap(e) from e
+                raise
+            delay = retry.delay(attempt)
+            logger.info(
+                "Retrying %s on server '%s' in %.2f seconds after %r", type(fn).__name__, server_name, delay, unwrap(e),
+                extra={"server": server_name},
+            )
+            await asyncio.sleep(delay)
         else:
-            print(f"Starting streamable_http session with (server: {server_name})")
-        async with streamablehttp_client(url) as (read_stream, write_stream, _):
-            async with mcp.ClientSession(read_stream, write_stream) as session:
-                await session.initialize()
-                return await fn(server_name, env, session)
-
-    elif transport == "sse":
-        url = server_config["url"]
-        print(f"Starting SSE session with (server: {server_name})")
-        async with sse_client(url) as (read_stream, write_stream, _):
-            async with mcp.ClientSession(read_stream, write_stream) as session:
-                await session.initialize()
-                return await fn(server_name, env, session)
-
-    else:
-        raise ValueError(f"Unknown transport '{transport}' for server '{server_name}'")
+            if breaker is not None:
+                breaker.record_success()
+            return result
+
+
+async def _apply(server_name: str, server_config: dict, env: dict, fn: MCPSessionFunction, timeout: float | None) -> Any:
+    async def call(session: ClientSession) -> Any:
+        async with asyncio.timeout(timeout):
+            return await fn(server_name, env, session)
+
+    if (server_config.get("pool") or {}).get("enabled", True) is False:
+        async with open_session(server_name, server_config) as session:
+            return await call(session)
+
+    return await get_session_pool().run(server_name, server_config, call)
+
+async def get_tools(server_name: str, server_config: dict) -> list[dict[str, Any]]:
+    """Get the tools of an MCP server, converted for `bind_tools`, from the tool catalog cache.
+
+    Equivalent to `apply(server_name, server_config, GetTools())`, but repeated calls reuse
+    the cached catalog until its TTL expires or the server reports `tools/list_changed`.
+    """
+    entry = await _tool_catalog.get(
+        server_name, server_config, lambda: apply(server_name, server_config, ListTools())
+    )
+    return list(entry.tools)
+
+_tool_result_cache = ToolResultCache()
+
+def get_tool_result_cache() -> ToolResultCache:
+    """Get the process-wide cache of idempotent tool call results."""
+    return _tool_result_cache
+
+async def _tool_annotations(server_name: str, server_config: dict) -> dict[str, Any]:
+    """MCP annotations (`readOnlyHint`, ...) of the server's tools, by tool name."""
+    return await _tool_catalog.annotations(
+        server_name, server_config, lambda: apply(server_name, server_config, ListTools())
+    )
+
+# Defaults for dispatching the tool calls of one AIMessage; override per server with
+# `"tool_calls": {"max_concurrency": <n>, "timeout": <seconds>}` in the server config.
+DEFAULT_TOOL_CALL_CONCURRENCY = 4
+DEFAULT_TOOL_CALL_TIMEOUT = 120.0
+
+def read_tool_result(tool_call: ToolCall) -> ToolMessage:
+    """Serve a call to the built-in `read_tool_result` tool from the blob store."""
+    args = tool_call['args']
+    try:
+        content = get_blob_store().read(
+            args['blob_id'], int(args.get('offset', 0)), int(args.get('length', DEFAULT_READ_LENGTH))
+        )
+    except Exception as e:
+        content = f"Error: {e}"
+    return ToolMessage(content=content, name=tool_call['name'], tool_call_id=tool_call['id'])
+
+async def run_tool_calls(server_name: str, server_config: dict, tool_calls: list[ToolCall]) -> list[ToolMessage]:
+    """Run the tool calls of an AIMessage concurrently against one MCP server.
+
+    Calls are dispatched together (at most `max_concurrency` in flight) and each is bounded
+    by a per-call timeout (not counting the time to open a session). A failed or timed-out
+    call yields an error `ToolMessage` rather than failing the batch, so the model gets one
+    `ToolMessage` per call, in call order.
+
+    Results larger than the server's offload threshold are stored in the blob store and
+    replaced by a handle + preview (see `blob_store.offload`). Calls to the built-in
+    `read_tool_result` tool are served from the blob store without contacting the server.
+
+    With `"result_cache"` in the server config, results of idempotent tools are served from
+    the tool result cache (see `tool_result_cache.ToolResultCache`).
+
+    Calls of tools the server annotates as read-only or idempotent are retried after
+    transient failures (see `apply`); other calls run once.
+    """
+    calls_cfg = server_config.get("tool_calls") or {}
+    semaphore = asyncio.Semaphore(int(calls_cfg.get("max_concurrency", DEFAULT_TOOL_CALL_CONCURRENCY)))
+    timeout = calls_cfg.get("timeout", DEFAULT_TOOL_CALL_TIMEOUT)
+    caching = ToolResultCache.enabled(server_config)
+    retrying = RetryPolicy.from_config(server_config).attempts > 1
+    # annotations tell which tools are read-only (cacheable) or idempotent (retryable)
+    annotations: dict[str, Any] = {}
+    if caching or retrying:
+        try:
+            annotations = await _tool_annotations(server_name, server_config)
+        except Exception as e:
+            # the calls report the server's failure themselves
+            logger.debug("Failed to list the tools of server '%s': %r", server_name, e, extra={"server": server_name})
+
+    async def call(tool_call: ToolCall) -> str:
+        run_tool = RunTool(tool_call['name'], **tool_call['args'])
+        run_tool.idempotent = is_idempotent(annotations.get(tool_call['name']))
+        async with semaphore:
+            try:
+                return await apply(server_name, server_config, WithTimeout(run_tool, timeout))
+            except asyncio.TimeoutError:
+                return f"Error: tool '{tool_call['name']}' timed out after {timeout} seconds"
+            except Exception as e:
+                return f"Error: {e}"
+
+    async def cached_call(tool_call: ToolCall) -> str:
+        tool_annotations = annotations.get(tool_call['name'])
+        ttl = _tool_result_cache.ttl_for(server_config, tool_call['name'], tool_annotations)
+        if not ttl:
+            content = await call(tool_call)
+            if not is_read_only(tool_annotations):
+                # the call may have changed what the server's other tools return
+                _tool_result_cache.invalidate(server_name)
+            return content
+        key = _tool_result_cache.key(server_name, server_config, tool_call['name'], tool_call['args'])
+        content = _tool_result_cache.get(key)
+        if content is None:
+            # a mutating call of the same batch may invalidate the server while this one runs
+            generation = _tool_result_cache.generation(server_name)
+            content = await call(tool_call)
+            if not content.startswith("Error:"):
+                _tool_result_cache.set(key, content, ttl, generation)
+        return content
+
+    async def run(tool_call: ToolCall) -> ToolMessage:
+        if tool_call['name'] == READ_TOOL_RESULT_TOOL_NAME:
+            return read_tool_result(tool_call)
+        content = await (cached_call(tool_call) if caching else call(tool_call))
+        # Large results are stored once in the blob store; state only keeps a handle + preview
+        content, handle = await asyncio.to_thread(offload, content, server_config)
+        return ToolMessage(
+            content=content,
+            name=tool_call['name'],
+            tool_call_id=tool_call['id'],
+            artifact=handle.to_artifact() if handle else None,
+        )
+
+    return list(await asyncio.gather(*(run(tool_call) for tool_call in tool_calls)))
+
+async def describe_servers(mcp_server_config: dict[str, dict], timeout: float = 30.0) -> dict[str, str]:
+    """Get the routing description of every configured server, concurrently.
+
+    All servers are queried at once, so discovery takes as long as the slowest server
+    rather than the sum of all of them. Each server is bounded by `timeout` seconds
+    (including connecting to it); servers that fail or time out are left out of the result.
+
+    Args:
+        mcp_server_config: Dictionary mapping MCP server name to its configuration
+        timeout: Per-server timeout in seconds
+
+    Returns:
+        Dictionary mapping server name to its routing description
+    """
+    async def describe(server_name: str, server_config: dict) -> tuple[str, str]:
+        return await asyncio.wait_for(apply(server_name, server_config, RoutingDescription()), timeout=timeout)
+
+    server_names = list(mcp_server_config)
+    results = await asyncio.gather(
+        *(describe(name, mcp_server_config[name]) for name in server_names), return_exceptions=True
+    )
+    descriptions: dict[str, str] = {}
+    for server_name, result in zip(server_names, results):
+        if isinstance(result, asyncio.TimeoutError):
+            logger.warning("Timed out describing server '%s' after %s seconds", server_name, timeout, extra={"server": server_name})
+        elif isinstance(result, BaseException):
+            logger.warning("Failed to describe server '%s': %r", server_name, result, extra={"server": server_name})
+        else:
+            descriptions[server_name] = result[1]
+    return descriptions
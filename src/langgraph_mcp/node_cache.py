@@ -0,0 +1,218 @@
+import dataclasses
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any, Callable, Type
+
+from langchain_core.messages import AIMessage, AnyMessage, BaseMessage
+from langchain_core.runnables import RunnableConfig, ensure_config
+from langgraph.cache.base import BaseCache, FullKey, Namespace, ValueT
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from pydantic import BaseModel
+
+
+def configurable_fingerprint(config: RunnableConfig | None, config_cls: Type) -> str:
+    """Stable hash of the assistant configuration in `config`.
+
+    Only keys that are fields of `config_cls` are considered, so per-run keys such as
+    `thread_id` or `checkpoint_id` don't change the fingerprint.
+    """
+    configurable = ensure_config(config).get("configurable") or {}
+    _fields = {f.name for f in dataclasses.fields(config_cls) if f.init}
+    payload = json.dumps({k: v for k, v in configurable.items() if k in _fields}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def config_fingerprint_node(config_cls: Type) -> Callable[..., dict[str, Any]]:
+    """Build a graph node that records the assistant configuration fingerprint in state.
+
+    Node cache keys are computed from state alone, so graphs run this node first to make
+    the fingerprint part of the key and keep assistants with different configurations
+    from sharing cached node results.
+    """
+    def fingerprint_config(state: Any, *, config: RunnableConfig) -> dict[str, Any]:
+        return {"config_fingerprint": configurable_fingerprint(config, config_cls)}
+    return fingerprint_config
+
+
+# `response_metadata` key marking a message that must not be replayed from the node cache
+NO_CACHE = "langgraph_mcp_no_cache"
+
+
+def uncacheable(message: AIMessage) -> AIMessage:
+    """Keep the node output holding `message` out of the node cache (e.g. a transient failure)."""
+    message.response_metadata[NO_CACHE] = True
+    return message
+
+
+def _written_messages(writes: Any) -> Iterator[BaseMessage]:
+    # node writes are a deque of (channel, value) pairs; a message channel value is a
+    # message or a list of them
+    for write in writes if isinstance(writes, (list, tuple, deque)) else ():
+        value = write[1] if isinstance(write, (list, tuple)) and len(write) == 2 else None
+        for item in value if isinstance(value, list) else [value]:
+            if isinstance(item, BaseMessage):
+                yield item
+
+
+def _cacheable(writes: Any) -> bool:
+    return not any(message.response_metadata.get(NO_CACHE) for message in _written_messages(writes))
+
+
+def _with_fresh_ids(writes: Any) -> Any:
+    # replayed messages keep the ids of the run that stored them, and `add_messages` replaces
+    # messages by id: without new ids a repeated turn in a thread would overwrite the earlier one
+    for message in _written_messages(writes):
+        message.id = str(uuid.uuid4())
+    return writes
+
+
+def _message_fingerprint(message: AnyMessage) -> dict[str, Any]:
+    # Message and tool call ids are random per run, so leave them out to let
+    # identical conversations in different threads hit the same entry.
+    return {
+        "type": message.type,
+        "content": message.content,
+        "tool_calls": [
+            {"name": tool_call["name"], "args": tool_call["args"]}
+            for tool_call in getattr(message, "tool_calls", None) or []
+        ],
+    }
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return value
+
+
+def state_cache_key(last_n_messages: int | None = 8, extra: Callable[[], Any] | None = None) -> Callable[[Any], str]:
+    """Build a cache key function over the parts of state a node's output depends on.
+
+    The key hashes the content of the last `last_n_messages` messages (all of them if
+    None) together with every other state field (plan, current task, config fingerprint,
+    ...), ignoring message ids so that it can hit across threads. `extra()`, if given, adds
+    what the node depends on outside of state (e.g. which experts are unavailable).
+    """
+    def key(state: Any) -> str:
+        values = state if isinstance(state, Mapping) else {
+            f.name: getattr(state, f.name) for f in dataclasses.fields(state)
+        }
+        messages = list(values.get("messages") or [])
+        if last_n_messages is not None:
+            messages = messages[-last_n_messages:]
+        payload = {
+            **{k: _jsonable(v) for k, v in values.items() if k != "messages"},
+            "messages": [_message_fingerprint(m) for m in messages],
+        }
+        if extra is not None:
+            payload["__extra__"] = _jsonable(extra())
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+    return key
+
+
+@dataclass
+class NodeCacheStats:
+    """Cache counters of one node."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
+class BoundedInMemoryCache(BaseCache[ValueT]):
+    """In-memory LangGraph node cache with an LRU bound and per-node hit/miss metrics.
+
+    Drop-in replacement for `langgraph.cache.memory.InMemoryCache` for long running
+    servers: at most `max_entries` results are kept (least recently used are evicted
+    first) and expired entries are dropped on access. TTLs come from each node's
+    `CachePolicy`. Outputs holding a message marked with `uncacheable` are not stored, and
+    messages are given new ids each time they are replayed.
+    """
+
+    def __init__(self, *, max_entries: int = 1024, serde: SerializerProtocol | None = None):
+        super().__init__(serde=serde)
+        self.max_entries = max_entries
+        self._cache: OrderedDict[tuple[Namespace, str], tuple[str, bytes, float | None]] = OrderedDict()
+        self._stats: dict[str, NodeCacheStats] = {}
+        self._lock = threading.RLock()
+
+    def _node_stats(self, ns: Namespace) -> NodeCacheStats:
+        # LangGraph namespaces node writes as (CACHE_NS_WRITES, <identifier>, <node name>)
+        node = ns[-1] if ns else ""
+        return self._stats.setdefault(node, NodeCacheStats())
+
+    def get(self, keys: Sequence[FullKey]) -> dict[FullKey, ValueT]:
+        """Get the cached values for the given keys."""
+        with self._lock:
+            now = time.time()
+            values: dict[FullKey, ValueT] = {}
+            for ns_tuple, key in keys:
+                ns = Namespace(ns_tuple)
+                stats = self._node_stats(ns)
+                entry = self._cache.get((ns, key))
+                if entry is not None and entry[2] is not None and now >= entry[2]:
+                    del self._cache[(ns, key)]
+                    stats.expirations += 1
+                    entry = None
+                if entry is None:
+                    stats.misses += 1
+                    continue
+                self._cache.move_to_end((ns, key))
+                stats.hits += 1
+                values[(ns, key)] = _with_fresh_ids(self.serde.loads_typed((entry[0], entry[1])))
+            return values
+
+    async def aget(self, keys: Sequence[FullKey]) -> dict[FullKey, ValueT]:
+        """Asynchronously get the cached values for the given keys."""
+        return self.get(keys)
+
+    def set(self, pairs: Mapping[FullKey, tuple[ValueT, int | None]]) -> None:
+        """Set the cached values for the given keys and TTLs."""
+        with self._lock:
+            now = time.time()
+            for (ns_tuple, key), (value, ttl) in pairs.items():
+                if not _cacheable(value):
+                    continue
+                ns = Namespace(ns_tuple)
+                expiry = now + ttl if ttl is not None else None
+                self._cache[(ns, key)] = (*self.serde.dumps_typed(value), expiry)
+                self._cache.move_to_end((ns, key))
+            while len(self._cache) > self.max_entries:
+                (ns, _), _ = self._cache.popitem(last=False)
+                self._node_stats(ns).evictions += 1
+
+    async def aset(self, pairs: Mapping[FullKey, tuple[ValueT, int | None]]) -> None:
+        """Asynchronously set the cached values for the given keys and TTLs."""
+        self.set(pairs)
+
+    def clear(self, namespaces: Sequence[Namespace] | None = None) -> None:
+        """Delete the cached values for the given namespaces.
+        If no namespaces are provided, clear all cached values."""
+        with self._lock:
+            if namespaces is None:
+                self._cache.clear()
+                return
+            drop = {Namespace(ns) for ns in namespaces}
+            for full_key in [k for k in self._cache if k[0] in drop]:
+                del self._cache[full_key]
+
+    async def aclear(self, namespaces: Sequence[Namespace] | None = None) -> None:
+        """Asynchronously delete the cached values for the given namespaces.
+        If no namespaces are provided, clear all cached values."""
+        self.clear(namespaces)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Per-node hit/miss/eviction counters and current size of the cache."""
+        with self._lock:
+            return {
+                "size": len(self._cache),
+                "max_entries": self.max_entries,
+                "nodes": {node: dataclasses.asdict(stats) for node, stats in self._stats.items()},
+            }
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field, fields
-from typing import Annotated, Any, Dict, Optional, Type, TypeVar
+from typing import Annotated, Any, Dict, Iterable, Optional, Type, TypeVar
 from langchain_core.runnables import RunnableConfig, ensure_config
 
 from langgraph_mcp.planner_style import prompts
@@ -50,6 +50,53 @@ class Configuration:
         },
     )
 
+    context_max_messages: Optional[int] = field(
+        default=None,
+        metadata={"description": "Maximum number of recent messages the LLM nodes send to their models. None keeps the whole conversation."},
+    )
+
+    context_max_tokens: Optional[int] = field(
+        default=None,
+        metadata={"description": "Approximate token budget for the recent messages the LLM nodes send to their models. None means no budget."},
+    )
+
+    context_windows: dict[str, dict[str, int]] = field(
+        default_factory=dict,
+        metadata={"description": "Per-node overrides of the context window, e.g. {\"respond\": {\"max_messages\": 40}}. Keys: max_messages, max_tokens."},
+    )
+
+    context_summary_model: Annotated[Optional[str], {"__template_metadata__": {"kind": "llm"}}] = field(
+        default=None,
+        metadata={
+            "description": "The language model used to keep a rolling summary of messages that slide out of the context window. None drops them without a summary. Should be in the form: provider/model-name."
+        },
+    )
+
+    execute_task_tools_top_k: Optional[int] = field(
+        default=None,
+        metadata={"description": "Number of an expert's tools, ranked by relevance to the current task, bound to the model in execute_task (all tools are bound after an IDK answer). None binds every tool."},
+    )
+
+    planner_experts_top_k: Optional[int] = field(
+        default=None,
+        metadata={"description": "Number of experts, ranked by relevance to the conversation, listed in the planner prompt (experts of the current plan are always listed). None lists every configured expert."},
+    )
+
+    parallel_tasks: bool = field(
+        default=False,
+        metadata={"description": "Execute the plan's tasks concurrently where their dependencies allow (tasks without `depends_on` edges between them run at the same time), instead of one task after another."},
+    )
+
+    parallel_task_max_steps: int = field(
+        default=10,
+        metadata={"description": "Maximum number of model calls of a task executed in the parallel_tasks mode."},
+    )
+
+    speculative_tool_prefetch: bool = field(
+        default=False,
+        metadata={"description": "While the planner model runs, open the sessions and load the tools of the experts it is likely to pick (the current task's expert, and experts as the plan streams in); guesses that turn out wrong are cancelled."},
+    )
+
     @classmethod
     def from_runnable_config(
         cls: Type[T], config: Optional[RunnableConfig] = None
@@ -68,15 +115,18 @@ class Configuration:
         _fields = {f.name for f in fields(cls) if f.init}
         return cls(**{k: v for k, v in configurable.items() if k in _fields})
     
-    def get_mcp_server_descriptions(self) -> list[tuple[str, str]]:
-        """Get a list of descriptions of all MCP servers in the specified configuration."""
+    def get_mcp_server_descriptions(self, server_names: Optional[Iterable[str]] = None) -> list[tuple[str, str]]:
+        """Get a list of descriptions of the MCP servers in the specified configuration (all of them by default)."""
         descriptions = []
+        selected = set(server_names) if server_names is not None else None
         for server_name, server_config in self.mcp_server_config.items():
+            if selected is not None and server_name not in selected:
+                continue
             description = server_config.get('description', '')
             descriptions.append((server_name, description))
         return descriptions
     
-    def build_experts_context(self) -> str:
+    def build_experts_context(self, server_names: Optional[Iterable[str]] = None) -> str:
         """Build the experts part of the prompt for the planning task.
         
         Here's the format to use:
@@ -84,10 +134,13 @@ class Configuration:
         - <server_name>: <server_description>
         ...
 
+        Args:
+            server_names (Optional[Iterable[str]]): Experts to include; all of them if None.
+
         Returns:
             str: The experts part of the prompt.
         """
-        return "\n".join([f"- {server_name}: {server_description}" for server_name, server_description in self.get_mcp_server_descriptions()])
+        return "\n".join([f"- {server_name}: {server_description}" for server_name, server_description in self.get_mcp_server_descriptions(server_names)])
     
     def get_server_config(self, server_name: str) -> Dict[str, Any] | None:
         """Get server configuration for the specified server.
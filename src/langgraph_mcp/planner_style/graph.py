@@ -1,24 +1,32 @@
 # src/langgraph_mcp/planner_style/graph.py
 
+import json
+from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
 from typing import Any, Dict
 
-from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
-from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.runnables import RunnableConfig
 
-from langgraph.cache.memory import InMemoryCache
 from langgraph.graph import StateGraph, START, END
-from langgraph.types import CachePolicy
+from langgraph.types import CachePolicy, Send
 
+from langgraph_mcp.blob_store import READ_TOOL_RESULT_TOOL, has_offloaded_results
+from langgraph_mcp.compiled_context import get_compiled_context
+from langgraph_mcp.context_window import manage_context
 from langgraph_mcp.state import InputState
-from langgraph_mcp.mcp_wrapper import apply, GetTools, RunTool
-from langgraph_mcp.utils import load_chat_model
+from langgraph_mcp.mcp_wrapper import get_tools, run_tool_calls
+from langgraph_mcp.node_cache import BoundedInMemoryCache, config_fingerprint_node, state_cache_key, uncacheable
+from langgraph_mcp.resilience import EXPERT_UNAVAILABLE, is_unavailable, unavailable_experts, unwrap
+from langgraph_mcp.retrieval import select_experts, select_tools
+from langgraph_mcp.tool_prefetch import ToolPrefetch
+from langgraph_mcp.utils import get_message_text, load_chat_model, stream_model_response
 
 from langgraph_mcp.mcp_react_graph import make_graph
+from langgraph_mcp.subgraph_sessions import SubgraphSessionsBusyError, get_subgraph_session_manager
 
 from langgraph_mcp.planner_style.config import Configuration
-from langgraph_mcp.planner_style.state import PlannerResult, State
+from langgraph_mcp.planner_style.state import PlannerResult, State, TaskBranch, TaskOutcome
 
 # Tags for special message responses
 ASK_USER_FOR_INFO_TAG = "[ASK_USER]"
@@ -28,51 +36,166 @@ IDK_TAG = "[IDK]"
 EXPERTS_NEEDING_MULTI_GRAPH_RUNS_WITHIN_AN_MCP_SESSION = ["playwright"]
 
 
+@dataclass
+class PlannerStats:
+    """Counts of how the planner node advanced the plan."""
+
+    llm_calls: int = 0
+    """Plans built or revised by the planner model."""
+
+    skipped: int = 0
+    """Advances to the next task of a still valid plan, without the planner model."""
+
+
+planner_stats = PlannerStats()
+
+
+def get_planner_stats() -> dict[str, Any]:
+    """Counters of the planner node since process start."""
+    return asdict(planner_stats)
+
+
 async def planner(state: State, *, config: RunnableConfig) -> Dict[str, Any]:
     """Build the plan or advance to the next task."""
-    
+    compiled = get_compiled_context(config, Configuration, state.config_fingerprint)
+    cfg = compiled.cfg
+    current = state.planner_result
+    result: Dict[str, Any] = {}
+    # experts whose servers keep failing are left out until their circuit breaker recovers,
+    # and experts whose server failed during this turn for the rest of the turn
+    unavailable = unavailable_experts(cfg.mcp_server_config, state.messages)
+
     # If a task was just completed, advance to the next task.
-    if state.task_completed and state.planner_result:
-        planner_result = state.planner_result.model_copy()
-        planner_result.next_task += 1
-        planner_result.decision = "continue"  # continue with the plan
-        return {
-            "planner_result": planner_result,
+    if state.task_completed and current:
+        current = current.model_copy(update={"next_task": current.next_task + 1, "decision": "continue"})
+        result = {
+            "planner_result": current,
             "task_completed": False,  # Reset task completion status
         }
+        # The remaining plan stays valid as long as its experts are still available
+        if all(
+            compiled.get_server_config(task.expert) and task.expert not in unavailable
+            for task in current.plan[current.next_task:]
+        ):
+            planner_stats.skipped += 1
+            return result
 
     # Let LLM build a plan or reflect on why the current task is not complete
-    # plan / re-plan / clarify
-    cfg = Configuration.from_runnable_config(config)
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", cfg.planner_system_prompt),
-        ("placeholder", "{messages}")
-    ])
+    # plan / amend / re-plan / clarify
+    prompt = compiled.prompts["planner"]
     model = load_chat_model(cfg.planner_model)
-    experts = cfg.build_experts_context()
+    experts = compiled.experts
+    selected = None
+    if cfg.planner_experts_top_k:
+        # only list the experts relevant to the conversation (and the ones of the current plan)
+        current_plan = current.plan if current else []
+        selected = await select_experts(
+            cfg.mcp_server_config, compiled.fingerprint, state.messages,
+            cfg.planner_experts_top_k, keep=[task.expert for task in current_plan],
+        )
+        experts = cfg.build_experts_context(selected)
+    if unavailable:
+        names = selected if selected is not None else cfg.mcp_server_config
+        experts = cfg.build_experts_context([name for name in names if name not in unavailable])
+        experts += f"\n\nCurrently unavailable (do not plan tasks for them): {', '.join(unavailable)}"
+    messages, update = await manage_context(state.messages, state.conversation_summary, cfg, "planner", config)
+    result.update(update)
+    # the planner sees the current plan and its progress, so it can keep or amend it
+    done = set(range(current.next_task)) if current else set()
+    outcomes = state.task_outcomes
+    if current and cfg.parallel_tasks:
+        done |= {i for i, outcome in outcomes.items() if outcome == "complete"}
+        if done != set(range(len(done))):
+            # tasks after `next_task` finished concurrently: list them with the other done tasks,
+            # so that an amended plan keeps them
+            current = current.done_first(done)
+            done = set(range(current.next_task))
+            outcomes = {i: "complete" for i in done}
     context = await prompt.ainvoke(
         {
-            "messages": state.messages,
+            "messages": messages,
             "experts": experts,
-            "plan": [],
+            "plan": json.dumps(current.progress(done) if current else [], indent=2),
             "system_time": datetime.now(tz=timezone.utc).isoformat(),
         },
         config,
     )
-    response = await model.with_structured_output(PlannerResult).ainvoke(context, config)
-    result: Dict[str, Any] = {"planner_result": response}
+    structured = model.with_structured_output(PlannerResult)
+    prefetch = ToolPrefetch(compiled.get_server_config) if cfg.speculative_tool_prefetch else None
+    if prefetch:
+        # overlap opening the next expert's session and loading its tools with the planner LLM
+        if current and (task := current.get_current_task()):
+            prefetch.guess(task.expert)
+        try:
+            response = await prefetch.run(structured, context, config)
+        except BaseException:
+            prefetch.settle(())
+            raise
+    else:
+        response = await structured.ainvoke(context, config)
+    planner_stats.llm_calls += 1
+    if isinstance(response, PlannerResult) and current:
+        response = current.apply_update(response)
+    if prefetch:
+        remaining = response.plan[response.next_task:] if isinstance(response, PlannerResult) else []
+        prefetch.settle([task.expert for task in remaining])
+    result["planner_result"] = response
+    if cfg.parallel_tasks and isinstance(response, PlannerResult):
+        if response.decision != "continue":
+            result["task_outcomes"] = None  # outcomes belong to the replaced tasks
+        else:
+            # unfinished tasks are dispatched again: their last outcome must not end this turn
+            result["task_outcomes"] = {
+                **{i: None for i in state.task_outcomes},
+                **{i: outcome for i, outcome in outcomes.items() if outcome == "complete"},
+            }
     if isinstance(response, PlannerResult) and response.clarification:
         result["messages"] = [AIMessage(content=response.clarification)]
     return result
 
-def decide_planner_edge(state: State) -> str:
+def decide_task_node(state: State) -> str:
+    """The node executing the current task: experts run in a react subgraph get their own, uncached, node."""
+    task = state.planner_result.get_current_task() if state.planner_result else None
+    if task and task.expert in EXPERTS_NEEDING_MULTI_GRAPH_RUNS_WITHIN_AN_MCP_SESSION:
+        return "execute_subgraph_task"
+    return "execute_task"
+
+
+def decide_planner_edge(state: State, config: RunnableConfig) -> str | list[Send]:
     if state.planner_result and state.planner_result.get_current_task():
         # there is a task to execute next
-        return "execute_task"
+        if get_compiled_context(config, Configuration, state.config_fingerprint).cfg.parallel_tasks:
+            return dispatch_ready_tasks(state)
+        return decide_task_node(state)
     # couldn't plan # no task to execute next, so we need to respond to the user
     return "respond"
 
 
+async def run_subgraph(task_expert: str, server_cfg: dict, messages: list, cfg: Configuration, config: RunnableConfig) -> list:
+    """Run the react agent of an expert that needs several graph runs within one MCP session."""
+    subgraph_model = cfg.execute_task_model.replace('/', ':')
+    thread_id = (config.get("configurable") or {}).get("thread_id")
+    if thread_id:
+        # keep the browser (and its pages) of this thread alive across tasks and turns
+        session = get_subgraph_session_manager(make_graph).lease(str(thread_id), subgraph_model, task_expert, server_cfg)
+    else:
+        session = make_graph(subgraph_model, task_expert, server_cfg)
+    async with session as subgraph:
+        subgraph_result = await subgraph.ainvoke({"messages": messages})
+        return subgraph_result["messages"][len(messages):]
+
+
+def expert_unavailable_message(expert: str, error: BaseException) -> AIMessage:
+    """The IDK answer of a task whose expert's server can't be reached; sends the planner back to work.
+
+    Kept out of the node cache, so the task runs again once the server recovers.
+    """
+    return uncacheable(AIMessage(
+        content=f'{IDK_TAG} The expert {expert} is unavailable ({type(unwrap(error)).__name__}: {unwrap(error)}).',
+        response_metadata={EXPERT_UNAVAILABLE: expert},
+    ))
+
+
 async def execute_task(state: State, *, config: RunnableConfig) -> Dict[str, Any]:
     if not state.planner_result:
         return {"messages": [AIMessage(content='We should not be in execute_task node without a plan.')]}
@@ -84,33 +207,32 @@ async def execute_task(state: State, *, config: RunnableConfig) -> Dict[str, Any
     task_expert = task.expert
     task_description = task.task
 
-    cfg = Configuration.from_runnable_config(config)
-    server_cfg = cfg.get_server_config(task_expert)  # expert mcp server config
+    compiled = get_compiled_context(config, Configuration, state.config_fingerprint)
+    cfg = compiled.cfg
+    server_cfg = compiled.get_server_config(task_expert)  # expert mcp server config
     if not server_cfg:
         return {"messages": [AIMessage(content=f'No configuration found for the expert {task_expert}.')]}
 
-    tools = await apply(task_description, server_cfg, GetTools()) if server_cfg else []  # expert tools list
+    try:
+        tools = await get_tools(task_expert, server_cfg)  # expert tools list
+    except Exception as e:
+        if not is_unavailable(e):
+            raise
+        return {"messages": [expert_unavailable_message(task_expert, e)]}
     if not tools:
         return {"messages": [AIMessage(content=f'No tools available with the expert {task_expert}.')]}
-    
-    #######################################################################
-    if task_expert in EXPERTS_NEEDING_MULTI_GRAPH_RUNS_WITHIN_AN_MCP_SESSION:
-        async with make_graph(cfg.execute_task_model.replace('/', ':'), task_expert, server_cfg) as subgraph:
-            subgraph_result = await subgraph.ainvoke({"messages": state.messages})
-            return {
-                "messages": subgraph_result["messages"][len(state.messages):],
-                "task_completed": True
-            }
-    #######################################################################
-    
+    if cfg.execute_task_tools_top_k:
+        # bind only the tools relevant to the task; all of them once the expert answered IDK
+        tools = select_tools(task_expert, tools, task_description, state.messages, cfg.execute_task_tools_top_k, IDK_TAG)
+    if has_offloaded_results(state.messages):
+        tools = tools + [READ_TOOL_RESULT_TOOL]  # lets the model page through large stored results
+
     model = load_chat_model(cfg.execute_task_model)
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", cfg.execute_task_system_prompt),
-        ("placeholder", "{messages}")
-    ])
+    prompt = compiled.prompts["execute_task"]
+    messages, result = await manage_context(state.messages, state.conversation_summary, cfg, "execute_task", config)
     context = await prompt.ainvoke(
         {
-            "messages": state.messages,
+            "messages": messages,
             "expert": task_expert,
             "task": task_description,
             "ask_user_for_info_tag": ASK_USER_FOR_INFO_TAG,
@@ -120,14 +242,40 @@ async def execute_task(state: State, *, config: RunnableConfig) -> Dict[str, Any
         },
         config
     )
-    response = await model.bind_tools(tools).ainvoke(context, config)
-    result: Dict[str, Any] = {"messages": [response]}
+    # stream, so that tokens and the outcome tag reach the client as soon as they are generated
+    response = await stream_model_response(
+        model.bind_tools(tools), context, config, tags=[ASK_USER_FOR_INFO_TAG, TASK_COMPLETE_TAG, IDK_TAG]
+    )
+    result["messages"] = [response]
     if isinstance(response, AIMessage):
         if content := response.content:
             if TASK_COMPLETE_TAG in content:
                 result["task_completed"] = True
     return result
 
+async def execute_subgraph_task(state: State, *, config: RunnableConfig) -> Dict[str, Any]:
+    """Execute the current task in the expert's react subgraph (e.g. a playwright browser session).
+
+    Kept apart from `execute_task` because its side effects (on the browser) must not be
+    replayed from the node cache.
+    """
+    task = state.planner_result.get_current_task() if state.planner_result else None
+    if not task:
+        return {"messages": [AIMessage(content='We should not be in execute_subgraph_task node without a current task.')]}
+    compiled = get_compiled_context(config, Configuration, state.config_fingerprint)
+    server_cfg = compiled.get_server_config(task.expert)
+    if not server_cfg:
+        return {"messages": [AIMessage(content=f'No configuration found for the expert {task.expert}.')]}
+    try:
+        messages = await run_subgraph(task.expert, server_cfg, state.messages, compiled.cfg, config)
+    except SubgraphSessionsBusyError as e:
+        return {"messages": [expert_unavailable_message(task.expert, e)]}
+    return {
+        "messages": messages,
+        "task_completed": True
+    }
+
+
 def decide_execute_task_edge(state: State) -> str:
     """
     Routing the outcomes of the execute_task node.
@@ -160,26 +308,20 @@ async def tools(state: State, *, config: RunnableConfig) -> Dict[str, Any]:
     if not isinstance(last_message, AIMessage) or not hasattr(last_message, 'tool_calls') or not last_message.tool_calls:
         return {"messages": [AIMessage(content="Error: We should not be in tools node without tool_calls.")]}
     
-    tool_call = last_message.tool_calls[0]  # TODO: handle multiple tool calls
-    
     task = state.planner_result.get_current_task()
     if not task:
         return {"messages": [AIMessage(content='We should not be in tools node without a current task.')]}
 
     task_expert = task.expert
 
-    cfg = Configuration.from_runnable_config(config)
-    server_cfg = cfg.get_server_config(task_expert)  # expert mcp server config
+    compiled = get_compiled_context(config, Configuration, state.config_fingerprint)
+    server_cfg = compiled.get_server_config(task_expert)  # expert mcp server config
     if not server_cfg:
         return {"messages": [AIMessage(content=f'No configuration found for the expert {task_expert}.')]}
 
-    # RunTool could raise an exception, so we need to handle it
-    try:
-        tool_output = await apply(task_expert, server_cfg, RunTool(tool_call['name'], **tool_call['args']))
-    except Exception as e:
-        tool_output = f"Error: {e}"
-
-    return {"messages": [ToolMessage(content=tool_output, tool_call_id=tool_call['id'])]}
+    # All tool calls of the message run concurrently; failures come back as error ToolMessages
+    tool_messages = await run_tool_calls(task_expert, server_cfg, last_message.tool_calls)
+    return {"messages": tool_messages}
 
 
 def human_input(state: State, *, config: RunnableConfig) -> Dict[str, Any]:
@@ -188,41 +330,180 @@ def human_input(state: State, *, config: RunnableConfig) -> Dict[str, Any]:
 
 
 async def respond(state: State, *, config: RunnableConfig) -> Dict[str, Any]:
-    cfg = Configuration.from_runnable_config(config)
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", cfg.generate_response_system_prompt),
-        ("placeholder", "{messages}")
-    ])
+    compiled = get_compiled_context(config, Configuration, state.config_fingerprint)
+    cfg = compiled.cfg
+    prompt = compiled.prompts["generate_response"]
+    messages, result = await manage_context(state.messages, state.conversation_summary, cfg, "respond", config)
     context = await prompt.ainvoke(
-        {"messages": state.messages, "system_time": datetime.now(tz=timezone.utc).isoformat()},
+        {"messages": messages, "system_time": datetime.now(tz=timezone.utc).isoformat()},
         config
     )
     model = load_chat_model(cfg.generate_response_model)
-    response = await model.ainvoke(context, config)
-    return {"messages": [response]}
+    response = await stream_model_response(model, context, config)
+    result["messages"] = [response]
+    return result
+
+
+###########################################################################
+# Parallel execution mode (`parallel_tasks`): the tasks whose dependencies are done run
+# concurrently as `run_task` branches; `join_tasks` waits for all of them, then dispatches
+# the tasks they unblocked, until the plan is done or a task needs the user.
+###########################################################################
+
+def _done_tasks(state: State) -> set[int]:
+    assert state.planner_result
+    # the planner counts the tasks before `next_task` as done
+    done = set(range(state.planner_result.next_task))
+    return done | {i for i, outcome in state.task_outcomes.items() if outcome == "complete"}
+
+
+def dispatch_ready_tasks(state: State) -> list[Send]:
+    """One `run_task` branch per task whose dependencies are done."""
+    if not state.planner_result:
+        return []
+    return [
+        Send("run_task", TaskBranch(
+            task_index=i,
+            task=state.planner_result.plan[i],
+            messages=state.messages,
+            conversation_summary=state.conversation_summary,
+            config_fingerprint=state.config_fingerprint,
+        ))
+        for i in state.planner_result.ready_tasks(_done_tasks(state))
+    ]
+
+
+def _outcome(message: Any) -> TaskOutcome:
+    content = get_message_text(message) if isinstance(message, AIMessage) else ""
+    if TASK_COMPLETE_TAG in content:
+        return "complete"
+    if content.startswith(ASK_USER_FOR_INFO_TAG):
+        return "ask_user"
+    return "idk"
+
+
+async def run_task(branch: TaskBranch, *, config: RunnableConfig) -> Dict[str, Any]:
+    """Execute one task to completion: the execute_task / tools loop, within one node."""
+    task = branch.task
+    compiled = get_compiled_context(config, Configuration, branch.config_fingerprint)
+    cfg = compiled.cfg
+    server_cfg = compiled.get_server_config(task.expert)
+    if not server_cfg:
+        message = AIMessage(content=f'{IDK_TAG} No configuration found for the expert {task.expert}.')
+        return {"messages": [message], "task_outcomes": {branch.task_index: "idk"}}
+
+    if task.expert in EXPERTS_NEEDING_MULTI_GRAPH_RUNS_WITHIN_AN_MCP_SESSION:
+        try:
+            new_messages = await run_subgraph(task.expert, server_cfg, branch.messages, cfg, config)
+        except SubgraphSessionsBusyError as e:
+            return {"messages": [expert_unavailable_message(task.expert, e)], "task_outcomes": {branch.task_index: "unavailable"}}
+        return {"messages": new_messages, "task_outcomes": {branch.task_index: "complete"}}
+
+    try:
+        tools = await get_tools(task.expert, server_cfg)
+    except Exception as e:
+        if not is_unavailable(e):
+            raise
+        return {"messages": [expert_unavailable_message(task.expert, e)], "task_outcomes": {branch.task_index: "unavailable"}}
+    if not tools:
+        message = AIMessage(content=f'{IDK_TAG} No tools available with the expert {task.expert}.')
+        return {"messages": [message], "task_outcomes": {branch.task_index: "idk"}}
+    if cfg.execute_task_tools_top_k:
+        tools = select_tools(task.expert, tools, task.task, branch.messages, cfg.execute_task_tools_top_k, IDK_TAG)
+    if has_offloaded_results(branch.messages):
+        tools = tools + [READ_TOOL_RESULT_TOOL]
+    model = load_chat_model(cfg.execute_task_model).bind_tools(tools)
+    prompt = compiled.prompts["execute_task"]
+    # branches share the conversation summary read-only; updates are left to the sequential nodes
+    history, _ = await manage_context(branch.messages, branch.conversation_summary, cfg, "execute_task", config)
+
+    new_messages: list = []
+    for _ in range(cfg.parallel_task_max_steps):
+        context = await prompt.ainvoke(
+            {
+                "messages": history + new_messages,
+                "expert": task.expert,
+                "task": task.task,
+                "ask_user_for_info_tag": ASK_USER_FOR_INFO_TAG,
+                "task_complete_tag": TASK_COMPLETE_TAG,
+                "idk_tag": IDK_TAG,
+                "system_time": datetime.now(tz=timezone.utc).isoformat()
+            },
+            config
+        )
+        # not streamed: tokens of concurrent branches would interleave on the client
+        response = await model.ainvoke(context, config)
+        new_messages.append(response)
+        if not isinstance(response, AIMessage) or not response.tool_calls:
+            break
+        new_messages.extend(await run_tool_calls(task.expert, server_cfg, response.tool_calls))
+    else:
+        message = AIMessage(
+            content=f'{IDK_TAG} The expert {task.expert} did not finish the task within {cfg.parallel_task_max_steps} steps.'
+        )
+        return {"messages": new_messages + [message], "task_outcomes": {branch.task_index: "idk"}}
+    return {"messages": new_messages, "task_outcomes": {branch.task_index: _outcome(new_messages[-1])}}
+
+
+def join_tasks(state: State) -> Dict[str, Any]:
+    """Move `next_task` past the tasks done so far, so the plan's progress reads like sequential mode."""
+    if not state.planner_result:
+        return {}
+    done = _done_tasks(state)
+    plan = state.planner_result.plan
+    next_task = next((i for i in range(len(plan)) if i not in done), len(plan))
+    return {"planner_result": state.planner_result.model_copy(update={"next_task": next_task})}
+
+
+def decide_join_edge(state: State) -> str | list[Send]:
+    if not state.planner_result:
+        return "respond"
+    done = _done_tasks(state)
+    unfinished = {outcome for i, outcome in state.task_outcomes.items() if outcome != "complete" and i not in done}
+    if unfinished - {"unavailable"}:
+        # a task needs the user (or its expert is stuck): respond, and resume on the next message
+        return "respond"
+    if unfinished:
+        # an expert's server can't be reached: let the planner plan around it
+        return "planner"
+    return dispatch_ready_tasks(state) or "respond"
 
 
 builder = StateGraph(State, input=InputState, config_schema=Configuration)
 
-builder.add_node("planner", planner, cache_policy=CachePolicy())
-builder.add_node("execute_task", execute_task, cache_policy=CachePolicy())
-builder.add_node("tools", tools, cache_policy=CachePolicy())
+# Node results are cached by conversation content + plan + config fingerprint (see node_cache);
+# `tools` and `execute_subgraph_task` have side effects and are never cached.
+builder.add_node("fingerprint_config", config_fingerprint_node(Configuration))
+builder.add_node("planner", planner, cache_policy=CachePolicy(key_func=state_cache_key(extra=unavailable_experts), ttl=600))
+builder.add_node("execute_task", execute_task, cache_policy=CachePolicy(key_func=state_cache_key(), ttl=300))
+builder.add_node("execute_subgraph_task", execute_subgraph_task)
+builder.add_node("tools", tools)
 builder.add_node("human_input", human_input)
-builder.add_node("respond", respond, cache_policy=CachePolicy())
+builder.add_node("respond", respond, cache_policy=CachePolicy(key_func=state_cache_key(), ttl=300))
+builder.add_node("run_task", run_task, input_schema=TaskBranch)
+builder.add_node("join_tasks", join_tasks)
 
-builder.add_edge(START, "planner")
+builder.add_edge(START, "fingerprint_config")
+builder.add_edge("fingerprint_config", "planner")
 builder.add_conditional_edges(
     "planner",
     decide_planner_edge,
-    {"execute_task": "execute_task", "respond": "respond"}
+    {"execute_task": "execute_task", "execute_subgraph_task": "execute_subgraph_task", "respond": "respond", "run_task": "run_task"}
 )
 builder.add_conditional_edges(
     "execute_task",
     decide_execute_task_edge,
     {"tools": "tools", "human_input": "human_input", "planner": "planner"}
 )
-builder.add_edge("human_input", "execute_task")
+builder.add_conditional_edges(
+    "execute_subgraph_task",
+    decide_execute_task_edge,
+    {"tools": "tools", "human_input": "human_input", "planner": "planner"}
+)
+builder.add_conditional_edges("human_input", decide_task_node, {"execute_task": "execute_task", "execute_subgraph_task": "execute_subgraph_task"})
 builder.add_edge("tools", "execute_task")
+builder.add_edge("run_task", "join_tasks")
+builder.add_conditional_edges("join_tasks", decide_join_edge, {"run_task": "run_task", "planner": "planner", "respond": "respond"})
 builder.add_edge("respond", END)
 
-graph = builder.compile(cache=InMemoryCache())
+graph = builder.compile(cache=BoundedInMemoryCache(max_entries=1024))
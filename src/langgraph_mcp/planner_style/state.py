@@ -1,9 +1,10 @@
 from dataclasses import dataclass, field
-from typing import Optional, Literal
+from typing import Annotated, Collection, Optional, Literal
 
-from pydantic import BaseModel
+from langchain_core.messages import AnyMessage
+from pydantic import BaseModel, Field
 
-from langgraph_mcp.state import InputState
+from langgraph_mcp.state import ConversationSummary, InputState
 
 
 class Task(BaseModel):
@@ -15,12 +16,18 @@ class Task(BaseModel):
     task: str
     """A brief description of the task to be performed."""
 
+    depends_on: list[int] = Field(default_factory=list)
+    """Indexes (in the plan) of the tasks whose results this task needs.
+
+    Tasks that don't depend on each other may run concurrently (see `parallel_tasks`).
+    """
+
 
 class PlannerResult(BaseModel):
     """Represents the output of the planner when determining the next course of action."""
 
-    decision: Literal["continue", "replace"]
-    """Indicates whether to continue with the existing plan or replace it with a new one."""
+    decision: Literal["continue", "amend", "replace"]
+    """Indicates whether to continue with the existing plan, amend its remaining tasks, or replace it with a new one."""
 
     plan: list[Task]
     """Ordered list of tasks to be executed, assigned to available experts."""
@@ -37,6 +44,76 @@ class PlannerResult(BaseModel):
             return self.plan[self.next_task]
         return None
 
+    def progress(self, done: Collection[int]) -> list[dict]:
+        """The plan with the status (done / current / pending) of each task, for the planner prompt."""
+        return [
+            {
+                "index": i,
+                **task.model_dump(),
+                "status": "done" if i in done else "current" if i == self.next_task else "pending",
+            }
+            for i, task in enumerate(self.plan)
+        ]
+
+    def done_first(self, done: Collection[int]) -> "PlannerResult":
+        """The plan with its done tasks moved before the others, as in sequential execution.
+
+        `next_task` becomes the first task not done, and `depends_on` follow the tasks.
+        """
+        order = sorted(range(len(self.plan)), key=lambda i: i not in done)
+        position = {old: new for new, old in enumerate(order)}
+        plan = [
+            self.plan[i].model_copy(update={"depends_on": [position[d] for d in self.plan[i].depends_on if d in position]})
+            for i in order
+        ]
+        return self.model_copy(update={"plan": plan, "next_task": sum(1 for i in order if i in done)})
+
+    def apply_update(self, update: "PlannerResult") -> "PlannerResult":
+        """Apply the planner's (incremental) decision to this plan.
+
+        - continue: keep the plan (unless the update restates it) and move to `update.next_task`,
+        - amend: keep the done tasks (before `next_task`, see `done_first`) and replace the rest with `update.plan`,
+        - replace: the update is the new plan.
+        """
+        if update.decision == "continue":
+            return update.model_copy(update={"plan": update.plan or self.plan})
+        if update.decision == "amend":
+            return update.model_copy(update={
+                "plan": self.plan[:self.next_task] + update.plan,
+                "next_task": self.next_task,
+            })
+        return update
+
+    def ready_tasks(self, done: Collection[int]) -> list[int]:
+        """Indexes of the pending tasks whose dependencies are all done.
+
+        Dependencies on unknown tasks are ignored; if a dependency cycle leaves no task
+        ready, the first pending task is returned so the plan still makes progress.
+        """
+        pending = [i for i in range(len(self.plan)) if i not in done]
+        ready = [
+            i for i in pending
+            if all(d in done for d in self.plan[i].depends_on if 0 <= d < len(self.plan) and d != i)
+        ]
+        return ready or pending[:1]
+
+
+TaskOutcome = Literal["complete", "ask_user", "idk", "unavailable"]
+
+
+def merge_task_outcomes(
+    left: dict[int, TaskOutcome], right: Optional[dict[int, Optional[TaskOutcome]]]
+) -> dict[int, TaskOutcome]:
+    """Reducer for concurrently finishing tasks.
+
+    `None` resets the outcomes (new plan); a `None` outcome forgets the outcome of that
+    task (it is dispatched again).
+    """
+    if right is None:
+        return {}
+    merged = {**left, **right}
+    return {i: outcome for i, outcome in merged.items() if outcome is not None}
+
 
 @dataclass(kw_only=True)
 class State(InputState):
@@ -56,4 +133,40 @@ class State(InputState):
     """Indicates whether the current task has been completed.
     
     This is used to determine whether to advance to the next task or continue with the current one.
-    """
\ No newline at end of file
+    """
+
+    conversation_summary: Optional[ConversationSummary] = field(default=None)
+    """Rolling summary of the messages that slid out of the LLM nodes' context windows.
+
+    Only maintained when a `context_summary_model` is configured.
+    """
+
+    config_fingerprint: str = field(default="")
+    """Fingerprint of the assistant configuration the graph runs with.
+
+    Recorded at the start of every run so that node cache keys (computed from state alone)
+    differ between assistants with different configurations.
+    """
+
+    task_outcomes: Annotated[dict[int, TaskOutcome], merge_task_outcomes] = field(default_factory=dict)
+    """Outcome of each finished task of the current plan, by task index.
+
+    Only maintained in the `parallel_tasks` execution mode.
+    """
+
+
+@dataclass(kw_only=True)
+class TaskBranch:
+    """Input of a `run_task` branch in the `parallel_tasks` execution mode."""
+
+    task_index: int
+    """Index of the task (in the plan) the branch executes."""
+
+    task: Task
+    """The task the branch executes."""
+
+    messages: list[AnyMessage]
+    """The conversation as of the start of the branch."""
+
+    conversation_summary: Optional[ConversationSummary] = None
+    config_fingerprint: str = ""
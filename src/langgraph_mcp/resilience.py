@@ -0,0 +1,233 @@
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable, Literal, Optional, Sequence
+
+import httpx
+from langchain_core.messages import BaseMessage, HumanMessage
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED, ToolAnnotations
+
+from langgraph_mcp.mcp_session_pool import SESSION_CLOSED_ERRORS, config_fingerprint
+from langgraph_mcp.server_limits import ServerBusyError
+
+Phase = Literal["spawn", "initialize", "list", "call"]
+
+# Seconds each phase of talking to a server may take; override per server with
+# `"timeouts": {"spawn": ..., "initialize": ..., "list": ..., "call": ...}` (`null` for no limit).
+# Tool calls made through `run_tool_calls` are also bounded by `"tool_calls": {"timeout": ...}`.
+DEFAULT_TIMEOUTS: dict[str, Optional[float]] = {"spawn": 30.0, "initialize": 30.0, "list": 30.0, "call": None}
+
+# Errors that say nothing about the request itself (the server hung, went away or
+# couldn't be reached), so an idempotent request may be retried
+TRANSIENT_ERRORS = (TimeoutError, OSError, httpx.TransportError, *SESSION_CLOSED_ERRORS)
+
+
+def phase_timeout(server_config: dict, phase: Phase) -> Optional[float]:
+    """Timeout of `phase` for the server, in seconds (None for no limit)."""
+    return (server_config.get("timeouts") or {}).get(phase, DEFAULT_TIMEOUTS[phase])
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether `error` is a timeout or connection failure rather than an answer from the server."""
+    if isinstance(error, BaseExceptionGroup):
+        return all(is_transient(e) for e in error.exceptions)
+    if isinstance(error, McpError):
+        return error.error.code == CONNECTION_CLOSED
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+def unwrap(error: BaseException) -> BaseException:
+    """The only exception of (nested) exception groups, as raised by the transports' task groups."""
+    while isinstance(error, BaseExceptionGroup) and len(error.exceptions) == 1:
+        error = error.exceptions[0]
+    return error
+
+
+def is_idempotent(annotations: Optional[ToolAnnotations]) -> bool:
+    """Whether the server declares that repeating a call of the tool is harmless."""
+    return bool(annotations and (annotations.readOnlyHint or annotations.idempotentHint) and not annotations.destructiveHint)
+
+
+@dataclass
+class RetryPolicy:
+    """Retries of idempotent operations after transient failures, with jittered exponential backoff.
+
+    Configure per server with `"retry": {"attempts": 3, "backoff": 0.2, "max_backoff": 5}`.
+    """
+
+    attempts: int = 3
+    """Attempts in total; 1 disables retries."""
+    backoff: float = 0.2
+    """Upper bound of the first delay, in seconds; doubles with every attempt."""
+    max_backoff: float = 5.0
+
+    @classmethod
+    def from_config(cls, server_config: dict) -> "RetryPolicy":
+        retry_cfg = server_config.get("retry") or {}
+        return cls(
+            attempts=max(1, int(retry_cfg.get("attempts", cls.attempts))),
+            backoff=float(retry_cfg.get("backoff", cls.backoff)),
+            max_backoff=float(retry_cfg.get("max_backoff", cls.max_backoff)),
+        )
+
+    def delay(self, attempt: int) -> float:
+        """Delay before the attempt following attempt number `attempt` ("full jitter")."""
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+
+class CircuitOpenError(Exception):
+    """The server failed repeatedly; calls fail fast until its circuit breaker lets a probe through."""
+
+
+def is_unavailable(error: BaseException) -> bool:
+    """Whether `error` means the server can't serve requests right now: its circuit is open,
+    it is too busy, or it timed out or went away."""
+    return isinstance(unwrap(error), (CircuitOpenError, ServerBusyError)) or is_transient(error)
+
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+class CircuitBreaker:
+    """Fails calls to a server fast once `failure_threshold` calls in a row failed transiently.
+
+    After `reset_timeout` seconds one call is let through as a probe (`half_open`): if it
+    succeeds the circuit closes, if it fails the circuit opens again for `reset_timeout`.
+    A call failing with an answer from the server (a tool error, a protocol error) counts
+    as a success: the server is up.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state: CircuitState = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def available(self) -> bool:
+        """Whether a call would currently be let through."""
+        return self.state == "closed" or time.monotonic() - self.opened_at >= self.reset_timeout
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            # let this call probe the server; others keep failing fast until it resolves
+            self.state = "half_open"
+            self.opened_at = time.monotonic()
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+
+    def record_failure(self) -> bool:
+        """Count a failed call; returns True if this opened the circuit."""
+        self.failures += 1
+        if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+            return True
+        return False
+
+
+class CircuitBreakers:
+    """The circuit breakers of all servers, by server name.
+
+    Breakers are on by default; configure them per server with
+    `"circuit_breaker": {"failure_threshold": 5, "reset_timeout": 30}`, or turn them off
+    with `"circuit_breaker": {"enabled": false}`. A breaker tracks the server rather than
+    the event loop, so it is shared by every loop and thread of the process.
+    """
+
+    def __init__(self):
+        self._breakers: dict[str, tuple[str, CircuitBreaker]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, server_name: str, server_config: dict) -> Optional[CircuitBreaker]:
+        breaker_cfg = server_config.get("circuit_breaker") or {}
+        if breaker_cfg.get("enabled", True) is False:
+            return None
+        signature = config_fingerprint(breaker_cfg)
+        with self._lock:
+            entry = self._breakers.get(server_name)
+            if entry is None or entry[0] != signature:
+                breaker = CircuitBreaker(
+                    failure_threshold=int(breaker_cfg.get("failure_threshold", 5)),
+                    reset_timeout=float(breaker_cfg.get("reset_timeout", 30.0)),
+                )
+                entry = self._breakers[server_name] = (signature, breaker)
+        return entry[1]
+
+    def unavailable(self, server_names: Optional[Iterable[str]] = None) -> list[str]:
+        """Servers (of `server_names`, or all) whose circuit is open, in name order."""
+        selected = set(server_names) if server_names is not None else None
+        return sorted(
+            name for name, (_, breaker) in list(self._breakers.items())
+            if not breaker.available and (selected is None or name in selected)
+        )
+
+    def describe(self) -> dict[str, dict[str, Any]]:
+        """State and counters of every server's breaker."""
+        return {
+            name: {
+                "state": breaker.state,
+                "available": breaker.available,
+                "failures": breaker.failures,
+                "times_opened": breaker.times_opened,
+                "rejected": breaker.rejected,
+            }
+            for name, (_, breaker) in list(self._breakers.items())
+        }
+
+    def reset(self, server_name: Optional[str] = None) -> None:
+        """Forget the failures of `server_name` (all servers if None)."""
+        with self._lock:
+            if server_name is None:
+                self._breakers.clear()
+            else:
+                self._breakers.pop(server_name, None)
+
+
+_circuit_breakers = CircuitBreakers()
+
+
+def get_circuit_breakers() -> CircuitBreakers:
+    """Get the process-wide circuit breakers of the MCP servers."""
+    return _circuit_breakers
+
+
+# `response_metadata` key of the message reporting that an expert's server is unavailable;
+# its value is the expert
+EXPERT_UNAVAILABLE = "expert_unavailable"
+
+
+def unavailable_experts(
+    server_names: Optional[Iterable[str]] = None, messages: Sequence[BaseMessage] = ()
+) -> list[str]:
+    """Experts whose server's circuit breaker is open; planners leave them out of plans.
+
+    With the conversation's `messages`, also the experts reported unavailable since the last
+    human message: their circuit may still be closed, but planning them again this turn
+    would only wait for the same failure.
+    """
+    unavailable = _circuit_breakers.unavailable(server_names)
+    failed: list[str] = []
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            break
+        expert = message.response_metadata.get(EXPERT_UNAVAILABLE)
+        if isinstance(expert, str) and expert not in unavailable and expert not in failed:
+            failed.insert(0, expert)
+    if server_names is not None:
+        names = set(server_names)
+        failed = [expert for expert in failed if expert in names]
+    return unavailable + failed
@@ -0,0 +1,308 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import re
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterable, Optional, Sequence
+
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage
+
+from langgraph_mcp.mcp_session_pool import config_fingerprint
+from langgraph_mcp.mcp_wrapper import describe_servers
+from langgraph_mcp.utils import get_message_text
+
+logger = logging.getLogger(__name__)
+
+# Routing descriptions cached on disk are refreshed after this many seconds
+DEFAULT_INDEX_MAX_AGE = 24 * 3600
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do for from has have how i in is it me my of on or "
+    "please the this to use using was what when which with you your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased terms of `text`, splitting snake_case and camelCase identifiers."""
+    text = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", text)
+    terms = []
+    for term in re.findall(r"[a-z0-9]+", text.lower()):
+        if term in _STOPWORDS or len(term) < 2:
+            continue
+        # fold the most common plurals so "issues" matches "issue"
+        if term.endswith("ies") and len(term) > 4:
+            term = term[:-3] + "y"
+        elif term.endswith("s") and not term.endswith("ss") and len(term) > 3:
+            term = term[:-1]
+        terms.append(term)
+    return terms
+
+
+class BM25Index:
+    """Okapi BM25 ranking over a small set of documents (servers, tools)."""
+
+    def __init__(self, documents: dict[str, str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids = list(documents)
+        self._tfs = [Counter(tokenize(documents[doc_id])) for doc_id in self.ids]
+        self._lengths = [sum(tf.values()) for tf in self._tfs]
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        df = Counter(term for tf in self._tfs for term in tf)
+        n = len(self.ids)
+        self._idf = {term: math.log(1 + (n - freq + 0.5) / (freq + 0.5)) for term, freq in df.items()}
+
+    def scores(self, query: str) -> dict[str, float]:
+        """BM25 score of every document for `query`."""
+        terms = [term for term in tokenize(query) if term in self._idf]
+        scores: dict[str, float] = {}
+        for doc_id, tf, length in zip(self.ids, self._tfs, self._lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self._avg_length or 1))
+            scores[doc_id] = sum(
+                self._idf[term] * tf[term] * (self.k1 + 1) / (tf[term] + norm) for term in terms if term in tf
+            )
+        return scores
+
+    def search(self, query: str, k: int) -> list[str]:
+        """Ids of the (at most) `k` best matching documents, best first; documents
+        that share no term with the query are left out."""
+        scores = self.scores(query)
+        ranked = sorted((doc_id for doc_id in self.ids if scores[doc_id] > 0), key=lambda doc_id: -scores[doc_id])
+        return ranked[:k]
+
+
+class RoutingDescriptionCache:
+    """Routing descriptions (tools, prompts, resources) of servers, cached on local disk.
+
+    Describing a server means starting or connecting to it, so descriptions are kept per
+    server config fingerprint across restarts and only refreshed after `max_age` seconds.
+    """
+
+    def __init__(self, root: str | Path, max_age: float = DEFAULT_INDEX_MAX_AGE):
+        self.root = Path(root)
+        self.max_age = max_age
+
+    def _path(self, server_config: dict) -> Path:
+        return self.root / f"{config_fingerprint(server_config)}.json"
+
+    def load(self, server_config: dict) -> Optional[str]:
+        try:
+            entry = json.loads(self._path(server_config).read_text())
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("described_at", 0) > self.max_age:
+            return None
+        return entry.get("description")
+
+    def store(self, server_config: dict, description: str) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        # write to a temp file first so concurrent readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=self.root)
+        with os.fdopen(fd, "w") as f:
+            json.dump({"description": description, "described_at": time.time()}, f)
+        os.replace(tmp, self._path(server_config))
+
+    async def describe(self, mcp_server_config: dict[str, dict]) -> dict[str, str]:
+        """Routing descriptions of all servers, describing only the ones not cached."""
+        descriptions: dict[str, str] = {}
+        missing: dict[str, dict] = {}
+        for server_name, server_config in mcp_server_config.items():
+            cached = self.load(server_config)
+            if cached is None:
+                missing[server_name] = server_config
+            else:
+                descriptions[server_name] = cached
+        if missing:
+            described = await describe_servers(missing)
+            for server_name, description in described.items():
+                self.store(missing[server_name], description)
+            descriptions.update(described)
+        return descriptions
+
+
+_routing_descriptions: RoutingDescriptionCache | None = None
+
+
+def get_routing_description_cache() -> RoutingDescriptionCache:
+    """Get the process-wide routing description cache, rooted at `$LANGGRAPH_MCP_INDEX_DIR`
+    (a temp dir by default)."""
+    global _routing_descriptions
+    if _routing_descriptions is None:
+        root = os.getenv("LANGGRAPH_MCP_INDEX_DIR") or os.path.join(tempfile.gettempdir(), "langgraph-mcp-index")
+        _routing_descriptions = RoutingDescriptionCache(root)
+    return _routing_descriptions
+
+
+# Seconds before an index missing some servers' routing descriptions tries to describe them again
+INDEX_RETRY_AFTER = 60.0
+
+# Expert indexes by configuration fingerprint (see `compiled_context`), with the time after
+# which an incomplete index is rebuilt (None once every server is described)
+_expert_indexes: dict[str, tuple[BM25Index, Optional[float]]] = {}
+# Builds in flight by configuration fingerprint; concurrent callers share one
+_expert_index_builds: dict[str, asyncio.Task] = {}
+
+
+def _stale(entry: Optional[tuple[BM25Index, Optional[float]]]) -> bool:
+    return entry is None or (entry[1] is not None and time.monotonic() >= entry[1])
+
+
+async def _build_expert_index(mcp_server_config: dict[str, dict], fingerprint: str) -> BM25Index:
+    routing = await get_routing_description_cache().describe(mcp_server_config)
+    index = BM25Index({
+        server_name: f"{server_name}\n{server_config.get('description', '')}\n{routing.get(server_name, '')}"
+        for server_name, server_config in mcp_server_config.items()
+    })
+    complete = all(server_name in routing for server_name in mcp_server_config)
+    _expert_indexes[fingerprint] = (index, None if complete else time.monotonic() + INDEX_RETRY_AFTER)
+    while len(_expert_indexes) > 64:
+        del _expert_indexes[next(iter(_expert_indexes))]
+    return index
+
+
+def _expert_index_build(mcp_server_config: dict[str, dict], fingerprint: str) -> asyncio.Task:
+    """The build of the expert index in flight for `fingerprint`, starting one if there is none."""
+    task = _expert_index_builds.get(fingerprint)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = _expert_index_builds[fingerprint] = asyncio.ensure_future(
+            _build_expert_index(mcp_server_config, fingerprint)
+        )
+
+        def done(task: asyncio.Task) -> None:
+            if _expert_index_builds.get(fingerprint) is task:
+                del _expert_index_builds[fingerprint]
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning("Building the expert index failed: %r", task.exception())
+
+        task.add_done_callback(done)
+    return task
+
+
+async def get_expert_index(mcp_server_config: dict[str, dict], fingerprint: str) -> BM25Index:
+    """BM25 index over the description and routing description of every server.
+
+    Servers that couldn't be described are indexed by name and description only, and are
+    described again (on the next call after `INDEX_RETRY_AFTER` seconds) until they succeed.
+    Concurrent calls for the same fingerprint share one build.
+    """
+    entry = _expert_indexes.get(fingerprint)
+    if not _stale(entry):
+        return entry[0]
+    # shielded, so that a cancelled caller doesn't cancel the build for the others
+    return await asyncio.shield(_expert_index_build(mcp_server_config, fingerprint))
+
+
+def ready_expert_index(mcp_server_config: dict[str, dict], fingerprint: str) -> Optional[BM25Index]:
+    """The expert index of `fingerprint` without waiting for it.
+
+    A missing or stale index is (re)built in the background; meanwhile the stale index is
+    returned, or None if there is none yet.
+    """
+    entry = _expert_indexes.get(fingerprint)
+    if _stale(entry):
+        _expert_index_build(mcp_server_config, fingerprint)
+    return entry[0] if entry is not None else None
+
+
+def conversation_query(messages: Sequence[AnyMessage], last_n: int = 4) -> str:
+    """Retrieval query for the current conversation: the text of its last messages."""
+    return "\n".join(get_message_text(message) for message in messages[-last_n:])
+
+
+async def select_experts(
+    mcp_server_config: dict[str, dict],
+    fingerprint: str,
+    messages: Sequence[AnyMessage],
+    top_k: int,
+    keep: Iterable[str] = (),
+) -> list[str]:
+    """Names of the experts relevant to the conversation, in configuration order.
+
+    Selects the `top_k` best matching experts plus the experts in `keep` (e.g. the ones
+    in the current plan). When the conversation matches no expert at all, or while the
+    expert index is first built (off the planner's critical path), every expert is
+    selected so the planner can still decide.
+    """
+    if len(mcp_server_config) <= top_k:
+        return list(mcp_server_config)
+    index = ready_expert_index(mcp_server_config, fingerprint)
+    if index is None:
+        return list(mcp_server_config)
+    matches = index.search(conversation_query(messages), top_k)
+    if not matches:
+        return list(mcp_server_config)
+    selected = set(matches) | set(keep)
+    return [server_name for server_name in mcp_server_config if server_name in selected]
+
+
+def tool_document(tool: dict[str, Any]) -> str:
+    """Text a tool is indexed by: its name, description and parameter names and descriptions."""
+    function = tool.get("function", tool)
+    parts = [function.get("name", ""), function.get("description", "")]
+    for name, schema in ((function.get("parameters") or {}).get("properties") or {}).items():
+        parts.append(f"{name} {schema.get('description', '') if isinstance(schema, dict) else ''}")
+    return "\n".join(parts)
+
+
+def _tool_name(tool: dict[str, Any]) -> str:
+    return tool.get("function", tool).get("name", "")
+
+
+# Tool indexes by server and tool names; rebuilt when the server's tool list changes
+_tool_indexes: dict[tuple[str, tuple[str, ...]], BM25Index] = {}
+
+
+def get_tool_index(server_name: str, tools: Sequence[dict[str, Any]]) -> BM25Index:
+    """BM25 index over the tools (as returned by `mcp_wrapper.get_tools`) of a server."""
+    key = (server_name, tuple(_tool_name(tool) for tool in tools))
+    index = _tool_indexes.get(key)
+    if index is None:
+        index = _tool_indexes[key] = BM25Index({_tool_name(tool): tool_document(tool) for tool in tools})
+        while len(_tool_indexes) > 256:
+            del _tool_indexes[next(iter(_tool_indexes))]
+    return index
+
+
+def _recent_turns(messages: Sequence[AnyMessage], turns: int) -> Sequence[AnyMessage]:
+    """The messages since the `turns`-th last human message."""
+    humans = [i for i, message in enumerate(messages) if isinstance(message, HumanMessage)]
+    return messages[humans[-turns]:] if len(humans) >= turns else messages
+
+
+def select_tools(
+    server_name: str,
+    tools: list[dict[str, Any]],
+    task: str,
+    messages: Sequence[AnyMessage],
+    top_k: int,
+    idk_tag: str,
+) -> list[dict[str, Any]]:
+    """The tools of an expert to bind for `task`, in the server's order.
+
+    Selects the `top_k` tools best matching the task and the latest messages, plus the
+    tools already called in the current turn. Every tool is bound when the task matches
+    none of them, or when the expert answered with `idk_tag` in the current or previous
+    turn (it may have lacked the right tool).
+    """
+    if len(tools) <= top_k:
+        return tools
+    recent = _recent_turns(messages, 2)
+    if any(isinstance(message, AIMessage) and idk_tag in get_message_text(message) for message in recent):
+        return tools
+    current = _recent_turns(messages, 1)
+    query = f"{task}\n{conversation_query(current, last_n=2)}"
+    matches = get_tool_index(server_name, tools).search(query, top_k)
+    if not matches:
+        return tools
+    called = {
+        tool_call["name"]
+        for message in current if isinstance(message, AIMessage)
+        for tool_call in message.tool_calls
+    }
+    selected = set(matches) | called
+    return [tool for tool in tools if _tool_name(tool) in selected]
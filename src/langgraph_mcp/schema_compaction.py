@@ -0,0 +1,218 @@
+import json
+from dataclasses import dataclass
+from typing import Any
+
+# Defaults for compacting tool input schemas; override per server with
+# `"schema_compaction": {"enabled": <bool>, "max_description": <chars>, "inline_limit": <chars>, "report": <bool>}`
+DEFAULT_MAX_DESCRIPTION = 300
+DEFAULT_INLINE_LIMIT = 400
+
+# Keywords that only annotate a schema; models don't need them to call the tool
+_ANNOTATION_KEYWORDS = {"title", "$schema", "$id", "$comment", "examples"}
+# Keywords whose value is a map of name -> schema
+_SCHEMA_MAPS = {"properties", "patternProperties", "dependentSchemas"}
+# Keywords whose value is a schema
+_SCHEMAS = {"items", "additionalProperties", "additionalItems", "contains", "not", "if", "then", "else", "propertyNames"}
+# Keywords whose value is a list of schemas
+_SCHEMA_LISTS = {"anyOf", "oneOf", "allOf", "prefixItems"}
+_DEFS_KEYWORDS = ("$defs", "definitions")
+
+
+def _truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(" ", 1)[0] or text[:limit]
+    return cut.rstrip(" ,.;:") + "…"
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, separators=(",", ":"), sort_keys=True))
+
+
+def _strip(node: Any, max_description: int) -> Any:
+    """Drop annotations, null defaults and over-long descriptions from a schema."""
+    if not isinstance(node, dict):
+        return node
+    compacted: dict[str, Any] = {}
+    for key, value in node.items():
+        if key in _ANNOTATION_KEYWORDS or (key == "default" and value is None):
+            continue
+        if key == "description" and isinstance(value, str):
+            compacted[key] = _truncate(value, max_description)
+        elif key in _SCHEMA_MAPS and isinstance(value, dict):
+            compacted[key] = {name: _strip(schema, max_description) for name, schema in value.items()}
+        elif key in _SCHEMAS:
+            compacted[key] = _strip(value, max_description)
+        elif key in _SCHEMA_LISTS and isinstance(value, list):
+            compacted[key] = [_strip(schema, max_description) for schema in value]
+        else:
+            compacted[key] = value
+    return compacted
+
+
+def _refs(node: Any) -> list[str]:
+    """Every `$ref` in a schema, with repetitions."""
+    if isinstance(node, dict):
+        found = [node["$ref"]] if isinstance(node.get("$ref"), str) else []
+        for key, value in node.items():
+            if key != "$ref":
+                found.extend(_refs(value))
+        return found
+    if isinstance(node, list):
+        return [ref for item in node for ref in _refs(item)]
+    return []
+
+
+def _recursive(defs: dict[str, Any]) -> set[str]:
+    """Refs of definitions that (directly or indirectly) reference themselves."""
+    graph = {ref: {r for r in _refs(schema) if r in defs} for ref, schema in defs.items()}
+    recursive = set()
+    for start in graph:
+        stack, seen = list(graph[start]), set()
+        while stack:
+            ref = stack.pop()
+            if ref == start:
+                recursive.add(start)
+                break
+            if ref not in seen:
+                seen.add(ref)
+                stack.extend(graph.get(ref, ()))
+    return recursive
+
+
+def compact_schema(
+    schema: dict[str, Any],
+    max_description: int = DEFAULT_MAX_DESCRIPTION,
+    inline_limit: int = DEFAULT_INLINE_LIMIT,
+) -> dict[str, Any]:
+    """Compact a tool's JSON schema without changing what it accepts.
+
+    - drops annotation keywords (`title`, `$schema`, `examples`, ...) and `null` defaults,
+    - truncates descriptions longer than `max_description` characters,
+    - merges identical definitions, and inlines definitions that are referenced once or are
+      smaller than `inline_limit` characters (recursive definitions are kept as refs),
+    - keeps the remaining (shared) definitions once, under `$defs`.
+    """
+    if not isinstance(schema, dict):
+        return schema
+    defs: dict[str, Any] = {}
+    for keyword in _DEFS_KEYWORDS:
+        for name, definition in (schema.get(keyword) or {}).items():
+            defs[f"#/{keyword}/{name}"] = _strip(definition, max_description)
+    if any(ref not in defs for ref in _refs(schema)):
+        # refs to the root, into a definition or to another document: keep every ref and
+        # definition where it is, so that they still resolve
+        compacted = _strip(schema, max_description)
+        for keyword in _DEFS_KEYWORDS:
+            if isinstance(schema.get(keyword), dict):
+                compacted[keyword] = {
+                    name: defs.get(f"#/{keyword}/{name}", definition) for name, definition in schema[keyword].items()
+                }
+        return compacted
+
+    # identical definitions (e.g. emitted under both $defs and definitions) share one ref
+    canonical: dict[str, str] = {}
+    by_content: dict[str, str] = {}
+    for ref, definition in defs.items():
+        canonical[ref] = by_content.setdefault(json.dumps(definition, sort_keys=True), ref)
+    defs = {ref: definition for ref, definition in defs.items() if canonical[ref] == ref}
+
+    def rewrite(node: Any) -> Any:
+        if isinstance(node, dict):
+            return {
+                key: canonical.get(value, value) if key == "$ref" and isinstance(value, str) else rewrite(value)
+                for key, value in node.items()
+            }
+        if isinstance(node, list):
+            return [rewrite(item) for item in node]
+        return node
+
+    defs = {ref: rewrite(definition) for ref, definition in defs.items()}
+    body = rewrite(_strip({k: v for k, v in schema.items() if k not in _DEFS_KEYWORDS}, max_description))
+    uses: dict[str, int] = {}
+    for ref in _refs(body) + [r for definition in defs.values() for r in _refs(definition)]:
+        uses[ref] = uses.get(ref, 0) + 1
+    recursive = _recursive(defs)
+    inline = {
+        ref for ref, definition in defs.items()
+        if ref not in recursive and (uses.get(ref, 0) <= 1 or _size(definition) <= inline_limit)
+    }
+
+    def resolve(node: Any) -> Any:
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str) and ref in inline:
+                definition = defs[ref]
+                siblings = {key: value for key, value in node.items() if key != "$ref"}
+                if any(key in definition and definition[key] != value for key, value in siblings.items()
+                       if key != "description"):
+                    # the ref and its siblings both apply: conflicting keywords must not replace each other
+                    return resolve({**siblings, "allOf": [definition, *siblings.get("allOf", [])]})
+                # a description next to the ref documents this use of the definition
+                return resolve({**definition, **siblings})
+            return {key: resolve(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [resolve(item) for item in node]
+        return node
+
+    compacted = resolve(body)
+    kept = {ref: resolve(definition) for ref, definition in defs.items() if ref not in inline}
+    referenced = set(_refs(compacted)) | {r for definition in kept.values() for r in _refs(definition)}
+    kept = {ref: definition for ref, definition in kept.items() if ref in referenced}
+    if kept:
+        names: dict[str, str] = {}
+        for ref in kept:
+            name = ref.rsplit("/", 1)[-1]
+            while name in names.values():
+                name += "_"
+            names[ref] = name
+        moved = {ref: f"#/$defs/{name}" for ref, name in names.items()}
+
+        def relink(node: Any) -> Any:
+            if isinstance(node, dict):
+                return {
+                    key: moved.get(value, value) if key == "$ref" and isinstance(value, str) else relink(value)
+                    for key, value in node.items()
+                }
+            if isinstance(node, list):
+                return [relink(item) for item in node]
+            return node
+
+        compacted = relink(compacted)
+        compacted["$defs"] = {names[ref]: relink(definition) for ref, definition in kept.items()}
+    return compacted
+
+
+@dataclass
+class CompactionReport:
+    """Size of a server's tool definitions before and after compaction."""
+
+    tools: int
+    chars_before: int
+    chars_after: int
+
+    @property
+    def tokens_saved(self) -> int:
+        # same ~4 characters per token estimate as `count_tokens_approximately`
+        return (self.chars_before - self.chars_after) // 4
+
+    @property
+    def ratio(self) -> float:
+        return self.chars_after / self.chars_before if self.chars_before else 1.0
+
+
+def compact_tools(tools: list[dict[str, Any]], server_config: dict) -> tuple[list[dict[str, Any]], CompactionReport]:
+    """Compact the input schemas of `bind_tools` tool dicts per the server's settings."""
+    settings = server_config.get("schema_compaction") or {}
+    before = sum(_size(tool) for tool in tools)
+    if settings.get("enabled", True):
+        max_description = int(settings.get("max_description", DEFAULT_MAX_DESCRIPTION))
+        inline_limit = int(settings.get("inline_limit", DEFAULT_INLINE_LIMIT))
+        tools = [
+            {**tool, "function": {
+                **tool["function"],
+                "parameters": compact_schema(tool["function"].get("parameters") or {}, max_description, inline_limit),
+            }}
+            for tool in tools
+        ]
+    return tools, CompactionReport(tools=len(tools), chars_before=before, chars_after=sum(_size(tool) for tool in tools))
@@ -0,0 +1,135 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Optional
+
+from langgraph_mcp.mcp_session_pool import config_fingerprint
+
+DEFAULT_QUEUE_TIMEOUT = 60.0
+
+
+class ServerBusyError(Exception):
+    """An operation didn't get a slot on its server: the queue was full or the wait timed out."""
+
+
+@dataclass
+class ServerLimitStats:
+    """Counters and gauges describing the traffic to one server."""
+
+    in_flight: int = 0
+    queued: int = 0
+    max_queued: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    timed_out: int = 0
+    throttled: int = 0
+    """Operations delayed by the rate limit."""
+    wait_seconds: float = 0.0
+    """Total time operations waited for a slot or a token."""
+
+
+class TokenBucket:
+    """Allows `rate` operations per second on average, in bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take a token; returns how long to wait before using it."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class ServerLimiter:
+    """Bounds the operations in flight against one server and queues the others.
+
+    Settings (the `"limits"` entry of the server config):
+    - `max_concurrent`: operations (session opens, listings, tool calls) in flight at once,
+    - `max_queue`: operations waiting for a slot; further operations fail right away,
+    - `queue_timeout`: seconds an operation waits for a slot (and a token) before failing,
+    - `rate` / `burst`: token bucket applied to remote (non-stdio) transports, in operations per second.
+    """
+
+    def __init__(self, limits: dict[str, Any], remote: bool):
+        max_concurrent = limits.get("max_concurrent")
+        self.semaphore = asyncio.Semaphore(int(max_concurrent)) if max_concurrent else None
+        self.max_queue = limits.get("max_queue")
+        self.queue_timeout = float(limits.get("queue_timeout", DEFAULT_QUEUE_TIMEOUT))
+        rate = limits.get("rate")
+        self.bucket = TokenBucket(float(rate), float(limits.get("burst", rate))) if rate and remote else None
+        self.stats = ServerLimitStats()
+
+    @asynccontextmanager
+    async def slot(self, server_name: str) -> AsyncIterator[None]:
+        stats = self.stats
+        started = time.monotonic()
+        deadline = started + self.queue_timeout
+        if self.semaphore is not None and not self.semaphore.locked():
+            await self.semaphore.acquire()  # a free slot: returns right away
+        elif self.semaphore is not None:
+            if self.max_queue is not None and stats.queued >= self.max_queue:
+                stats.rejected += 1
+                raise ServerBusyError(f"Too many operations queued for server '{server_name}' ({stats.queued})")
+            stats.queued += 1
+            stats.max_queued = max(stats.max_queued, stats.queued)
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                stats.timed_out += 1
+                raise ServerBusyError(
+                    f"Timed out after {self.queue_timeout} seconds waiting for server '{server_name}'"
+                ) from None
+            finally:
+                stats.queued -= 1
+        try:
+            if self.bucket is not None:
+                delay = self.bucket.reserve()
+                if delay > 0:
+                    stats.throttled += 1
+                    if time.monotonic() + delay > deadline:
+                        self.bucket.tokens += 1  # give the token back
+                        stats.timed_out += 1
+                        raise ServerBusyError(f"Rate limit of server '{server_name}' exceeded")
+                    await asyncio.sleep(delay)
+            stats.wait_seconds += time.monotonic() - started
+            stats.admitted += 1
+            stats.in_flight += 1
+            try:
+                yield
+            finally:
+                stats.in_flight -= 1
+        finally:
+            if self.semaphore is not None:
+                self.semaphore.release()
+
+
+class ServerLimits:
+    """The limiters of every server with `"limits"` in its config, by server name.
+
+    A server's limits apply across all its configurations (e.g. of different assistants), as
+    they protect the server itself; a server whose limits change gets a fresh limiter.
+    """
+
+    def __init__(self):
+        self._limiters: dict[str, tuple[str, ServerLimiter]] = {}
+
+    def limiter(self, server_name: str, server_config: dict, transport: str) -> Optional[ServerLimiter]:
+        limits = server_config.get("limits")
+        if not limits:
+            return None
+        signature = config_fingerprint({"limits": limits, "transport": transport})
+        entry = self._limiters.get(server_name)
+        if entry is None or entry[0] != signature:
+            entry = self._limiters[server_name] = (signature, ServerLimiter(limits, remote=transport != "stdio"))
+        return entry[1]
+
+    def describe(self) -> dict[str, dict[str, Any]]:
+        """Queue depth, in-flight operations and counters per server."""
+        return {name: asdict(limiter.stats) for name, (_, limiter) in self._limiters.items()}
@@ -3,6 +3,20 @@ from typing import Annotated, Sequence
 
 from langchain_core.messages import AnyMessage
 from langgraph.graph import add_messages
+from pydantic import BaseModel
+
+
+class ConversationSummary(BaseModel):
+    """Rolling summary of the leading messages of a conversation."""
+
+    summary: str
+    """Summary of the first `messages_covered` messages."""
+
+    messages_covered: int
+    """Number of leading messages folded into the summary."""
+
+    last_message_id: str | None = None
+    """Id of the last summarized message, used to check the summary still lines up with the messages."""
 
 
 @dataclass(kw_only=True)
@@ -0,0 +1,215 @@
+import asyncio
+import time
+import weakref
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict
+
+from langgraph_mcp.mcp_session_pool import config_fingerprint
+from langgraph_mcp.server_limits import DEFAULT_QUEUE_TIMEOUT, ServerBusyError
+
+# Builds a compiled agent bound to an open MCP session, e.g. `mcp_react_graph.make_graph`
+SubgraphFactory = Callable[[str, str, Dict[str, Any]], AbstractAsyncContextManager[Any]]
+
+
+class SubgraphSessionsBusyError(ServerBusyError):
+    """No subgraph session could be leased in time: too many concurrent sessions, or the thread's is in use."""
+
+
+@dataclass
+class SubgraphSession:
+    """A compiled agent and the MCP session (e.g. a browser) it is bound to."""
+
+    key: tuple[str, str, str, str]
+    ready: asyncio.Future
+    owner: asyncio.Task
+    stop: asyncio.Event
+    idle_timeout: float
+    in_use: bool = False
+    last_used: float = field(default_factory=time.monotonic)
+
+    @property
+    def alive(self) -> bool:
+        return not self.owner.done()
+
+
+class SubgraphSessionManager:
+    """Keeps per-thread subgraph sessions alive across tasks and turns.
+
+    Experts like playwright need several agent runs within one MCP session (the browser
+    keeps pages, cookies, ...). Instead of starting the server and browser for every task,
+    the manager keeps one session per (thread, expert, config, model), leased by one task
+    at a time. Sessions idle for longer than `idle_timeout` are closed, and at most
+    `max_sessions` are open per process: when the cap is reached, the least recently
+    used idle session is closed to make room, or callers wait for one to be released.
+    Callers that wait longer than `queue_timeout` seconds fail with `SubgraphSessionsBusyError`.
+    """
+
+    def __init__(
+        self,
+        factory: SubgraphFactory,
+        *,
+        idle_timeout: float = 600.0,
+        max_sessions: int = 4,
+        queue_timeout: float = DEFAULT_QUEUE_TIMEOUT,
+    ):
+        self._factory = factory
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.queue_timeout = queue_timeout
+        self._sessions: dict[tuple[str, str, str, str], SubgraphSession] = {}
+        self._condition = asyncio.Condition()
+        self._reaper: asyncio.Task | None = None
+
+    @asynccontextmanager
+    async def lease(self, thread_id: str, model: str, expert: str, expert_config: dict) -> AsyncIterator[Any]:
+        """Lease the agent of `thread_id` for `expert`, starting its session if needed."""
+        session = await self._acquire(thread_id, model, expert, expert_config)
+        try:
+            yield await session.ready
+        except BaseException:
+            # a failed run may leave the session in an unknown state; start fresh next time
+            await self._close(session)
+            raise
+        finally:
+            async with self._condition:
+                session.in_use = False
+                session.last_used = time.monotonic()
+                self._condition.notify_all()
+
+    async def _acquire(self, thread_id: str, model: str, expert: str, expert_config: dict) -> SubgraphSession:
+        key = (thread_id, expert, config_fingerprint(expert_config), model)
+        pool_cfg = expert_config.get("pool") or {}
+        idle_timeout = float(pool_cfg.get("idle_timeout", self.idle_timeout))
+        queue_timeout = float(pool_cfg.get("queue_timeout", self.queue_timeout))
+        deadline = time.monotonic() + queue_timeout
+        self._ensure_reaper()
+        while True:
+            evict: SubgraphSession | None = None
+            async with self._condition:
+                session = self._sessions.get(key)
+                if session is not None and not session.alive:
+                    del self._sessions[key]
+                    session = None
+                if session is not None:
+                    if session.in_use:
+                        await self._wait(deadline, f"the session of expert '{expert}' in thread '{thread_id}' is in use")
+                        continue
+                    session.in_use = True
+                    return session
+                if len(self._sessions) >= self.max_sessions:
+                    idle = [s for s in self._sessions.values() if not s.in_use]
+                    if not idle:
+                        await self._wait(deadline, f"too many concurrent browser sessions (max_sessions={self.max_sessions})")
+                        continue
+                    evict = min(idle, key=lambda s: s.last_used)
+                    del self._sessions[evict.key]
+                else:
+                    session = self._spawn(key, model, expert, expert_config, idle_timeout)
+                    session.in_use = True
+                    self._sessions[key] = session
+                    return session
+            await self._stop(evict)
+
+    async def _wait(self, deadline: float, reason: str) -> None:
+        """Wait, holding `_condition`, until a session is released or `deadline` passes."""
+        try:
+            await asyncio.wait_for(self._condition.wait(), timeout=max(0.0, deadline - time.monotonic()))
+        except TimeoutError:
+            raise SubgraphSessionsBusyError(f"Timed out waiting for a subgraph session: {reason}") from None
+
+    def _spawn(self, key: tuple[str, str, str, str], model: str, expert: str, expert_config: dict, idle_timeout: float) -> SubgraphSession:
+        ready: asyncio.Future = asyncio.get_running_loop().create_future()
+        stop = asyncio.Event()
+        owner = asyncio.create_task(self._own(model, expert, expert_config, ready, stop), name=f"subgraph-session:{expert}")
+        return SubgraphSession(key=key, ready=ready, owner=owner, stop=stop, idle_timeout=idle_timeout)
+
+    async def _own(self, model: str, expert: str, expert_config: dict, ready: asyncio.Future, stop: asyncio.Event) -> None:
+        # the session's context managers must be entered and exited by the same task
+        try:
+            async with self._factory(model, expert, expert_config) as agent:
+                ready.set_result(agent)
+                await stop.wait()
+        except BaseException as e:
+            if not ready.done():
+                ready.set_exception(e if isinstance(e, Exception) else RuntimeError(repr(e)))
+            if isinstance(e, asyncio.CancelledError):
+                raise
+
+    async def _close(self, session: SubgraphSession) -> None:
+        async with self._condition:
+            if self._sessions.get(session.key) is session:
+                del self._sessions[session.key]
+            self._condition.notify_all()
+        await self._stop(session)
+
+    async def _stop(self, session: SubgraphSession) -> None:
+        session.stop.set()
+        _, pending = await asyncio.wait({session.owner}, timeout=10)
+        if pending:
+            session.owner.cancel()
+
+    def _ensure_reaper(self) -> None:
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_forever(), name="subgraph-session-reaper")
+
+    async def _reap_forever(self) -> None:
+        interval = max(1.0, min(self.idle_timeout / 2, 60.0))
+        while True:
+            await asyncio.sleep(interval)
+            await self.reap_idle()
+
+    async def reap_idle(self) -> int:
+        """Close sessions that have been idle longer than their idle timeout."""
+        now = time.monotonic()
+        async with self._condition:
+            expired = [
+                s for s in self._sessions.values()
+                if not s.in_use and (not s.alive or now - s.last_used > s.idle_timeout)
+            ]
+            for session in expired:
+                del self._sessions[session.key]
+            self._condition.notify_all()
+        for session in expired:
+            await self._stop(session)
+        return len(expired)
+
+    async def release_thread(self, thread_id: str) -> None:
+        """Close the idle sessions of a thread, e.g. when the conversation ends."""
+        async with self._condition:
+            sessions = [s for s in self._sessions.values() if s.key[0] == thread_id and not s.in_use]
+            for session in sessions:
+                del self._sessions[session.key]
+            self._condition.notify_all()
+        for session in sessions:
+            await self._stop(session)
+
+    def describe(self) -> dict[str, Any]:
+        """Snapshot of open sessions, for diagnostics."""
+        return {
+            "open": len(self._sessions),
+            "in_use": sum(1 for s in self._sessions.values() if s.in_use),
+            "max_sessions": self.max_sessions,
+        }
+
+    async def close(self) -> None:
+        """Close every session and stop the idle reaper."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            await self._stop(session)
+
+
+_managers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, SubgraphSessionManager]" = weakref.WeakKeyDictionary()
+
+
+def get_subgraph_session_manager(factory: SubgraphFactory) -> SubgraphSessionManager:
+    """Get the subgraph session manager of the running event loop."""
+    loop = asyncio.get_running_loop()
+    manager = _managers.get(loop)
+    if manager is None:
+        manager = _managers[loop] = SubgraphSessionManager(factory)
+    return manager
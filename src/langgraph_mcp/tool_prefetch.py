@@ -0,0 +1,109 @@
+import asyncio
+import logging
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Collection, Optional
+
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.utils.json import parse_partial_json
+
+from langgraph_mcp.mcp_wrapper import get_tools
+from langgraph_mcp.utils import get_message_text
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PrefetchStats:
+    """Counters describing how speculative tool prefetches turned out."""
+
+    started: int = 0
+    used: int = 0
+    cancelled: int = 0
+
+
+_stats = PrefetchStats()
+# Prefetches of chosen experts outlive the planner node; keep references until they finish
+_background: set[asyncio.Task] = set()
+
+
+def get_prefetch_stats() -> dict[str, Any]:
+    """Get counters of speculative tool prefetches."""
+    return asdict(_stats)
+
+
+def _finished(task: asyncio.Task) -> None:
+    _background.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.debug("Speculative tool prefetch failed: %r", task.exception())
+
+
+def planned_experts(plan_json: str) -> list[str]:
+    """Experts of the (possibly incomplete) plan JSON streamed so far, once their names are complete.
+
+    An expert's name is complete once the task's next field (`task`) has started streaming.
+    """
+    try:
+        parsed = parse_partial_json(plan_json)
+    except Exception:
+        return []
+    plan = parsed.get("plan") if isinstance(parsed, dict) else None
+    if not isinstance(plan, list):
+        return []
+    return [
+        task["expert"] for task in plan
+        if isinstance(task, dict) and isinstance(task.get("expert"), str) and "task" in task
+    ]
+
+
+class ToolPrefetch:
+    """Speculatively opens sessions to, and loads the tool catalogs of, the experts a planner may pick.
+
+    Guesses come from the previous plan (`guess`) and from the plan as the model streams it
+    (`run`). Each guess warms the expert's pooled session and its tool catalog cache entry in
+    the background, overlapping MCP setup with LLM latency. Once the plan is known, `settle`
+    cancels the guesses that weren't chosen.
+    """
+
+    def __init__(self, get_server_config: Callable[[str], Optional[dict]]):
+        self._get_server_config = get_server_config
+        self.tasks: dict[str, asyncio.Task] = {}
+
+    def guess(self, expert: str) -> None:
+        if expert in self.tasks:
+            return
+        server_config = self._get_server_config(expert)
+        if not server_config:
+            return
+        task = asyncio.create_task(get_tools(expert, server_config), name=f"tool-prefetch:{expert}")
+        _background.add(task)
+        task.add_done_callback(_finished)
+        self.tasks[expert] = task
+        _stats.started += 1
+
+    async def run(self, runnable: Runnable, input: Any, config: RunnableConfig) -> Any:
+        """Invoke `runnable` (a structured-output model), guessing experts from the streamed plan."""
+        root = None
+        output = None
+        tool_args, content = "", ""
+        async for event in runnable.astream_events(input, config, version="v2"):
+            if root is None:
+                root = event["run_id"]
+            if event["event"] == "on_chat_model_stream":
+                chunk = event["data"]["chunk"]
+                # the plan streams as tool call arguments, or as content (JSON mode)
+                tool_args += "".join(c.get("args") or "" for c in getattr(chunk, "tool_call_chunks", None) or [])
+                content += get_message_text(chunk)
+                for expert in planned_experts(tool_args or content):
+                    self.guess(expert)
+            elif event["event"] == "on_chain_end" and event["run_id"] == root:
+                output = event["data"].get("output")
+        return output
+
+    def settle(self, chosen: Collection[str]) -> None:
+        """Cancel the prefetches of experts that aren't `chosen`; the others keep running."""
+        for expert, task in self.tasks.items():
+            if expert in chosen:
+                _stats.used += 1
+            elif not task.done():
+                task.cancel()
+                _stats.cancelled += 1
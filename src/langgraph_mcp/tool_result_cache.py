@@ -0,0 +1,117 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from mcp.types import ToolAnnotations
+
+from langgraph_mcp.mcp_session_pool import config_fingerprint
+
+
+@dataclass
+class ToolResultCacheStats:
+    """Counters describing how the tool result cache has been used."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+
+def is_read_only(annotations: Optional[ToolAnnotations]) -> bool:
+    """Whether the server declares the tool free of side effects (`readOnlyHint`)."""
+    return bool(annotations and annotations.readOnlyHint and not annotations.destructiveHint)
+
+
+class ToolResultCache:
+    """Caches the results of idempotent MCP tool calls.
+
+    Caching is opt-in per server with `"result_cache"` in the server config:
+
+        "result_cache": {"tools": {"get_forecast": 600, "create_issue": 0}, "read_only_ttl": 60}
+
+    `tools` sets the TTL (seconds) of individual tools (`0` never caches a tool);
+    `read_only_ttl` caches every other tool the server annotates with `readOnlyHint`.
+    Results are keyed by server, server config, tool name and canonicalized arguments,
+    at most `max_entries` are kept (least recently used are evicted first), and calling
+    a tool that is not known to be read-only drops the cached results of its server.
+    A result is only stored if its server wasn't invalidated while the call ran.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.stats = ToolResultCacheStats()
+        self._entries: OrderedDict[tuple[str, str, str, str], tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generations: dict[str, int] = {}
+        self._epoch = 0
+
+    @staticmethod
+    def enabled(server_config: dict) -> bool:
+        return bool(server_config.get("result_cache"))
+
+    @staticmethod
+    def ttl_for(server_config: dict, tool_name: str, annotations: Optional[ToolAnnotations]) -> float:
+        """Seconds to cache results of the tool for; 0 means don't cache."""
+        cache_cfg = server_config.get("result_cache") or {}
+        tools = cache_cfg.get("tools") or {}
+        if tool_name in tools:
+            return float(tools[tool_name] or 0)
+        if is_read_only(annotations):
+            return float(cache_cfg.get("read_only_ttl") or 0)
+        return 0.0
+
+    @staticmethod
+    def key(server_name: str, server_config: dict, tool_name: str, args: dict[str, Any]) -> tuple[str, str, str, str]:
+        canonical_args = json.dumps(args, sort_keys=True, separators=(",", ":"), default=str)
+        return server_name, config_fingerprint(server_config), tool_name, canonical_args
+
+    def get(self, key: tuple[str, str, str, str]) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() >= entry[1]:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[0]
+
+    def generation(self, server_name: str) -> tuple[int, int]:
+        """Changes whenever the server's results are invalidated; pass it to `set`."""
+        with self._lock:
+            return self._epoch, self._generations.get(server_name, 0)
+
+    def set(
+        self,
+        key: tuple[str, str, str, str],
+        content: str,
+        ttl: float,
+        generation: Optional[tuple[int, int]] = None,
+    ) -> None:
+        """Store a result, unless its server was invalidated since `generation` was taken."""
+        with self._lock:
+            if generation is not None and generation != (self._epoch, self._generations.get(key[0], 0)):
+                return
+            self._entries[key] = (content, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def invalidate(self, server_name: Optional[str] = None) -> int:
+        """Drop cached results of `server_name`, or of every server if None."""
+        with self._lock:
+            if server_name is None:
+                self._epoch += 1
+            else:
+                self._generations[server_name] = self._generations.get(server_name, 0) + 1
+            keys = [key for key in self._entries if server_name is None or key[0] == server_name]
+            for key in keys:
+                del self._entries[key]
+            self.stats.invalidations += len(keys)
+            return len(keys)
@@ -1,6 +1,18 @@
+import asyncio
+import json
+import os
+import threading
+import weakref
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Optional, Sequence
+
+import httpx
+import openai
 from langchain.chat_models import init_chat_model
-from langchain_core.language_models import BaseChatModel
-from langchain_core.messages import AnyMessage
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
+from langchain_core.messages import AnyMessage, BaseMessage, BaseMessageChunk, message_chunk_to_message
+from langchain_core.runnables import Runnable, RunnableConfig
+from langgraph.config import get_stream_writer
 
 from langchain_openai import ChatOpenAI
 
@@ -35,23 +47,203 @@ def get_message_text(msg: AnyMessage) -> str:
         return "".join(txts).strip()
 
 
-def load_chat_model(fully_specified_name: str) -> BaseChatModel:
-    """Load a chat model from a fully specified name.
+LM_STUDIO_BASE_URL = "http://localhost:1234/v1"
+OPENAI_DEFAULT_BASE_URL = "https://api.openai.com/v1"
 
-    Args:
-        fully_specified_name (str): String in the format 'provider/model'.
+
+@dataclass
+class ModelCacheStats:
+    """Counters describing how the model registry has been used."""
+
+    hits: int = 0
+    misses: int = 0
+
+
+ModelKey = tuple[str, str]
+
+# Models built outside of an event loop, and models built on each event loop: models
+# hold the loop's async HTTP client, whose connections belong to that loop
+_models: dict[ModelKey, BaseChatModel] = {}
+_loop_models: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[ModelKey, BaseChatModel]]" = weakref.WeakKeyDictionary()
+_http_clients: dict[str, httpx.Client] = {}
+_async_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+_registry_lock = threading.Lock()
+_model_cache_stats = ModelCacheStats()
+_providers: dict[str, Callable[..., BaseChatModel]] = {}
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _shared_http_clients(base_url: str) -> dict[str, Any]:
+    """HTTP clients shared by every model client talking to `base_url`.
+
+    Sharing the clients shares their connection pools, so keep-alive connections (and
+    their TLS sessions) are reused across models and node invocations. The sync client is
+    shared process-wide; the async client is shared per event loop, as its connections
+    are bound to the loop that opened them. Both keep the OpenAI SDK's default timeouts
+    and connection limits.
     """
+    clients: dict[str, Any] = {}
+    if base_url not in _http_clients:
+        _http_clients[base_url] = openai.DefaultHttpxClient()
+    clients["http_client"] = _http_clients[base_url]
+    loop = _running_loop()
+    if loop is not None:
+        async_clients = _async_http_clients.setdefault(loop, {})
+        if base_url not in async_clients:
+            async_clients[base_url] = openai.DefaultAsyncHttpxClient()
+        clients["http_async_client"] = async_clients[base_url]
+    return clients
+
+
+def _build_chat_model(fully_specified_name: str, **kwargs: Any) -> BaseChatModel:
     if "/" in fully_specified_name:
         provider, model = fully_specified_name.split("/", maxsplit=1)
     else:
         provider = ""
         model = fully_specified_name
+    if provider in _providers:
+        return _providers[provider](model, **kwargs)
     if provider == "lm-studio" or model == "lm-studio":
         return ChatOpenAI(
-            base_url="http://localhost:1234/v1",
-            model=model,
-            temperature=0.7,
-            api_key="lm-studio"
+            **{
+                "base_url": LM_STUDIO_BASE_URL,
+                "model": model,
+                "temperature": 0.7,
+                "api_key": "lm-studio",
+                **_shared_http_clients(LM_STUDIO_BASE_URL),
+                **kwargs,
+            }
         )
+    elif provider == "openai":
+        base_url = kwargs.get("base_url") or os.getenv("OPENAI_BASE_URL") or OPENAI_DEFAULT_BASE_URL
+        return init_chat_model(model, model_provider=provider, **{**_shared_http_clients(base_url), **kwargs})
     else:
-        return init_chat_model(model, model_provider=provider)
+        return init_chat_model(model, model_provider=provider, **kwargs)
+
+
+def load_chat_model(fully_specified_name: str, **kwargs: Any) -> BaseChatModel:
+    """Load a chat model from a fully specified name.
+
+    Model clients are memoized by name and parameters (per event loop, when called from
+    one), so nodes can call this on every invocation without rebuilding the client.
+    OpenAI-compatible clients talking to the same base URL share one HTTP connection pool.
+
+    Args:
+        fully_specified_name (str): String in the format 'provider/model'.
+        **kwargs: Additional parameters for the model client (e.g., temperature).
+    """
+    key = (fully_specified_name, json.dumps(kwargs, sort_keys=True, default=repr))
+    loop = _running_loop()
+    with _registry_lock:
+        models = _models if loop is None else _loop_models.setdefault(loop, {})
+        model = models.get(key)
+        if model is not None:
+            _model_cache_stats.hits += 1
+            return model
+        _model_cache_stats.misses += 1
+        model = models[key] = _build_chat_model(fully_specified_name, **kwargs)
+        return model
+
+
+def _all_models() -> list[dict[ModelKey, BaseChatModel]]:
+    return [_models, *list(_loop_models.values())]
+
+
+async def aclose_http_clients() -> None:
+    """Close the async HTTP clients of the running event loop, and forget the models using them.
+
+    Call it before the loop shuts down (e.g. in the server lifespan); the next model
+    loaded on the loop gets fresh clients.
+    """
+    loop = asyncio.get_running_loop()
+    with _registry_lock:
+        clients = _async_http_clients.pop(loop, {})
+        _loop_models.pop(loop, None)
+    for client in clients.values():
+        await client.aclose()
+
+
+def get_model_cache_stats() -> dict[str, Any]:
+    """Get usage statistics of the model registry."""
+    with _registry_lock:
+        return {
+            **asdict(_model_cache_stats),
+            "models": [name for models in _all_models() for name, _ in models],
+            "http_pools": list(_http_clients),
+        }
+
+
+def register_chat_model_provider(provider: str, factory: Callable[..., BaseChatModel]) -> None:
+    """Resolve `<provider>/<model>` names with `factory(model, **kwargs)` (e.g. local or fake models).
+
+    Memoized models of the provider are dropped, so the next `load_chat_model` uses the factory.
+    """
+    with _registry_lock:
+        _providers[provider] = factory
+        for models in _all_models():
+            for key in [key for key in models if key[0].split("/", 1)[0] == provider]:
+                del models[key]
+
+
+def clear_model_cache() -> None:
+    """Forget memoized model clients (shared HTTP clients are kept, as live models may use them)."""
+    with _registry_lock:
+        for models in _all_models():
+            models.clear()
+
+
+def _leading_tag(text: str, tags: Sequence[str]) -> Optional[str]:
+    """Decide which tag the (partial) message text starts with.
+
+    Returns the matching tag, "" once the text can no longer start with any tag, or
+    None while the text is still a prefix of some tag.
+    """
+    text = text.lstrip()
+    for tag in tags:
+        if text.startswith(tag):
+            return tag
+    if any(tag.startswith(text) for tag in tags):
+        return None
+    return ""
+
+
+async def stream_model_response(
+    model: Runnable[LanguageModelInput, BaseMessage],
+    context: LanguageModelInput,
+    config: RunnableConfig,
+    tags: Sequence[str] = (),
+) -> BaseMessage:
+    """Call a chat model in streaming mode and return the complete message.
+
+    Tokens are surfaced as they are generated through LangGraph's `messages` stream mode.
+    If `tags` are given, the tag the response starts with is detected from the first
+    tokens and written to the `custom` stream as `{"node": <node>, "tag": <tag>}`, so
+    clients can react to the outcome (e.g. prepare for a question to the user) before
+    the message is complete. Responses that start with no tag (or with a tool call)
+    are reported with `"tag": ""`.
+    """
+    try:
+        write = get_stream_writer()
+    except RuntimeError:  # not running inside a graph
+        write = None
+    node = (config.get("metadata") or {}).get("langgraph_node")
+    full: Optional[BaseMessageChunk] = None
+    detected: Optional[str] = None if tags else ""
+    async for chunk in model.astream(context, config):
+        full = chunk if full is None else full + chunk
+        if detected is None:
+            if getattr(full, "tool_call_chunks", None):
+                detected = ""
+            else:
+                detected = _leading_tag(get_message_text(full), tags)
+            if detected is not None and write is not None:
+                write({"node": node, "tag": detected})
+    if full is None:
+        raise ValueError("Model returned an empty stream")
+    return message_chunk_to_message(full)
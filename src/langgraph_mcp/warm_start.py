@@ -0,0 +1,162 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import weakref
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Literal, Optional
+
+from langgraph_mcp.instrumentation import WARM_START, span
+from langgraph_mcp.mcp_session_pool import MCPSessionPool
+from langgraph_mcp.mcp_wrapper import get_session_pool, get_tools
+from langgraph_mcp.retrieval import get_routing_description_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WARM_START_TIMEOUT = 120.0
+
+WarmupState = Literal["pending", "warming", "ready", "failed", "skipped", "evicted"]
+
+
+@dataclass
+class ServerWarmup:
+    """Warm-up progress of one server."""
+
+    state: WarmupState = "pending"
+    tools: int = 0
+    duration: Optional[float] = None
+    error: Optional[str] = None
+
+
+def load_mcp_server_config(path: str | Path) -> dict[str, dict]:
+    """Read the servers to warm from a JSON file.
+
+    The file is either an `mcp-servers-config.json` (server name -> server config), or an
+    assistant configuration holding `mcp_server_config` (optionally under `configurable`).
+    """
+    data = json.loads(Path(path).read_text())
+    data = data.get("configurable", data)
+    return data.get("mcp_server_config", data)
+
+
+class WarmStart:
+    """Pre-spawns and initializes MCP sessions and prefetches catalogs in the background.
+
+    Every server is warmed concurrently: its pooled session is opened (`initialize`d), its
+    tool catalog fetched into the tool catalog cache, and its routing description stored
+    for expert retrieval. A server is bounded by `timeout` seconds; failures are reported
+    by `readiness()` and don't stop the other servers. Set `"warm_start": false` in a
+    server config to leave it cold.
+
+    The warmed session is pinned in the pool, so the idle timeout doesn't close it; if it
+    is closed anyway (e.g. the server process died), `readiness()` reports the server as
+    `evicted` and the next use of the server opens a new session.
+    """
+
+    def __init__(self, mcp_server_config: dict[str, dict], timeout: float = DEFAULT_WARM_START_TIMEOUT):
+        self.mcp_server_config = mcp_server_config
+        self.timeout = timeout
+        self.servers = {
+            name: ServerWarmup(state="pending" if config.get("warm_start", True) is not False else "skipped")
+            for name, config in mcp_server_config.items()
+        }
+        self._task: Optional[asyncio.Task] = None
+        self._pool: Optional[MCPSessionPool] = None
+
+    def start(self) -> asyncio.Task:
+        """Start warming on the running event loop (the one the graphs will run on)."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.warm())
+        return self._task
+
+    async def warm(self) -> None:
+        self._pool = get_session_pool()
+        await asyncio.gather(*(
+            self._warm_server(name, config)
+            for name, config in self.mcp_server_config.items()
+            if self.servers[name].state == "pending"
+        ))
+
+    async def _warm_server(self, server_name: str, server_config: dict) -> None:
+        status = self.servers[server_name]
+        status.state = "warming"
+        started = time.perf_counter()
+        try:
+            with span(WARM_START, server=server_name):
+                async with asyncio.timeout(self.timeout):
+                    status.tools = len(await get_tools(server_name, server_config))
+                    pool = get_session_pool()
+                    pool.pin(server_name, server_config)
+                    if not pool.has_session(server_name, server_config):
+                        async with pool.session(server_name, server_config):
+                            pass  # the catalog was already cached: open the session anyway
+                    await get_routing_description_cache().describe({server_name: server_config})
+            status.state = "ready"
+        except Exception as e:
+            status.state = "failed"
+            status.error = f"{type(e).__name__}: {e}"
+            logger.warning("Failed to warm up server '%s': %s", server_name, status.error, extra={"server": server_name})
+        finally:
+            status.duration = time.perf_counter() - started
+
+    @property
+    def done(self) -> bool:
+        return all(status.state not in ("pending", "warming") for status in self.servers.values())
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the warm-up to finish; whether it did within `timeout` seconds."""
+        if self._task is None:
+            return self.done
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.done
+
+    def readiness(self) -> dict[str, Any]:
+        """`ready` once every server is warm (or failed / skipped); `healthy` if none failed or was evicted."""
+        if self._pool is not None:
+            for name, status in self.servers.items():
+                if status.state == "ready" and not self._pool.has_session(name, self.mcp_server_config[name]):
+                    status.state = "evicted"
+        return {
+            "ready": self.done,
+            "healthy": self.done and all(status.state not in ("failed", "evicted") for status in self.servers.values()),
+            "servers": {name: asdict(status) for name, status in self.servers.items()},
+        }
+
+
+# Warm-ups by event loop, as MCP sessions are bound to the loop that opened them
+_warm_starts: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, WarmStart]" = weakref.WeakKeyDictionary()
+
+
+def start_warm_start(mcp_server_config: Optional[dict[str, dict]] = None, timeout: Optional[float] = None) -> Optional[WarmStart]:
+    """Start warming the servers on the running event loop.
+
+    Without `mcp_server_config`, the servers are read from the file named by
+    `$LANGGRAPH_MCP_WARM_START` (see `load_mcp_server_config`); if it isn't set, nothing is
+    warmed and None is returned. `$LANGGRAPH_MCP_WARM_START_TIMEOUT` bounds each server.
+    """
+    loop = asyncio.get_running_loop()
+    if loop in _warm_starts:
+        return _warm_starts[loop]
+    if mcp_server_config is None:
+        path = os.getenv("LANGGRAPH_MCP_WARM_START")
+        if not path:
+            return None
+        mcp_server_config = load_mcp_server_config(path)
+    if timeout is None:
+        timeout = float(os.getenv("LANGGRAPH_MCP_WARM_START_TIMEOUT") or DEFAULT_WARM_START_TIMEOUT)
+    warm_start = _warm_starts[loop] = WarmStart(mcp_server_config, timeout)
+    warm_start.start()
+    return warm_start
+
+
+def get_readiness() -> dict[str, Any]:
+    """Readiness of the warm-up on the running event loop; ready if no warm-up was started."""
+    warm_start = _warm_starts.get(asyncio.get_running_loop())
+    if warm_start is None:
+        return {"ready": True, "healthy": True, "servers": {}}
+    return warm_start.readiness()
@@ -0,0 +1,78 @@
+from dataclasses import asdict, dataclass
+from typing import Any, Optional, Sequence
+
+from langchain_core.messages import AIMessage, AnyMessage, ToolMessage
+
+from langgraph_mcp.utils import get_message_text
+
+
+@dataclass
+class AssessmentStats:
+    """Counts of how task completion was decided."""
+
+    rule_based: int = 0
+    """Decided by deterministic rules, without any LLM call."""
+
+    fast_model: int = 0
+    """Decided by the (cheap) `task_assessment_fast_model`."""
+
+    full_model: int = 0
+    """Escalated to the configured `task_assessment_model`."""
+
+    @property
+    def llm_calls_avoided(self) -> int:
+        """Calls to `task_assessment_model` that were not needed."""
+        return self.rule_based + self.fast_model
+
+
+assessment_stats = AssessmentStats()
+
+
+def get_assessment_stats() -> dict[str, Any]:
+    """Counters of the task assessment tiers since process start."""
+    return {**asdict(assessment_stats), "llm_calls_avoided": assessment_stats.llm_calls_avoided}
+
+
+def _is_error(message: ToolMessage) -> bool:
+    return message.status == "error" or get_message_text(message).startswith("Error:")
+
+
+def assess_by_rules(
+    messages: Sequence[AnyMessage],
+    server_config: Optional[dict],
+    task_complete_tag: str,
+) -> Optional[bool]:
+    """Decide task completion without an LLM when the outcome is deterministic.
+
+    - The orchestrator tagged its message with `task_complete_tag`: complete.
+    - Every tool call of the last step failed: not complete (the orchestrator has to retry
+      or ask for help).
+    - A tool listed in the expert's `"assessment": {"completing_tools": [...]}` server
+      config succeeded: complete.
+
+    Returns:
+        True / False when the rules decide, None when an LLM has to assess the task.
+    """
+    if not messages:
+        return None
+    last = messages[-1]
+    if isinstance(last, AIMessage) and not last.tool_calls:
+        if task_complete_tag in get_message_text(last):
+            return True
+        return None
+    if not isinstance(last, ToolMessage):
+        return None
+
+    # the results of the last tool calling step
+    results: list[ToolMessage] = []
+    for message in reversed(messages):
+        if not isinstance(message, ToolMessage):
+            break
+        results.append(message)
+    succeeded = [result for result in results if not _is_error(result)]
+    if not succeeded:
+        return False
+    completing_tools = set(((server_config or {}).get("assessment") or {}).get("completing_tools") or [])
+    if any(result.name in completing_tools for result in succeeded):
+        return True
+    return None
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field, fields
-from typing import Annotated, Any, Dict, Optional, Type, TypeVar
+from typing import Annotated, Any, Dict, Iterable, Optional, Type, TypeVar
 from langchain_core.runnables import RunnableConfig, ensure_config
 
 from langgraph_mcp.with_planner import prompts
@@ -50,6 +50,18 @@ class Configuration:
         },
     )
 
+    task_assessment_fast_model: Annotated[Optional[str], {"__template_metadata__": {"kind": "llm"}}] = field(
+        default=None,
+        metadata={
+            "description": "Optional cheap language model tried before the task_assessment_model; its verdict is used when confident enough. Should be in the form: provider/model-name."
+        },
+    )
+
+    task_assessment_fast_model_min_confidence: float = field(
+        default=0.9,
+        metadata={"description": "Minimum confidence for the task_assessment_fast_model verdict to be used instead of escalating to the task_assessment_model."},
+    )
+
     generate_response_system_prompt: str = field(
         default=prompts.GENERATE_RESPONSE_SYSTEM_PROMPT,
         metadata={"description": "The system prompt used for generating final responses after plan completion."},
@@ -62,6 +74,38 @@ class Configuration:
         },
     )
 
+    context_max_messages: Optional[int] = field(
+        default=None,
+        metadata={"description": "Maximum number of recent messages the LLM nodes send to their models. None keeps the whole conversation."},
+    )
+
+    context_max_tokens: Optional[int] = field(
+        default=None,
+        metadata={"description": "Approximate token budget for the recent messages the LLM nodes send to their models. None means no budget."},
+    )
+
+    context_windows: dict[str, dict[str, int]] = field(
+        default_factory=dict,
+        metadata={"description": "Per-node overrides of the context window, e.g. {\"respond\": {\"max_messages\": 40}}. Keys: max_messages, max_tokens."},
+    )
+
+    context_summary_model: Annotated[Optional[str], {"__template_metadata__": {"kind": "llm"}}] = field(
+        default=None,
+        metadata={
+            "description": "The language model used to keep a rolling summary of messages that slide out of the context window. None drops them without a summary. Should be in the form: provider/model-name."
+        },
+    )
+
+    orchestrate_tools_top_k: Optional[int] = field(
+        default=None,
+        metadata={"description": "Number of an expert's tools, ranked by relevance to the current task, bound to the model in orchestrate_tools (all tools are bound after an IDK answer). None binds every tool."},
+    )
+
+    planner_experts_top_k: Optional[int] = field(
+        default=None,
+        metadata={"description": "Number of experts, ranked by relevance to the conversation, listed in the planner prompt (experts of the current plan are always listed). None lists every configured expert."},
+    )
+
     @classmethod
     def from_runnable_config(
         cls: Type[T], config: Optional[RunnableConfig] = None
@@ -80,15 +124,18 @@ class Configuration:
         _fields = {f.name for f in fields(cls) if f.init}
         return cls(**{k: v for k, v in configurable.items() if k in _fields})
     
-    def get_mcp_server_descriptions(self) -> list[tuple[str, str]]:
-        """Get a list of descriptions of all MCP servers in the specified configuration."""
+    def get_mcp_server_descriptions(self, server_names: Optional[Iterable[str]] = None) -> list[tuple[str, str]]:
+        """Get a list of descriptions of the MCP servers in the specified configuration (all of them by default)."""
         descriptions = []
+        selected = set(server_names) if server_names is not None else None
         for server_name, server_config in self.mcp_server_config.items():
+            if selected is not None and server_name not in selected:
+                continue
             description = server_config.get('description', '')
             descriptions.append((server_name, description))
         return descriptions
     
-    def build_experts_context(self) -> str:
+    def build_experts_context(self, server_names: Optional[Iterable[str]] = None) -> str:
         """Build the experts part of the prompt for the planning task.
         
         Here's the format to use:
@@ -96,10 +143,13 @@ class Configuration:
         - <server_name>: <server_description>
         ...
 
+        Args:
+            server_names (Optional[Iterable[str]]): Experts to include; all of them if None.
+
         Returns:
             str: The experts part of the prompt.
         """
-        return "\n".join([f"- {server_name}: {server_description}" for server_name, server_description in self.get_mcp_server_descriptions()])
+        return "\n".join([f"- {server_name}: {server_description}" for server_name, server_description in self.get_mcp_server_descriptions(server_names)])
     
     def get_server_config(self, server_name: str) -> Dict[str, Any] | None:
         """Get server configuration for the specified server.
@@ -2,21 +2,27 @@ from datetime import datetime, timezone
 from typing import Literal, Union, Dict, Any, cast
 from pydantic import BaseModel, Field
 from langchain_core.messages import BaseMessage, AIMessage, ToolMessage, HumanMessage
-from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
-from langgraph.cache.memory import InMemoryCache
 from langgraph.types import interrupt, CachePolicy
 
 from langgraph_mcp import mcp_wrapper as mcp
+from langgraph_mcp.blob_store import READ_TOOL_RESULT_TOOL, has_offloaded_results
+from langgraph_mcp.compiled_context import get_compiled_context
+from langgraph_mcp.context_window import manage_context
+from langgraph_mcp.node_cache import BoundedInMemoryCache, config_fingerprint_node, state_cache_key, uncacheable
+from langgraph_mcp.resilience import EXPERT_UNAVAILABLE, is_unavailable, unavailable_experts, unwrap
+from langgraph_mcp.retrieval import select_experts, select_tools
 from langgraph_mcp.state import InputState
-from langgraph_mcp.utils import load_chat_model
+from langgraph_mcp.utils import load_chat_model, stream_model_response
 
+from langgraph_mcp.with_planner.assessment import assess_by_rules, assessment_stats
 from langgraph_mcp.with_planner.config import Configuration
 from langgraph_mcp.with_planner.state import State, PlannerResult
 
 # Tags for special message responses
 IDK_TAG = "[::IDK::]"
+TASK_COMPLETE_TAG = "[::TASK_COMPLETE::]"
 
 class TaskAssessmentResult(BaseModel):
     """Output schema for task assessment LLM evaluation."""
@@ -25,25 +31,38 @@ class TaskAssessmentResult(BaseModel):
     confidence: float = Field(description="Confidence score between 0 and 1")
 
 async def planner(state: State, *, config: RunnableConfig) -> Dict[str, Any]:
-    # get configurations
-    configuration = Configuration.from_runnable_config(config)
-    # build a chat prompt template with instructions for the plan evaluation task and messages in the memory
-    prompt = ChatPromptTemplate.from_messages(
-        [
-            ("system", configuration.planner_system_prompt),
-            ("placeholder", "{messages}"),
-        ]
-    )
+    # get configurations (compiled once per assistant configuration)
+    compiled = get_compiled_context(config, Configuration, state.config_fingerprint)
+    configuration = compiled.cfg
+    # chat prompt template with instructions for the plan evaluation task and messages in the memory
+    prompt = compiled.prompts["planner"]
     # load the chat model configured for the planning task
     model = load_chat_model(configuration.planner_model)
     # let's get the current plan from the state
     current_plan = state.planner_result.plan if state.planner_result else []
     # let's build the experts list available for the planning task
-    experts = configuration.build_experts_context()
+    experts = compiled.experts
+    selected = None
+    if configuration.planner_experts_top_k:
+        # only list the experts relevant to the conversation (and the ones of the current plan)
+        selected = await select_experts(
+            configuration.mcp_server_config, compiled.fingerprint, state.messages,
+            configuration.planner_experts_top_k, keep=[task.expert for task in current_plan],
+        )
+        experts = configuration.build_experts_context(selected)
+    # experts whose servers keep failing are left out until their circuit breaker recovers,
+    # and experts whose server failed during this turn for the rest of the turn
+    unavailable = unavailable_experts(configuration.mcp_server_config, state.messages)
+    if unavailable:
+        names = selected if selected is not None else configuration.mcp_server_config
+        experts = configuration.build_experts_context([name for name in names if name not in unavailable])
+        experts += f"\n\nCurrently unavailable (do not plan tasks for them): {', '.join(unavailable)}"
+    # let's fit the conversation into the planner's context window
+    messages, result = await manage_context(state.messages, state.conversation_summary, configuration, "planner", config)
     # let's build the final prompt with all the context and memory
     context = await prompt.ainvoke(
         {
-            "messages": state.messages,
+            "messages": messages,
             "experts": experts,
             "plan": current_plan,
             "system_time": datetime.now(tz=timezone.utc).isoformat(),
@@ -52,7 +71,7 @@ async def planner(state: State, *, config: RunnableConfig) -> Dict[str, Any]:
     )
     # lets convey the output structure desired and call the model
     response = await model.with_structured_output(PlannerResult).ainvoke(context, config)
-    result: Dict[str, Any] = {"planner_result": response}
+    result["planner_result"] = response
     # if the model asks for clarification, we'll add the clarification seeking message to the state as well
     if isinstance(response, PlannerResult) and response.clarification:
         result["messages"] = [AIMessage(content=response.clarification)]
@@ -67,49 +86,72 @@ def decide_planner_edge(state: State) -> str:
     return END
 
 async def orchestrate_tools(state: State, *, config: RunnableConfig) -> Dict[str, Any]:
-    # get configurations
-    configuration = Configuration.from_runnable_config(config)
-    # build a chat prompt template with instructions for orchestrating across expert tools
-    prompt = ChatPromptTemplate.from_messages(
-        [
-            ("system", configuration.orchestrate_system_prompt),
-            ("placeholder", "{messages}"),
-        ]
-    )
+    # get configurations (compiled once per assistant configuration)
+    compiled = get_compiled_context(config, Configuration, state.config_fingerprint)
+    configuration = compiled.cfg
+    # chat prompt template with instructions for orchestrating across expert tools
+    prompt = compiled.prompts["orchestrate"]
     # load the chat model configured for the task of orchestrating across expert tools
     model = load_chat_model(configuration.orchestrate_model)
     # get the current plan from the state
     current_plan = state.planner_result.plan if state.planner_result else []
     # get the current task from the plan
     current_task = state.planner_result.get_current_task() if state.planner_result else None
+    # fit the conversation into the orchestrator's context window
+    messages, result = await manage_context(state.messages, state.conversation_summary, configuration, "orchestrate_tools", config)
     # build the final prompt with all the context and memory
     context = await prompt.ainvoke(
         {
-            "messages": state.messages,
+            "messages": messages,
             "plan": [task.model_dump() for task in current_plan],
             "task": current_task.task if current_task else "",
             "idk_tag": IDK_TAG,
+            "task_complete_tag": TASK_COMPLETE_TAG,
             "system_time": datetime.now(tz=timezone.utc).isoformat(),
         },
         config,
     )
     # get the tools for the current expert using our MCP wrapper and bind them to the model
     if current_task:
-        server_config = configuration.get_server_config(current_task.expert)
+        server_config = compiled.get_server_config(current_task.expert)
         if server_config:
-            tools = await mcp.apply(current_task.expert, server_config, mcp.GetTools())
+            try:
+                tools = await mcp.get_tools(current_task.expert, server_config)
+            except Exception as e:
+                if not is_unavailable(e):
+                    raise
+                # the expert's server can't be reached: the planner plans around it (never cached,
+                # so the task runs again once the server recovers)
+                message = AIMessage(
+                    content=f"{IDK_TAG} The expert {current_task.expert} is unavailable ({type(unwrap(e)).__name__}: {unwrap(e)}).",
+                    response_metadata={EXPERT_UNAVAILABLE: current_task.expert},
+                )
+                return {**result, "messages": [uncacheable(message)]}
+            # bind only the tools relevant to the task; all of them once the expert answered IDK
+            if configuration.orchestrate_tools_top_k:
+                tools = select_tools(
+                    current_task.expert, tools, current_task.task, state.messages,
+                    configuration.orchestrate_tools_top_k, IDK_TAG,
+                )
+            # let the model page through large tool results stored out of the conversation
+            if has_offloaded_results(state.messages):
+                tools = tools + [READ_TOOL_RESULT_TOOL]
             model = model.bind_tools(tools)
     # call the model
     response = await model.ainvoke(context, config)
+    result["messages"] = [response]
+    return result
 
-    return {"messages": [response]}
-
-def decide_orchestrate_tools_edge(state: State) -> Literal["call_tool", "assess_task", "end", "human_input"]:
+def decide_orchestrate_tools_edge(state: State) -> Literal["call_tool", "assess_task", "end", "human_input", "planner"]:
     """Decide what to do after orchestration."""
     if not state.messages:
         return "end"
     
     last_message = state.messages[-1]
+
+    # If the expert's server is unavailable, plan again without it
+    if isinstance(last_message, AIMessage) and last_message.response_metadata.get(EXPERT_UNAVAILABLE):
+        return "planner"
     
     # Check if the last message has tool calls
     if isinstance(last_message, AIMessage) and hasattr(last_message, 'tool_calls') and last_message.tool_calls:
@@ -141,65 +183,73 @@ async def call_tool(state: State, *, config: RunnableConfig) -> Dict[str, Any]:
         return {"messages": [AIMessage(content="Error: No current task available for tool execution.")]}
 
     # Fetch mcp server config
-    configuration = Configuration.from_runnable_config(config)
-    server_config = configuration.get_server_config(current_task.expert)
+    compiled = get_compiled_context(config, Configuration, state.config_fingerprint)
+    server_config = compiled.get_server_config(current_task.expert)
 
     # Execute MCP server Tool
     last_message = state.messages[-1]
     if not isinstance(last_message, AIMessage) or not hasattr(last_message, 'tool_calls') or not last_message.tool_calls:
         return {"messages": [AIMessage(content="Error: No tool calls found in the last message.")]}
     
-    tool_call = last_message.tool_calls[0]
-    try:
-        if server_config:
-            tool_output = await mcp.apply(
-                current_task.expert, 
-                server_config, 
-                mcp.RunTool(tool_call['name'], **tool_call['args'])
-            )
-        else:
-            tool_output = "Error: Server configuration not found"
-    except Exception as e:
-        tool_output = f"Error: {e}"
-        
-    return {"messages": [ToolMessage(content=tool_output, tool_call_id=tool_call['id'])]}
+    if not server_config:
+        return {"messages": [
+            ToolMessage(content="Error: Server configuration not found", tool_call_id=tool_call['id'])
+            for tool_call in last_message.tool_calls
+        ]}
+    # Execute all tool calls of the message concurrently
+    tool_messages = await mcp.run_tool_calls(current_task.expert, server_config, last_message.tool_calls)
+    return {"messages": tool_messages}
 
-async def assess_task_completion(state: State, *, config: RunnableConfig) -> Dict[str, bool]:
+async def assess_task_completion(state: State, *, config: RunnableConfig) -> Dict[str, Any]:
     """Assess whether the current task has been completed."""
     # Get configurations
-    configuration = Configuration.from_runnable_config(config)
+    compiled = get_compiled_context(config, Configuration, state.config_fingerprint)
+    configuration = compiled.cfg
     
     # Get the current task
     current_task = state.planner_result.get_current_task() if state.planner_result else None
     if not current_task:
         return {"task_completed": True}  # If no task, consider it completed
+
+    # Fast path: skip the LLMs when the outcome is deterministic (tool errors, completion signals)
+    decision = assess_by_rules(state.messages, compiled.get_server_config(current_task.expert), TASK_COMPLETE_TAG)
+    if decision is not None:
+        assessment_stats.rule_based += 1
+        return {"task_completed": decision}
     
-    # Build a chat prompt for task assessment
-    prompt = ChatPromptTemplate.from_messages(
-        [
-            ("system", configuration.task_assessment_system_prompt),
-            ("placeholder", "{messages}"),
-        ]
-    )
-    
-    # Load the chat model for task assessment
-    model = load_chat_model(configuration.task_assessment_model)
+    # Chat prompt for task assessment
+    prompt = compiled.prompts["task_assessment"]
     
+    # Fit the conversation into the assessor's context window
+    messages, update = await manage_context(state.messages, state.conversation_summary, configuration, "assess_task_completion", config)
+
     # Build the context
     context = await prompt.ainvoke(
         {
             "task": current_task.task,
-            "messages": state.messages,
+            "messages": messages,
             "system_time": datetime.now(tz=timezone.utc).isoformat(),
         },
         config,
     )
     
+    # Try the cheap model first, if configured, and keep its verdict only when it is confident
+    if configuration.task_assessment_fast_model:
+        fast_model = load_chat_model(configuration.task_assessment_fast_model)
+        result = cast(TaskAssessmentResult, await fast_model.with_structured_output(TaskAssessmentResult).ainvoke(context, config))
+        if result.confidence >= configuration.task_assessment_fast_model_min_confidence:
+            assessment_stats.fast_model += 1
+            return {**update, "task_completed": result.is_completed}
+
+    # Load the chat model for task assessment
+    model = load_chat_model(configuration.task_assessment_model)
+
     # Call the model with the structured output parser
     result = cast(TaskAssessmentResult, await model.with_structured_output(TaskAssessmentResult).ainvoke(context, config))
+    assessment_stats.full_model += 1
     
     # Return the task completion status
-    return {"task_completed": result.is_completed and result.confidence >= 0.7}
+    return {**update, "task_completed": result.is_completed and result.confidence >= 0.7}
 
 def decide_task_assessment_edge(state: State) -> Literal["next_task", "orchestrate_tools"]:
     """Decide whether to move to the next task or continue with the current one."""
@@ -236,33 +286,33 @@ def decide_next_task_edge(state: State) -> Literal["orchestrate_tools", "generat
 async def generate_response(state: State, *, config: RunnableConfig) -> Dict[str, Any]:
     """Generate a final AI response at the end of plan execution."""
     # Get configurations
-    configuration = Configuration.from_runnable_config(config)
+    compiled = get_compiled_context(config, Configuration, state.config_fingerprint)
+    configuration = compiled.cfg
     
-    # Build a chat prompt for final response
-    prompt = ChatPromptTemplate.from_messages(
-        [
-            ("system", configuration.generate_response_system_prompt),
-            ("placeholder", "{messages}"),
-        ]
-    )
+    # Chat prompt for final response
+    prompt = compiled.prompts["generate_response"]
     
     # Load the chat model for generating the final response
     model = load_chat_model(configuration.generate_response_model)
     
+    # Fit the conversation into the response generator's context window
+    messages, result = await manage_context(state.messages, state.conversation_summary, configuration, "generate_response", config)
+
     # Build the context
     context = await prompt.ainvoke(
         {
-            "messages": state.messages,
+            "messages": messages,
             "system_time": datetime.now(tz=timezone.utc).isoformat(),
         },
         config,
     )
     
-    # Call the model
-    response = await model.ainvoke(context, config)
+    # Call the model, streaming the response tokens to the client
+    response = await stream_model_response(model, context, config)
     
     # Reset planner state for future interactions
     return {
+        **result,
         "messages": [response],
         "planner_result": None
     }
@@ -270,17 +320,20 @@ async def generate_response(state: State, *, config: RunnableConfig) -> Dict[str
 # Define the state graph
 builder = StateGraph(State, input=InputState, config_schema=Configuration)
 
-# Add all the nodes
-builder.add_node("planner", planner, cache_policy=CachePolicy())
-builder.add_node("orchestrate_tools", orchestrate_tools, cache_policy=CachePolicy())
+# Add all the nodes; LLM node results are cached by conversation content + plan + config
+# fingerprint (see node_cache), while call_tool has side effects and is never cached
+builder.add_node("fingerprint_config", config_fingerprint_node(Configuration))
+builder.add_node("planner", planner, cache_policy=CachePolicy(key_func=state_cache_key(extra=unavailable_experts), ttl=600))
+builder.add_node("orchestrate_tools", orchestrate_tools, cache_policy=CachePolicy(key_func=state_cache_key(), ttl=300))
 builder.add_node("human_input", human_input)
-builder.add_node("call_tool", call_tool, cache_policy=CachePolicy())
+builder.add_node("call_tool", call_tool)
 builder.add_node("assess_task_completion", assess_task_completion)
 builder.add_node("advance_to_next_task", advance_to_next_task)
-builder.add_node("generate_response", generate_response, cache_policy=CachePolicy())
+builder.add_node("generate_response", generate_response, cache_policy=CachePolicy(key_func=state_cache_key(), ttl=300))
 
 # Add the edges
-builder.add_edge(START, "planner")
+builder.add_edge(START, "fingerprint_config")
+builder.add_edge("fingerprint_config", "planner")
 builder.add_conditional_edges(
     "planner",
     decide_planner_edge,
@@ -296,6 +349,7 @@ builder.add_conditional_edges(
         "call_tool": "call_tool",
         "human_input": "human_input",
         "assess_task": "assess_task_completion",
+        "planner": "planner",
         "end": END,
     }
 )
@@ -320,5 +374,5 @@ builder.add_conditional_edges(
 builder.add_edge("generate_response", END)
 
 # Compile the graph
-graph = builder.compile(cache=InMemoryCache())
+graph = builder.compile(cache=BoundedInMemoryCache(max_entries=1024))
 graph.name = "AssistantGraphWithPlanner"
\ No newline at end of file
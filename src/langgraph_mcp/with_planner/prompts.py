@@ -48,6 +48,7 @@ Your job is to decide and perform one of these actions:
 - Select a tool to execute, to progress the conversation
 - Or, ask the user for more information in case any mandatory inputs for an applicable tool are not yet known. Start your message with "I need more information from you" to signal that human input is required.
 - Or, indicate that the current expert does not know how to proceed by tagging your response with: {idk_tag}
+- Or, if the conversation shows that the current task is already complete, briefly say what was accomplished and start your message with: {task_complete_tag}
 
 Current Plan:
 ```json
@@ -3,7 +3,7 @@ from typing import Optional, Literal
 
 from pydantic import BaseModel
 
-from langgraph_mcp.state import InputState
+from langgraph_mcp.state import ConversationSummary, InputState
 
 
 class Task(BaseModel):
@@ -56,4 +56,17 @@ class State(InputState):
     """Indicates whether the current task has been completed.
     
     This is used to determine whether to advance to the next task or continue with the current one.
-    """
\ No newline at end of file
+    """
+
+    conversation_summary: Optional[ConversationSummary] = field(default=None)
+    """Rolling summary of the messages that slid out of the LLM nodes' context windows.
+
+    Only maintained when a `context_summary_model` is configured.
+    """
+
+    config_fingerprint: str = field(default="")
+    """Fingerprint of the assistant configuration the graph runs with.
+
+    Recorded at the start of every run so that node cache keys (computed from state alone)
+    differ between assistants with different configurations.
+    """
@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def stub_server_config() -> dict:
+    """A stdio server config running `stub_mcp_server.py` (tools: echo, sleep, pid, lookup, add_tool)."""
+    return {
+        "transport": "stdio",
+        "command": sys.executable,
+        "args": [str(Path(__file__).parent / "stub_mcp_server.py")],
+    }
+
+
+@pytest.fixture
+def hanging_server_config() -> dict:
+    """A stdio server config whose process never answers `initialize`."""
+    return {"transport": "stdio", "command": sys.executable, "args": ["-c", "import time; time.sleep(60)"]}
@@ -0,0 +1,51 @@
+"""Minimal stdio MCP server used by the unit tests."""
+
+import asyncio
+import os
+
+from mcp.server.fastmcp import Context, FastMCP
+from mcp.types import ToolAnnotations
+
+server = FastMCP("stub")
+
+
+@server.tool()
+def echo(text: str) -> str:
+    """Echo the given text back."""
+    return text
+
+
+@server.tool()
+async def sleep(seconds: float) -> str:
+    """Sleep for the given number of seconds."""
+    await asyncio.sleep(seconds)
+    return f"slept {seconds}"
+
+
+@server.tool()
+def pid() -> str:
+    """Return the process id of the server, to tell sessions apart."""
+    return str(os.getpid())
+
+
+_lookups = 0
+
+
+@server.tool(annotations=ToolAnnotations(readOnlyHint=True))
+def lookup(key: str) -> str:
+    """Read-only lookup; returns how many lookups the server served so far."""
+    global _lookups
+    _lookups += 1
+    return f"{key}:{_lookups}"
+
+
+@server.tool()
+async def add_tool(name: str, ctx: Context) -> str:
+    """Register a new echo-like tool and notify the client that the tool list changed."""
+    server.add_tool(lambda text: text, name=name, description=f"{name} tool")
+    await ctx.session.send_tool_list_changed()
+    return name
+
+
+if __name__ == "__main__":
+    server.run("stdio")
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from langgraph_mcp import blob_store
+from langgraph_mcp import mcp_wrapper as mcp
+from langgraph_mcp.blob_store import BlobStore, has_offloaded_results, load_tool_result
+
+
+def test_blob_store_dedupes_and_reads_slices(tmp_path):
+    store = BlobStore(tmp_path)
+    first = store.put("héllo world")
+    second = store.put("héllo world")
+
+    assert first == second
+    assert len(list(tmp_path.glob("*/*"))) == 1
+    assert store.read(first.blob_id) == "héllo world"
+    assert store.read(first.blob_id, offset=7, length=5) == "world"
+
+
+def test_large_tool_results_are_offloaded_and_readable(tmp_path, monkeypatch, stub_server_config):
+    monkeypatch.setattr(blob_store, "_blob_store", BlobStore(tmp_path))
+    config = {**stub_server_config, "offload": {"threshold": 100, "preview": 20}}
+    text = "x" * 500
+
+    async def scenario():
+        [big, small] = await mcp.run_tool_calls("stub", config, [
+            {"name": "echo", "args": {"text": text}, "id": "big", "type": "tool_call"},
+            {"name": "echo", "args": {"text": "short"}, "id": "small", "type": "tool_call"},
+        ])
+        [page] = await mcp.run_tool_calls("stub", config, [
+            {"name": "read_tool_result", "args": {"blob_id": big.artifact["blob_id"], "offset": 0, "length": 50}, "id": "read", "type": "tool_call"},
+        ])
+        await mcp.get_session_pool().close()
+        return big, small, page
+
+    big, small, page = asyncio.run(scenario())
+    assert big.artifact and big.content.startswith("[stored tool result blob_id=")
+    assert len(big.content) < 300
+    assert small.artifact is None and "short" in small.content
+    assert has_offloaded_results([small, big])
+    assert text in load_tool_result(big)
+    assert len(page.content) == 50
+
+
+def test_old_blobs_are_pruned_on_write(tmp_path):
+    store = BlobStore(tmp_path, max_age=60, prune_interval=3600)
+    old = BlobStore(tmp_path).put("stale result")
+    kept = BlobStore(tmp_path).put("result still in use")
+    stale_path = tmp_path / old.blob_id[:2] / old.blob_id
+    os.utime(stale_path, (time.time() - 120, time.time() - 120))
+    os.utime(tmp_path / kept.blob_id[:2] / kept.blob_id, (time.time() - 120, time.time() - 120))
+    store.read(kept.blob_id)  # reading keeps a blob alive
+
+    store.put("new result")  # the first write prunes
+    assert not stale_path.exists()
+    with pytest.raises(KeyError):
+        store.read(old.blob_id)
+    assert store.read(kept.blob_id) == "result still in use"
+    # later writes within the prune interval don't scan the store again
+    os.utime(tmp_path / kept.blob_id[:2] / kept.blob_id, (time.time() - 120, time.time() - 120))
+    store.put("another result")
+    assert store.read(kept.blob_id) == "result still in use"
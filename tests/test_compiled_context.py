@@ -0,0 +1,28 @@
+from langgraph_mcp.compiled_context import CompiledContextCache
+from langgraph_mcp.node_cache import configurable_fingerprint
+from langgraph_mcp.planner_style.config import Configuration
+from langgraph_mcp.with_planner.config import Configuration as WithPlannerConfiguration
+
+SERVERS = {"sqlite": {"command": "uvx", "description": "SQL database"}}
+
+
+def test_compiles_once_per_configuration():
+    cache = CompiledContextCache()
+    config = {"configurable": {"mcp_server_config": SERVERS, "thread_id": "t1"}}
+    first = cache.get(config, Configuration)
+    # per-run keys don't change the fingerprint; the state's fingerprint skips hashing
+    second = cache.get({"configurable": {"mcp_server_config": SERVERS, "thread_id": "t2"}}, Configuration)
+    third = cache.get(config, Configuration, configurable_fingerprint(config, Configuration))
+    assert first is second is third
+    assert cache.stats.hits == 2 and cache.stats.misses == 1
+    assert first.experts == "- sqlite: SQL database"
+    assert first.get_server_config("sqlite") == SERVERS["sqlite"]
+    assert set(first.prompts) == {"planner", "execute_task", "generate_response"}
+
+
+def test_configurations_do_not_share_compiled_contexts():
+    cache = CompiledContextCache(max_entries=1)
+    planner_style = cache.get({"configurable": {"mcp_server_config": SERVERS}}, Configuration)
+    with_planner = cache.get({"configurable": {"mcp_server_config": SERVERS}}, WithPlannerConfiguration)
+    assert "orchestrate" in with_planner.prompts and "orchestrate" not in planner_style.prompts
+    assert cache.stats.evictions == 1
@@ -0,0 +1,72 @@
+import asyncio
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from langgraph_mcp import context_window
+from langgraph_mcp.context_window import manage_context, window_start
+from langgraph_mcp.planner_style.config import Configuration
+
+
+def _conversation(turns: int) -> list:
+    messages = []
+    for i in range(turns):
+        messages += [
+            HumanMessage(content=f"question {i}", id=f"h{i}"),
+            AIMessage(content="", tool_calls=[{"name": "lookup", "args": {"i": i}, "id": f"c{i}"}], id=f"a{i}"),
+            ToolMessage(content=f"result {i}", tool_call_id=f"c{i}", id=f"t{i}"),
+            AIMessage(content=f"answer {i}", id=f"r{i}"),
+        ]
+    return messages
+
+
+def test_window_never_starts_at_a_tool_message():
+    messages = _conversation(3)
+    # the last 10 messages would start at a ToolMessage, so the window shrinks to 9
+    start = window_start(messages, max_messages=10)
+    assert not isinstance(messages[start], ToolMessage)
+    assert len(messages) - start == 9
+
+
+def test_window_keeps_last_unit_even_over_budget():
+    messages = _conversation(1)
+    assert window_start(messages, max_tokens=1) == len(messages) - 1
+
+
+def test_per_node_windows():
+    cfg = Configuration(context_max_messages=4, context_windows={"respond": {"max_messages": 8}})
+    messages = _conversation(3)
+
+    async def scenario():
+        planner, _ = await manage_context(messages, None, cfg, "planner", {})
+        respond, _ = await manage_context(messages, None, cfg, "respond", {})
+        return planner, respond
+
+    planner, respond = asyncio.run(scenario())
+    assert [m.id for m in planner] == ["h2", "a2", "t2", "r2"]
+    assert len(respond) == 8
+
+
+def test_rolling_summary_is_incremental(monkeypatch):
+    summarizer = FakeListChatModel(responses=["summary 1", "summary 2"])
+    monkeypatch.setattr(context_window, "load_chat_model", lambda name: summarizer)
+    cfg = Configuration(context_max_messages=8, context_summary_model="fake/summarizer")
+
+    async def scenario():
+        messages = _conversation(3)
+        first, update = await manage_context(messages, None, cfg, "planner", {})
+        summary = update["conversation_summary"]
+        # one more turn still fits in the window after the summary boundary: no new summary
+        messages = _conversation(4)[:13]
+        second, second_update = await manage_context(messages, summary, cfg, "planner", {})
+        return first, summary, second, second_update
+
+    first, summary, second, second_update = asyncio.run(scenario())
+    # the summary is a user turn (acknowledged, as the window starts with a user turn), never a system message
+    assert not any(isinstance(m, SystemMessage) for m in first + second)
+    assert isinstance(first[0], HumanMessage) and "summary 1" in first[0].content
+    assert isinstance(first[1], AIMessage) and not first[1].tool_calls
+    assert summary.messages_covered == 8 and summary.last_message_id == "r1"
+    assert [m.id for m in first[2:]] == ["h2", "a2", "t2", "r2"]
+    assert second_update == {}
+    assert [m.id for m in second[2:]] == ["h2", "a2", "t2", "r2", "h3"]
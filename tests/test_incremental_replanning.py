@@ -0,0 +1,85 @@
+import asyncio
+
+from langchain_core.messages import HumanMessage
+
+from langgraph_mcp.planner_style import graph as planner_style
+from langgraph_mcp.planner_style.state import PlannerResult, State, Task
+
+PLAN = PlannerResult(
+    decision="replace",
+    plan=[
+        Task(expert="weather", task="Get the forecast"),
+        Task(expert="sqlite", task="Count the orders"),
+        Task(expert="sqlite", task="Summarize forecast and orders", depends_on=[0, 1]),
+    ],
+    next_task=0,
+)
+
+
+def test_planner_applies_incremental_updates():
+    current = PLAN.model_copy(update={"next_task": 1})
+    kept = current.apply_update(PlannerResult(decision="continue", plan=[], next_task=2))
+    assert kept.plan == PLAN.plan and kept.next_task == 2
+    amended = current.apply_update(
+        PlannerResult(decision="amend", plan=[Task(expert="github", task="Count the orders on GitHub")], next_task=0)
+    )
+    assert [t.expert for t in amended.plan] == ["weather", "github"] and amended.next_task == 1
+    replaced = current.apply_update(PlannerResult(decision="replace", plan=[], next_task=0))
+    assert replaced.plan == []
+    assert [t["status"] for t in current.progress({0})] == ["done", "current", "pending"]
+
+
+def test_planner_skips_the_model_while_the_plan_is_valid(monkeypatch):
+    def no_model(name):
+        raise AssertionError("the planner model should not be called")
+
+    monkeypatch.setattr(planner_style, "load_chat_model", no_model)
+    state = State(messages=[HumanMessage(content="hi")], planner_result=PLAN, task_completed=True)
+    config = {"configurable": {"mcp_server_config": {"weather": {"command": "weather"}, "sqlite": {"command": "sqlite"}}}}
+    skipped = planner_style.planner_stats.skipped
+    result = asyncio.run(planner_style.planner(state, config=config))
+    assert result["planner_result"].next_task == 1 and result["task_completed"] is False
+    assert planner_style.planner_stats.skipped == skipped + 1
+
+
+def test_amending_keeps_tasks_done_out_of_order(monkeypatch):
+    # parallel mode: tasks 0 and 2 are done, task 1 failed, so `join_tasks` left `next_task` at 1
+    current = PlannerResult(
+        decision="replace",
+        plan=[
+            Task(expert="weather", task="Get the forecast"),
+            Task(expert="sqlite", task="Count the orders"),
+            Task(expert="github", task="List the open issues"),
+            Task(expert="sqlite", task="Summarize", depends_on=[0, 1, 2]),
+        ],
+        next_task=1,
+    )
+    reordered = current.done_first({0, 2})
+    assert [t.task for t in reordered.plan] == ["Get the forecast", "List the open issues", "Count the orders", "Summarize"]
+    assert reordered.next_task == 2 and reordered.plan[3].depends_on == [0, 2, 1]
+
+    class AmendingPlanner:
+        def with_structured_output(self, schema):
+            return self
+
+        async def ainvoke(self, context, config=None):
+            return PlannerResult(decision="amend", plan=[
+                Task(expert="github", task="Count the orders on GitHub"),
+                Task(expert="sqlite", task="Summarize", depends_on=[0, 1, 2]),
+            ], next_task=0)
+
+    monkeypatch.setattr(planner_style, "load_chat_model", lambda name: AmendingPlanner())
+    state = State(
+        messages=[HumanMessage(content="the orders are on GitHub")],
+        planner_result=current,
+        task_outcomes={0: "complete", 1: "idk", 2: "complete"},
+    )
+    config = {"configurable": {
+        "mcp_server_config": {"weather": {"command": "weather"}, "sqlite": {"command": "sqlite"}, "github": {"command": "github"}},
+        "parallel_tasks": True,
+    }}
+    result = asyncio.run(planner_style.planner(state, config=config))
+    amended = result["planner_result"]
+    assert [t.task for t in amended.plan] == ["Get the forecast", "List the open issues", "Count the orders on GitHub", "Summarize"]
+    assert amended.next_task == 2
+    assert result["task_outcomes"] is None  # the done tasks are the ones before `next_task`
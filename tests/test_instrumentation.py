@@ -0,0 +1,85 @@
+import asyncio
+from typing import TypedDict
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langgraph.graph import START, StateGraph
+
+from langgraph_mcp import mcp_wrapper as mcp
+from langgraph_mcp.instrumentation import SpanRecorder, add_trace_hook, remove_trace_hook, span
+
+
+@pytest.fixture
+def recorder():
+    hook = add_trace_hook(SpanRecorder())
+    yield hook
+    remove_trace_hook(hook)
+
+
+def test_spans_nest_and_record_error_classes(recorder):
+    with span("outer", server="a"):
+        with pytest.raises(KeyError):
+            with span("inner") as inner:
+                inner.set(size=3)
+                raise KeyError("x")
+
+    inner, outer = recorder.spans
+    assert (inner.name, inner.parent, inner.error, inner.attributes) == ("inner", outer, "KeyError", {"size": 3})
+    assert outer.error is None and outer.duration >= inner.duration
+
+
+def test_mcp_operations_are_traced(recorder, stub_server_config):
+    async def scenario():
+        async with mcp.open_session("stub", stub_server_config) as session:
+            await mcp.ListTools()("stub", {}, session)
+            await mcp.RunTool("echo", text="hello")("stub", {}, session)
+
+    asyncio.run(scenario())
+    spans = {s.name: s for s in recorder.spans}
+    assert spans["mcp.initialize"].parent is spans["mcp.session.start"]
+    assert spans["mcp.session.start"].attributes == {"server": "stub", "transport": "stdio"}
+    assert spans["mcp.list_tools"].attributes["tools"] >= 4
+    call = spans["mcp.call_tool"]
+    assert call.attributes["tool"] == "echo" and call.attributes["result_bytes"] > 0
+    assert call.attributes["is_error"] is False
+
+
+def test_graph_nodes_and_model_calls_are_traced(recorder):
+    class S(TypedDict):
+        text: str
+
+    model = FakeListChatModel(responses=["hello there"])
+
+    async def answer(state: S, config) -> S:
+        return {"text": (await model.ainvoke(state["text"], config)).content}
+
+    builder = StateGraph(S)
+    builder.add_node("answer", answer)
+    builder.add_edge(START, "answer")
+    asyncio.run(builder.compile().ainvoke({"text": "hi"}))
+
+    node = next(s for s in recorder.spans if s.name == "graph.node")
+    call = next(s for s in recorder.spans if s.name == "model.call")
+    assert node.attributes["node"] == "answer"
+    assert call.parent is node
+    assert call.attributes["node"] == "answer" and call.attributes["response_chars"] == len("hello there")
+
+
+def test_mcp_spans_are_children_of_the_node_running_them(recorder, stub_server_config):
+    class S(TypedDict):
+        text: str
+
+    async def tools(state: S) -> S:
+        async with mcp.open_session("stub", stub_server_config) as session:
+            return {"text": await mcp.RunTool("echo", text=state["text"])("stub", {}, session)}
+
+    builder = StateGraph(S)
+    builder.add_node("tools", tools)
+    builder.add_edge(START, "tools")
+    asyncio.run(builder.compile().ainvoke({"text": "hi"}))
+
+    node = next(s for s in recorder.spans if s.name == "graph.node")
+    call = next(s for s in recorder.spans if s.name == "mcp.call_tool")
+    assert node.attributes["node"] == "tools"
+    assert call.parent is node
+    assert next(s for s in recorder.spans if s.name == "mcp.session.start").parent is node
@@ -0,0 +1,135 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import anyio
+import pytest
+
+from langgraph_mcp import mcp_wrapper as mcp
+from langgraph_mcp.mcp_session_pool import MCPSessionPool
+
+
+def _pid(output: str) -> str:
+    return json.loads(output)[0]["text"]
+
+
+def test_apply_reuses_pooled_session(stub_server_config):
+    async def scenario():
+        first = await mcp.apply("stub", stub_server_config, mcp.RunTool("pid"))
+        tools = await mcp.apply("stub", stub_server_config, mcp.GetTools())
+        second = await mcp.apply("stub", stub_server_config, mcp.RunTool("pid"))
+        stats = mcp.get_session_pool().stats
+        await mcp.get_session_pool().close()
+        return first, second, tools, stats
+
+    first, second, tools, stats = asyncio.run(scenario())
+    assert _pid(first) == _pid(second)
+    assert {"echo", "pid"} <= {t["function"]["name"] for t in tools}
+    assert stats.opened == 1 and stats.reused == 2
+
+
+def test_pool_respects_max_sessions_per_server(stub_server_config):
+    config = {**stub_server_config, "pool": {"max_sessions": 2}}
+
+    async def scenario():
+        outputs = await asyncio.gather(*[mcp.apply("stub", config, mcp.RunTool("pid")) for _ in range(5)])
+        pool = mcp.get_session_pool()
+        described = pool.describe()
+        await pool.close()
+        return outputs, described
+
+    outputs, described = asyncio.run(scenario())
+    assert len({_pid(o) for o in outputs}) <= 2
+    assert described["servers"]["stub"]["open"] <= 2
+
+
+def test_idle_sessions_are_evicted_and_reopened(stub_server_config):
+    config = {**stub_server_config, "pool": {"idle_timeout": 0}}
+
+    async def scenario():
+        pool = mcp.get_session_pool()
+        first = await mcp.apply("stub", config, mcp.RunTool("pid"))
+        evicted = await pool.evict_idle()
+        second = await mcp.apply("stub", config, mcp.RunTool("pid"))
+        await pool.close()
+        return first, second, evicted
+
+    first, second, evicted = asyncio.run(scenario())
+    assert evicted == 1
+    assert _pid(first) != _pid(second)
+
+
+def test_dead_session_is_reconnected(stub_server_config):
+    async def scenario():
+        pool = mcp.get_session_pool()
+        first = await mcp.apply("stub", stub_server_config, mcp.RunTool("pid"))
+        # Simulate the server going away underneath an idle pooled session
+        for sessions in pool._sessions.values():
+            for pooled in sessions:
+                pooled.stop.set()
+                await pooled.owner
+        second = await mcp.apply("stub", stub_server_config, mcp.RunTool("pid"))
+        await pool.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert _pid(first) != _pid(second)
+
+
+def test_only_unsent_requests_are_replayed():
+    @asynccontextmanager
+    async def opener(server_name, server_config):
+        yield object()
+
+    async def scenario():
+        pool = MCPSessionPool(opener)
+        calls = {"unsent": 0, "sent": 0}
+
+        async def unsent(session):
+            calls["unsent"] += 1
+            if calls["unsent"] == 1:
+                raise anyio.ClosedResourceError()
+            return "ok"
+
+        async def sent(session):
+            calls["sent"] += 1
+            raise anyio.EndOfStream()
+
+        result = await pool.run("fake", {}, unsent)
+        with pytest.raises(anyio.EndOfStream):
+            await pool.run("fake", {}, sent)
+        await pool.close()
+        return result, calls, pool.stats.reconnects
+
+    result, calls, reconnects = asyncio.run(scenario())
+    assert result == "ok" and calls == {"unsent": 2, "sent": 1}
+    assert reconnects == 1
+
+
+def test_cancelled_call_discards_its_session():
+    opened = []
+
+    @asynccontextmanager
+    async def opener(server_name, server_config):
+        opened.append(object())
+        yield opened[-1]
+
+    async def scenario():
+        pool = MCPSessionPool(opener)
+        started = asyncio.Event()
+
+        async def stuck(session):
+            started.set()
+            await asyncio.sleep(60)
+
+        call = asyncio.create_task(pool.run("fake", {}, stuck))
+        await started.wait()
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        session = await pool.run("fake", {}, lambda session: asyncio.sleep(0, session))
+        await pool.close()
+        return session
+
+    session = asyncio.run(scenario())
+    assert len(opened) == 2 and session is opened[1]
@@ -0,0 +1,54 @@
+import asyncio
+
+from langgraph_mcp import mcp_wrapper as mcp
+
+
+def _names(tools):
+    return {t["function"]["name"] for t in tools}
+
+
+def test_get_tools_is_served_from_cache(stub_server_config):
+    async def scenario():
+        catalog = mcp.get_tool_catalog()
+        catalog.invalidate()
+        hits = catalog.stats.hits
+        first = await mcp.get_tools("stub", stub_server_config)
+        second = await mcp.get_tools("stub", stub_server_config)
+        await mcp.get_session_pool().close()
+        return first, second, catalog.stats.hits - hits
+
+    first, second, hits = asyncio.run(scenario())
+    assert first == second
+    assert hits == 1
+
+
+def test_zero_ttl_disables_caching(stub_server_config):
+    config = {**stub_server_config, "tools_cache": {"ttl": 0}}
+
+    async def scenario():
+        catalog = mcp.get_tool_catalog()
+        misses = catalog.stats.misses
+        await mcp.get_tools("stub", config)
+        await mcp.get_tools("stub", config)
+        # the annotations of the last listing are still cached
+        annotations = await catalog.annotations("stub", config, lambda: None)
+        await mcp.get_session_pool().close()
+        return catalog.stats.misses - misses, annotations
+
+    misses, annotations = asyncio.run(scenario())
+    assert misses == 2
+    assert annotations["lookup"].readOnlyHint and annotations["echo"] is None
+
+
+def test_tools_list_changed_invalidates_catalog(stub_server_config):
+    async def scenario():
+        mcp.get_tool_catalog().invalidate()
+        before = await mcp.get_tools("stub", stub_server_config)
+        await mcp.apply("stub", stub_server_config, mcp.RunTool("add_tool", name="shout"))
+        after = await mcp.get_tools("stub", stub_server_config)
+        await mcp.get_session_pool().close()
+        return before, after
+
+    before, after = asyncio.run(scenario())
+    assert "shout" not in _names(before)
+    assert "shout" in _names(after)
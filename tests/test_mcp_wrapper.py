@@ -0,0 +1,102 @@
+import asyncio
+import sys
+import time
+
+from langgraph_mcp import mcp_wrapper as mcp
+from langgraph_mcp.tool_result_cache import ToolResultCache
+
+
+def test_run_tool_calls_runs_concurrently_in_order(stub_server_config):
+    tool_calls = [
+        {"name": "sleep", "args": {"seconds": 0.5}, "id": f"call_{i}", "type": "tool_call"}
+        for i in range(3)
+    ] + [{"name": "echo", "args": {"text": "last"}, "id": "call_echo", "type": "tool_call"}]
+
+    async def scenario():
+        # warm the pool up so the timing below only measures the calls
+        await mcp.run_tool_calls("stub", stub_server_config, tool_calls)
+        started = time.monotonic()
+        messages = await mcp.run_tool_calls("stub", stub_server_config, tool_calls)
+        elapsed = time.monotonic() - started
+        await mcp.get_session_pool().close()
+        return messages, elapsed
+
+    messages, elapsed = asyncio.run(scenario())
+    assert [m.tool_call_id for m in messages] == ["call_0", "call_1", "call_2", "call_echo"]
+    assert "last" in messages[-1].content
+    assert elapsed < 1.4
+
+
+def test_run_tool_calls_reports_timeouts_and_errors_per_call(stub_server_config):
+    config = {**stub_server_config, "tool_calls": {"timeout": 0.5}}
+    tool_calls = [
+        {"name": "sleep", "args": {"seconds": 5}, "id": "slow", "type": "tool_call"},
+        {"name": "no_such_tool", "args": {}, "id": "missing", "type": "tool_call"},
+        {"name": "echo", "args": {"text": "ok"}, "id": "fine", "type": "tool_call"},
+    ]
+
+    async def scenario():
+        messages = await mcp.run_tool_calls("stub", config, tool_calls)
+        await mcp.get_session_pool().close()
+        return messages
+
+    slow, missing, fine = asyncio.run(scenario())
+    assert slow.content.startswith("Error:") and "timed out" in slow.content
+    assert missing.content.startswith("Error:")
+    assert "ok" in fine.content
+
+
+def test_describe_servers_returns_partial_results(stub_server_config):
+    mcp_server_config = {
+        "stub": stub_server_config,
+        "another_stub": {**stub_server_config, "description": "same server, different config"},
+        "broken": {"transport": "stdio", "command": sys.executable, "args": ["-c", "import sys; sys.exit(1)"]},
+    }
+
+    async def scenario():
+        descriptions = await mcp.describe_servers(mcp_server_config, timeout=10)
+        await mcp.get_session_pool().close()
+        return descriptions
+
+    descriptions = asyncio.run(scenario())
+    assert set(descriptions) == {"stub", "another_stub"}
+    assert "- echo: Echo the given text back." in descriptions["stub"]
+
+
+def test_run_tool_calls_caches_read_only_results(stub_server_config):
+    config = {**stub_server_config, "result_cache": {"read_only_ttl": 60}}
+
+    def call(name, **args):
+        return [{"name": name, "args": args, "id": f"call_{name}", "type": "tool_call"}]
+
+    async def scenario():
+        first = await mcp.run_tool_calls("stub", config, call("lookup", key="a"))
+        cached = await mcp.run_tool_calls("stub", config, call("lookup", key="a"))
+        other_args = await mcp.run_tool_calls("stub", config, call("lookup", key="b"))
+        # echo is not read-only: calling it drops the server's cached results
+        await mcp.run_tool_calls("stub", config, call("echo", text="x"))
+        refreshed = await mcp.run_tool_calls("stub", config, call("lookup", key="a"))
+        stats = mcp.get_tool_result_cache().stats
+        await mcp.get_session_pool().close()
+        return [m[0].content for m in (first, cached, other_args, refreshed)], stats
+
+    (first, cached, other_args, refreshed), stats = asyncio.run(scenario())
+    assert first == cached and "a:1" in first
+    assert "b:2" in other_args
+    assert "a:3" in refreshed
+    assert stats.hits == 1 and stats.invalidations >= 2
+
+
+def test_results_are_not_stored_after_an_invalidation_during_the_call(stub_server_config):
+    cache = ToolResultCache()
+    key = cache.key("stub", stub_server_config, "lookup", {"key": "a"})
+    generation = cache.generation("stub")
+    cache.invalidate("stub")  # a mutating call of the same batch finished first
+    cache.set(key, "stale", 60, generation)
+    assert cache.get(key) is None
+    cache.set(key, "fresh", 60, cache.generation("stub"))
+    assert cache.get(key) == "fresh"
+    generation = cache.generation("stub")
+    cache.invalidate()
+    cache.set(key, "stale", 60, generation)
+    assert cache.get(key) is None
@@ -0,0 +1,143 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import START, StateGraph
+from langgraph.types import CachePolicy
+
+from langgraph_mcp.node_cache import BoundedInMemoryCache, config_fingerprint_node, state_cache_key, uncacheable
+from langgraph_mcp.planner_style.config import Configuration
+from langgraph_mcp.planner_style.state import State
+from langgraph_mcp.state import InputState
+
+
+def test_state_cache_key_ignores_message_ids_but_not_config():
+    key = state_cache_key()
+    first = State(messages=[HumanMessage(content="hi", id="a")], config_fingerprint="x")
+    second = State(messages=[HumanMessage(content="hi", id="b")], config_fingerprint="x")
+    other_assistant = State(messages=[HumanMessage(content="hi", id="c")], config_fingerprint="y")
+
+    assert key(first) == key(second)
+    assert key(first) != key(other_assistant)
+
+
+def test_state_cache_key_only_looks_at_last_n_messages():
+    key = state_cache_key(last_n_messages=1)
+    first = State(messages=[HumanMessage(content="one"), HumanMessage(content="last")])
+    second = State(messages=[HumanMessage(content="two"), HumanMessage(content="last")])
+
+    assert key(first) == key(second)
+
+
+def test_bounded_cache_evicts_least_recently_used():
+    cache = BoundedInMemoryCache(max_entries=2)
+    ns = ("__pregel_ns_writes", "id", "planner")
+    cache.set({(ns, "a"): (1, None), (ns, "b"): (2, None)})
+    cache.get([(ns, "a")])
+    cache.set({(ns, "c"): (3, None)})
+
+    assert set(cache.get([(ns, "a"), (ns, "b"), (ns, "c")]).values()) == {1, 3}
+    stats = cache.get_stats()["nodes"]["planner"]
+    assert stats["evictions"] == 1 and stats["misses"] == 1 and stats["hits"] == 3
+
+
+def test_bounded_cache_honors_ttl():
+    cache = BoundedInMemoryCache()
+    ns = ("__pregel_ns_writes", "id", "respond")
+    cache.set({(ns, "a"): (1, 0)})
+
+    assert cache.get([(ns, "a")]) == {}
+    assert cache.get_stats()["nodes"]["respond"]["expirations"] == 1
+
+
+def test_outputs_with_uncacheable_messages_are_not_stored():
+    cache = BoundedInMemoryCache()
+    ns = ("__pregel_ns_writes", "id", "execute_task")
+    failed = [("messages", [uncacheable(AIMessage(content="[IDK] The expert is unavailable"))])]
+    answered = [("messages", [AIMessage(content="done")])]
+    cache.set({(ns, "a"): (failed, None), (ns, "b"): (answered, None)})
+
+    assert list(cache.get([(ns, "a"), (ns, "b")])) == [(ns, "b")]
+
+
+def test_uncacheable_node_outputs_are_run_again():
+    calls = []
+
+    async def respond(state: State) -> dict:
+        calls.append(state.messages[-1].content)
+        return {"messages": [uncacheable(AIMessage(content="[IDK] The expert is unavailable"))]}
+
+    builder = StateGraph(State, input_schema=InputState)
+    builder.add_node("respond", respond, cache_policy=CachePolicy(key_func=state_cache_key(), ttl=60))
+    builder.add_edge(START, "respond")
+    cache = BoundedInMemoryCache()
+    graph = builder.compile(cache=cache)
+
+    async def scenario():
+        for _ in range(2):
+            await graph.ainvoke({"messages": [HumanMessage(content="hi")]})
+
+    asyncio.run(scenario())
+    assert len(calls) == 2 and cache.get_stats()["size"] == 0
+
+
+def test_cached_node_hits_across_threads_of_the_same_assistant():
+    calls = []
+
+    async def respond(state: State) -> dict:
+        calls.append(state.messages[-1].content)
+        return {"messages": [AIMessage(content="hello")]}
+
+    builder = StateGraph(State, input_schema=InputState, context_schema=Configuration)
+    builder.add_node("fingerprint_config", config_fingerprint_node(Configuration))
+    builder.add_node("respond", respond, cache_policy=CachePolicy(key_func=state_cache_key(), ttl=60))
+    builder.add_edge(START, "fingerprint_config")
+    builder.add_edge("fingerprint_config", "respond")
+    cache = BoundedInMemoryCache()
+    graph = builder.compile(cache=cache)
+
+    async def scenario():
+        for thread_id, prompt in [("1", "sys-a"), ("2", "sys-a"), ("3", "sys-b")]:
+            config = {"configurable": {"thread_id": thread_id, "generate_response_system_prompt": prompt}}
+            await graph.ainvoke({"messages": [HumanMessage(content="hi")]}, config)
+
+    asyncio.run(scenario())
+    # thread 2 reuses thread 1's result; thread 3 belongs to a differently configured assistant
+    assert len(calls) == 2
+    assert cache.get_stats()["nodes"]["respond"]["hits"] == 1
+
+
+def test_replayed_messages_are_appended_to_the_thread():
+    async def respond(state: State) -> dict:
+        return {"messages": [AIMessage(content="hello")]}
+
+    builder = StateGraph(State, input_schema=InputState)
+    builder.add_node("respond", respond, cache_policy=CachePolicy(key_func=state_cache_key(last_n_messages=1), ttl=60))
+    builder.add_edge(START, "respond")
+    cache = BoundedInMemoryCache()
+    graph = builder.compile(cache=cache, checkpointer=InMemorySaver())
+
+    async def scenario():
+        config = {"configurable": {"thread_id": "1"}}
+        for _ in range(2):
+            await graph.ainvoke({"messages": [HumanMessage(content="hi")]}, config)
+        return (await graph.aget_state(config)).values["messages"]
+
+    messages = asyncio.run(scenario())
+    # the second turn replays the first answer, which must not replace it
+    assert cache.get_stats()["nodes"]["respond"]["hits"] == 1
+    assert [m.content for m in messages] == ["hi", "hello", "hi", "hello"]
+    assert len({m.id for m in messages}) == 4
+
+
+def test_subgraph_tasks_are_never_cached():
+    from langgraph_mcp.planner_style import graph as planner_style
+    from langgraph_mcp.planner_style.state import PlannerResult, Task
+
+    nodes = planner_style.graph.builder.nodes
+    assert nodes["execute_task"].cache_policy is not None
+    assert nodes["execute_subgraph_task"].cache_policy is None
+    plan = PlannerResult(decision="replace", plan=[Task(expert="playwright", task="Open a page"), Task(expert="sqlite", task="Count")], next_task=0)
+    state = State(messages=[HumanMessage(content="hi")], planner_result=plan)
+    assert planner_style.decide_task_node(state) == "execute_subgraph_task"
+    assert planner_style.decide_task_node(State(messages=state.messages, planner_result=plan.model_copy(update={"next_task": 1}))) == "execute_task"
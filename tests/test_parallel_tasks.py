@@ -0,0 +1,141 @@
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
+
+from langgraph_mcp.planner_style import graph as planner_style
+from langgraph_mcp.planner_style.state import PlannerResult, State, Task, TaskBranch, merge_task_outcomes
+
+PLAN = PlannerResult(
+    decision="replace",
+    plan=[
+        Task(expert="weather", task="Get the forecast"),
+        Task(expert="sqlite", task="Count the orders"),
+        Task(expert="sqlite", task="Summarize forecast and orders", depends_on=[0, 1]),
+    ],
+    next_task=0,
+)
+
+
+def test_ready_tasks_follow_dependencies():
+    assert PLAN.ready_tasks(set()) == [0, 1]
+    assert PLAN.ready_tasks({0}) == [1]
+    assert PLAN.ready_tasks({0, 1}) == [2]
+    assert PLAN.ready_tasks({0, 1, 2}) == []
+    cyclic = PlannerResult(
+        decision="replace",
+        plan=[Task(expert="a", task="x", depends_on=[1]), Task(expert="b", task="y", depends_on=[0])],
+        next_task=0,
+    )
+    assert cyclic.ready_tasks(set()) == [0]
+
+
+def test_merge_task_outcomes_resets_on_none():
+    assert merge_task_outcomes({0: "complete"}, {1: "idk"}) == {0: "complete", 1: "idk"}
+    assert merge_task_outcomes({0: "complete"}, None) == {}
+    assert merge_task_outcomes({0: "complete", 1: "idk"}, {1: None}) == {0: "complete"}
+
+
+def test_join_responds_when_a_task_needs_the_user():
+    state = State(messages=[HumanMessage(content="hi")], planner_result=PLAN, task_outcomes={0: "complete", 1: "ask_user"})
+    assert planner_style.decide_join_edge(state) == "respond"
+    state = State(messages=[HumanMessage(content="hi")], planner_result=PLAN, task_outcomes={0: "complete", 1: "unavailable"})
+    assert planner_style.decide_join_edge(state) == "planner"
+    state = State(messages=[HumanMessage(content="hi")], planner_result=PLAN, task_outcomes={0: "complete", 1: "complete"})
+    [send] = planner_style.decide_join_edge(state)
+    assert send.node == "run_task" and send.arg.task_index == 2
+
+
+class FakeModel:
+    """Plans PLAN, completes every task after a delay, and answers with a fixed response."""
+
+    def __init__(self, role: str):
+        self.role = role
+
+    def with_structured_output(self, schema):
+        return self
+
+    def bind_tools(self, tools):
+        return self
+
+    async def ainvoke(self, context, config=None):
+        if self.role == "planner":
+            return PLAN
+        await asyncio.sleep(0.5)
+        return AIMessage(content="[TASK_COMPLETE] done")
+
+    async def astream(self, context, config=None):
+        yield AIMessageChunk(content="All done.")
+
+
+def test_independent_tasks_run_concurrently(monkeypatch):
+    monkeypatch.setattr(planner_style, "load_chat_model", lambda name: FakeModel(name.split("/")[1]))
+
+    async def fake_get_tools(server_name, server_config):
+        return [{"type": "function", "function": {"name": "noop", "description": "", "parameters": {}}}]
+
+    monkeypatch.setattr(planner_style, "get_tools", fake_get_tools)
+    config = {"configurable": {
+        "mcp_server_config": {"weather": {"command": "weather"}, "sqlite": {"command": "sqlite"}},
+        "planner_model": "fake/planner",
+        "execute_task_model": "fake/executor",
+        "generate_response_model": "fake/responder",
+        "parallel_tasks": True,
+    }}
+
+    async def scenario():
+        started = time.monotonic()
+        result = await planner_style.graph.ainvoke({"messages": [HumanMessage(content="weather and orders, then a summary")]}, config)
+        return result, time.monotonic() - started
+
+    result, elapsed = asyncio.run(scenario())
+    assert result["task_outcomes"] == {0: "complete", 1: "complete", 2: "complete"}
+    assert result["messages"][-1].content == "All done."
+    # two waves (tasks 0 and 1 together, then task 2), not three sequential tasks
+    assert elapsed < 1.4
+
+
+CONFIG = {"configurable": {
+    "mcp_server_config": {"weather": {"command": "weather"}, "sqlite": {"command": "sqlite"}},
+    "planner_model": "fake/planner",
+    "execute_task_model": "fake/executor",
+    "generate_response_model": "fake/responder",
+    "parallel_tasks": True,
+    "parallel_task_max_steps": 2,
+}}
+
+
+def test_continuing_forgets_the_outcomes_of_unfinished_tasks(monkeypatch):
+    class ContinuingPlanner(FakeModel):
+        async def ainvoke(self, context, config=None):
+            return PLAN.model_copy(update={"decision": "continue", "plan": []})
+
+    monkeypatch.setattr(planner_style, "load_chat_model", lambda name: ContinuingPlanner("planner"))
+    state = State(
+        messages=[HumanMessage(content="here is the missing detail")],
+        planner_result=PLAN,
+        task_outcomes={0: "complete", 1: "ask_user"},
+    )
+    result = asyncio.run(planner_style.planner(state, config=CONFIG))
+    assert merge_task_outcomes(state.task_outcomes, result["task_outcomes"]) == {0: "complete"}
+
+
+def test_run_task_reports_idk_when_the_step_budget_runs_out(monkeypatch):
+    class LoopingExecutor(FakeModel):
+        async def ainvoke(self, context, config=None):
+            return AIMessage(content="", tool_calls=[{"name": "noop", "args": {}, "id": "call_1", "type": "tool_call"}])
+
+    async def fake_get_tools(server_name, server_config):
+        return [{"type": "function", "function": {"name": "noop", "description": "", "parameters": {}}}]
+
+    async def fake_run_tool_calls(server_name, server_config, tool_calls):
+        return [ToolMessage(content="nothing yet", tool_call_id=call["id"]) for call in tool_calls]
+
+    monkeypatch.setattr(planner_style, "load_chat_model", lambda name: LoopingExecutor("executor"))
+    monkeypatch.setattr(planner_style, "get_tools", fake_get_tools)
+    monkeypatch.setattr(planner_style, "run_tool_calls", fake_run_tool_calls)
+    branch = TaskBranch(task_index=1, task=PLAN.plan[1], messages=[HumanMessage(content="count the orders")])
+    result = asyncio.run(planner_style.run_task(branch, config=CONFIG))
+    assert result["task_outcomes"] == {1: "idk"}
+    assert len(result["messages"]) == 5  # two steps of a tool call and its result, then the IDK
+    assert result["messages"][-1].content.startswith("[IDK]") and "2 steps" in result["messages"][-1].content
@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import sys
+import time
+
+import anyio
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.tools import ToolException
+
+from langgraph_mcp import mcp_wrapper as mcp
+from langgraph_mcp.planner_style import graph as planner_style
+from langgraph_mcp.planner_style.state import PlannerResult, Task
+from langgraph_mcp.resilience import (
+    EXPERT_UNAVAILABLE, CircuitBreaker, CircuitOpenError, get_circuit_breakers, is_transient, is_unavailable,
+    unavailable_experts,
+)
+from langgraph_mcp.server_limits import ServerBusyError
+from langgraph_mcp.with_planner import graph as with_planner
+from langgraph_mcp.with_planner.state import PlannerResult as WithPlannerResult, Task as WithPlannerTask
+
+
+def test_circuit_breaker_opens_probes_and_closes():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+    assert breaker.record_failure() is False and breaker.allow()
+    assert breaker.record_failure() is True
+    assert breaker.state == "open" and not breaker.available and not breaker.allow()
+    time.sleep(0.25)
+    assert breaker.available
+    assert breaker.allow() and breaker.state == "half_open"
+    assert not breaker.allow()  # one probe at a time
+    assert breaker.record_failure() is True and breaker.state == "open"
+    time.sleep(0.25)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0 and breaker.rejected == 2
+
+
+def test_transient_errors():
+    assert is_transient(TimeoutError())
+    assert is_transient(anyio.ClosedResourceError())
+    assert is_transient(ExceptionGroup("transport", [ConnectionResetError(), TimeoutError()]))
+    assert not is_transient(ToolException("bad arguments"))
+    assert not is_transient(ExceptionGroup("mixed", [TimeoutError(), ValueError()]))
+    assert is_unavailable(CircuitOpenError()) and is_unavailable(ServerBusyError()) and is_unavailable(TimeoutError())
+    assert not is_unavailable(ToolException("bad arguments"))
+
+
+def test_hung_server_times_out_retries_and_trips_the_breaker(hanging_server_config, caplog):
+    config = {
+        **hanging_server_config,
+        "timeouts": {"initialize": 0.3},
+        "retry": {"attempts": 2, "backoff": 0.05},
+        "circuit_breaker": {"failure_threshold": 1, "reset_timeout": 60},
+    }
+    get_circuit_breakers().reset("hanging")
+
+    async def scenario():
+        with pytest.raises(TimeoutError):
+            await mcp.apply("hanging", config, mcp.ListTools())
+        with pytest.raises(CircuitOpenError):
+            await mcp.apply("hanging", config, mcp.ListTools())
+        opened = mcp.get_session_pool().stats.opened
+        sessions = mcp.get_session_pool().describe()["servers"].get("hanging", {}).get("open", 0)
+        await mcp.get_session_pool().close()
+        return opened, sessions
+
+    try:
+        with caplog.at_level(logging.INFO, logger="langgraph_mcp.mcp_wrapper"):
+            opened, sessions = asyncio.run(scenario())
+        retries = [record for record in caplog.records if record.getMessage().startswith("Retrying")]
+        assert len(retries) == 1  # two initialize timeouts, then the breaker opens
+        assert opened == 0 and sessions == 0
+        assert unavailable_experts(["hanging", "stub"]) == ["hanging"]
+        breaker = get_circuit_breakers().describe()["hanging"]
+        assert (breaker["times_opened"], breaker["rejected"]) == (1, 1)
+    finally:
+        get_circuit_breakers().reset("hanging")
+
+
+def test_errors_answered_by_the_server_close_the_circuit(stub_server_config):
+    config = {**stub_server_config, "circuit_breaker": {"failure_threshold": 2, "reset_timeout": 0}}
+    get_circuit_breakers().reset("stub")
+    breaker = get_circuit_breakers().get("stub", config)
+
+    async def call_missing_tool():
+        with pytest.raises(ToolException):
+            await mcp.apply("stub", config, mcp.RunTool("no_such_tool"))
+
+    async def scenario():
+        # a half-open probe answered with a tool error closes the circuit
+        breaker.record_failure()
+        breaker.record_failure()
+        await call_missing_tool()
+        probed = (breaker.state, breaker.failures)
+        # scattered transient failures don't add up across answered calls
+        breaker.record_failure()
+        await call_missing_tool()
+        closed = (breaker.state, breaker.failures)
+        await mcp.get_session_pool().close()
+        return probed, closed
+
+    try:
+        assert asyncio.run(scenario()) == (("closed", 0), ("closed", 0))
+        assert breaker.times_opened == 1
+    finally:
+        get_circuit_breakers().reset("stub")
+
+
+# a server whose process exits right away: listing its tools fails with McpError('Connection closed')
+DEAD_SERVER_CONFIG = {
+    "transport": "stdio",
+    "command": sys.executable,
+    "args": ["-c", "raise SystemExit(1)"],
+    "retry": {"attempts": 1},
+}
+
+
+class ReplanningModel:
+    """Plans a task for the dead expert, then (seeing its IDK) an empty plan; answers with a fixed response."""
+
+    def __init__(self, plans):
+        self.plans = plans
+        self.prompts = []
+
+    def with_structured_output(self, schema):
+        return self
+
+    async def ainvoke(self, context, config=None):
+        self.prompts.append(context)
+        return self.plans[min(len(self.prompts), len(self.plans)) - 1]
+
+    async def astream(self, context, config=None):
+        yield AIMessageChunk(content="The dead expert is unavailable right now.")
+
+
+def test_planner_style_graph_replans_around_a_dead_server(monkeypatch):
+    planner = ReplanningModel([
+        PlannerResult(decision="replace", plan=[Task(expert="dead", task="List the files")], next_task=0),
+        PlannerResult(decision="replace", plan=[], next_task=0),
+    ])
+    monkeypatch.setattr(planner_style, "load_chat_model", lambda name: planner)
+    config = {"configurable": {"mcp_server_config": {"dead": DEAD_SERVER_CONFIG}}}
+
+    async def scenario():
+        result = await planner_style.graph.ainvoke({"messages": [HumanMessage(content="list my files")]}, config)
+        await mcp.get_session_pool().close()
+        return result
+
+    try:
+        result = asyncio.run(scenario())
+        breaker_state = get_circuit_breakers().describe()["dead"]["state"]
+    finally:
+        get_circuit_breakers().reset("dead")
+    idk = result["messages"][1]
+    assert idk.content.startswith("[IDK] The expert dead is unavailable") and "Connection closed" in idk.content
+    assert len(planner.prompts) == 2  # the failed task went back to the planner
+    # which was told to plan around the expert for this turn, although one failure left its circuit closed
+    assert "Currently unavailable (do not plan tasks for them): dead" in str(planner.prompts[1])
+    assert "Currently unavailable" not in str(planner.prompts[0])
+    assert breaker_state == "closed"
+    assert result["messages"][-1].content == "The dead expert is unavailable right now."
+
+
+def test_with_planner_graph_replans_around_a_dead_server(monkeypatch):
+    planner = ReplanningModel([
+        WithPlannerResult(decision="replace", plan=[WithPlannerTask(expert="dead", task="List the files")], next_task=0),
+        WithPlannerResult(decision="replace", plan=[], next_task=0),
+    ])
+    monkeypatch.setattr(with_planner, "load_chat_model", lambda name: planner)
+    config = {"configurable": {"mcp_server_config": {"dead": DEAD_SERVER_CONFIG}}}
+
+    async def scenario():
+        result = await with_planner.graph.ainvoke({"messages": [HumanMessage(content="list my files")]}, config)
+        await mcp.get_session_pool().close()
+        return result
+
+    try:
+        result = asyncio.run(scenario())
+        breaker_state = get_circuit_breakers().describe()["dead"]["state"]
+    finally:
+        get_circuit_breakers().reset("dead")
+    assert result["messages"][-1].content.startswith("[::IDK::] The expert dead is unavailable")
+    assert len(planner.prompts) == 2
+    assert "Currently unavailable (do not plan tasks for them): dead" in str(planner.prompts[1])
+    assert breaker_state == "closed"
+
+
+def test_experts_reported_unavailable_are_unavailable_for_the_rest_of_the_turn():
+    failed = AIMessage(content="[IDK] The expert dead is unavailable", response_metadata={EXPERT_UNAVAILABLE: "dead"})
+    turn = [HumanMessage(content="list my files"), failed, AIMessage(content="planning again")]
+    assert unavailable_experts(["dead", "stub"], turn) == ["dead"]
+    assert unavailable_experts(["stub"], turn) == []
+    assert unavailable_experts(["dead", "stub"], [*turn, HumanMessage(content="try again")]) == []
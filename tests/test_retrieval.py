@@ -0,0 +1,141 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from langgraph_mcp import retrieval
+from langgraph_mcp.retrieval import BM25Index, RoutingDescriptionCache, select_experts, select_tools, tokenize
+
+SERVERS = {
+    "github": {"url": "https://example.com/github", "description": "Manage GitHub repositories, issues and pull requests"},
+    "sqlite": {"command": "uvx", "description": "Query and update a SQLite database"},
+    "weather": {"command": "weather", "description": "Weather forecasts for cities"},
+}
+
+
+def test_tokenize_splits_identifiers_and_folds_plurals():
+    assert tokenize("list_issues searchRepositories") == ["list", "issue", "search", "repository"]
+
+
+def test_bm25_ranks_matching_documents_first():
+    index = BM25Index({name: cfg["description"] for name, cfg in SERVERS.items()})
+    assert index.search("open an issue in my repository", 2) == ["github"]
+    assert index.search("hello there", 2) == []
+
+
+def test_routing_descriptions_are_cached_on_disk(tmp_path, monkeypatch):
+    described = []
+
+    async def fake_describe_servers(servers):
+        described.extend(servers)
+        return {name: f"Provides tools:\n- {name}_tool: does {name} things\n" for name in servers}
+
+    monkeypatch.setattr(retrieval, "describe_servers", fake_describe_servers)
+    first = asyncio.run(RoutingDescriptionCache(tmp_path).describe(SERVERS))
+    second = asyncio.run(RoutingDescriptionCache(tmp_path).describe(SERVERS))
+    assert first == second and sorted(described) == sorted(SERVERS)
+
+
+def test_select_experts_keeps_plan_experts_and_falls_back_to_all(tmp_path, monkeypatch):
+    async def fake_describe_servers(servers):
+        return {"sqlite": "Provides tools:\n- read_query: Execute a SELECT query\n"}
+
+    monkeypatch.setattr(retrieval, "describe_servers", fake_describe_servers)
+    monkeypatch.setattr(retrieval, "_routing_descriptions", RoutingDescriptionCache(tmp_path))
+    monkeypatch.setattr(retrieval, "_expert_indexes", {})
+
+    async def scenario():
+        # the index is built in the background; until it is ready every expert is selected
+        cold = await select_experts(SERVERS, "fp", [HumanMessage(content="run a select query")], 1)
+        await retrieval.get_expert_index(SERVERS, "fp")
+        relevant = await select_experts(SERVERS, "fp", [HumanMessage(content="run a select query")], 1)
+        kept = await select_experts(SERVERS, "fp", [HumanMessage(content="run a select query")], 1, keep=["weather"])
+        unmatched = await select_experts(SERVERS, "fp", [HumanMessage(content="hi!")], 1)
+        return cold, relevant, kept, unmatched
+
+    cold, relevant, kept, unmatched = asyncio.run(scenario())
+    assert cold == list(SERVERS)
+    assert relevant == ["sqlite"]
+    assert kept == ["sqlite", "weather"]
+    assert unmatched == list(SERVERS)
+
+
+def test_servers_missing_from_the_expert_index_are_described_again(tmp_path, monkeypatch):
+    calls = []
+
+    async def flaky_describe_servers(servers):
+        calls.append(sorted(servers))
+        if len(calls) == 1:
+            return {"sqlite": "Provides tools:\n- read_query: Execute a SELECT query\n"}  # the others failed
+        return {name: f"Provides tools:\n- {name}_tool: does {name} things\n" for name in servers}
+
+    monkeypatch.setattr(retrieval, "describe_servers", flaky_describe_servers)
+    monkeypatch.setattr(retrieval, "_routing_descriptions", RoutingDescriptionCache(tmp_path))
+    monkeypatch.setattr(retrieval, "_expert_indexes", {})
+
+    asyncio.run(retrieval.get_expert_index(SERVERS, "partial"))
+    asyncio.run(retrieval.get_expert_index(SERVERS, "partial"))
+    assert len(calls) == 1  # within the backoff
+
+    monkeypatch.setattr(retrieval, "INDEX_RETRY_AFTER", 0.0)
+    monkeypatch.setattr(retrieval, "_expert_indexes", {})
+    asyncio.run(retrieval.get_expert_index(SERVERS, "partial"))
+    asyncio.run(retrieval.get_expert_index(SERVERS, "partial"))
+    assert calls[1:] == [["github", "weather"]]  # only the missing servers, then the index is complete
+    assert retrieval._expert_indexes["partial"][1] is None
+    assert asyncio.run(retrieval.get_expert_index(SERVERS, "partial")).search("weather_tool", 1) == ["weather"]
+
+
+def test_concurrent_callers_share_one_expert_index_build(tmp_path, monkeypatch):
+    calls = []
+
+    async def slow_describe_servers(servers):
+        calls.append(sorted(servers))
+        await asyncio.sleep(0.05)
+        return {name: f"Provides tools:\n- {name}_tool: does {name} things\n" for name in servers}
+
+    monkeypatch.setattr(retrieval, "describe_servers", slow_describe_servers)
+    monkeypatch.setattr(retrieval, "_routing_descriptions", RoutingDescriptionCache(tmp_path))
+    monkeypatch.setattr(retrieval, "_expert_indexes", {})
+
+    async def scenario():
+        messages = [HumanMessage(content="weather_tool")]
+        selected = await asyncio.gather(*[select_experts(SERVERS, "shared", messages, 1) for _ in range(3)])
+        indexes = await asyncio.gather(*[retrieval.get_expert_index(SERVERS, "shared") for _ in range(3)])
+        return selected, indexes, retrieval._expert_index_builds.copy()
+
+    selected, indexes, builds = asyncio.run(scenario())
+    assert selected == [list(SERVERS)] * 3
+    assert len(calls) == 1 and indexes[0] is indexes[1] is indexes[2]
+    assert builds == {}
+
+
+def _tool(name, description):
+    return {"type": "function", "function": {"name": name, "description": description, "parameters": {}}}
+
+
+GITHUB_TOOLS = [
+    _tool("create_issue", "Create a new issue in a GitHub repository"),
+    _tool("list_commits", "List commits of a branch"),
+    _tool("search_repositories", "Search for GitHub repositories"),
+    _tool("merge_pull_request", "Merge a pull request"),
+]
+
+
+def test_select_tools_binds_top_k_and_called_tools():
+    messages = [HumanMessage(content="file a bug about the login page")]
+    selected = select_tools("github", GITHUB_TOOLS, "Create an issue for the login bug", messages, 1, "[IDK]")
+    assert [t["function"]["name"] for t in selected] == ["create_issue"]
+
+    messages.append(AIMessage(content="", tool_calls=[{"name": "list_commits", "args": {}, "id": "1"}]))
+    selected = select_tools("github", GITHUB_TOOLS, "Create an issue for the login bug", messages, 1, "[IDK]")
+    assert [t["function"]["name"] for t in selected] == ["create_issue", "list_commits"]
+
+
+def test_select_tools_widens_after_idk():
+    messages = [
+        HumanMessage(content="file a bug about the login page"),
+        AIMessage(content="[IDK] I can't do that with these tools"),
+        HumanMessage(content="please try again"),
+    ]
+    selected = select_tools("github", GITHUB_TOOLS, "Create an issue for the login bug", messages, 1, "[IDK]")
+    assert selected == GITHUB_TOOLS
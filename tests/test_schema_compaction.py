@@ -0,0 +1,74 @@
+from langgraph_mcp.schema_compaction import compact_schema, compact_tools
+
+PYDANTIC_STYLE_SCHEMA = {
+    "title": "create_issueArguments",
+    "type": "object",
+    "$defs": {
+        "Label": {"title": "Label", "type": "object", "properties": {"name": {"title": "Name", "type": "string"}}},
+        "Node": {"type": "object", "properties": {"children": {"type": "array", "items": {"$ref": "#/$defs/Node"}}}},
+    },
+    "definitions": {
+        "Label": {"title": "Label", "type": "object", "properties": {"name": {"title": "Name", "type": "string"}}},
+    },
+    "properties": {
+        "title": {"title": "Title", "type": "string", "description": "Issue title. " * 40},
+        "body": {"title": "Body", "type": "string", "default": None},
+        "labels": {"type": "array", "items": {"$ref": "#/$defs/Label"}},
+        "more_labels": {"type": "array", "items": {"$ref": "#/definitions/Label"}},
+        "tree": {"$ref": "#/$defs/Node", "description": "A tree"},
+    },
+    "required": ["title"],
+}
+
+
+def test_compact_schema_strips_annotations_and_inlines_refs():
+    compacted = compact_schema(PYDANTIC_STYLE_SCHEMA, max_description=50)
+    properties = compacted["properties"]
+    # the property named "title" is kept; only the title annotations go
+    assert "title" not in compacted and set(properties) == {"title", "body", "labels", "more_labels", "tree"}
+    assert properties["body"] == {"type": "string"}
+    assert len(properties["title"]["description"]) <= 51 and properties["title"]["description"].endswith("…")
+    # identical definitions are merged and, being small, inlined
+    label = {"type": "object", "properties": {"name": {"type": "string"}}}
+    assert properties["labels"]["items"] == label and properties["more_labels"]["items"] == label
+    # recursive definitions stay behind a ref
+    assert properties["tree"] == {"$ref": "#/$defs/Node", "description": "A tree"}
+    assert set(compacted["$defs"]) == {"Node"}
+    assert compacted["required"] == ["title"]
+
+
+def test_compact_tools_reports_savings_and_can_be_disabled():
+    tools = [{"type": "function", "function": {"name": "create_issue", "description": "", "parameters": PYDANTIC_STYLE_SCHEMA}}]
+    compacted, report = compact_tools(tools, {})
+    assert report.chars_after < report.chars_before and report.tokens_saved > 0
+    unchanged, report = compact_tools(tools, {"schema_compaction": {"enabled": False}})
+    assert unchanged == tools and report.tokens_saved == 0
+
+
+def test_ref_siblings_do_not_override_the_definition():
+    schema = {
+        "type": "object",
+        "$defs": {"Count": {"type": "integer", "minimum": 1, "description": "How many"}},
+        "properties": {
+            "documented": {"$ref": "#/$defs/Count", "description": "Pages to fetch"},
+            "narrowed": {"$ref": "#/$defs/Count", "type": "string"},
+        },
+    }
+    properties = compact_schema(schema)["properties"]
+    assert properties["documented"] == {"type": "integer", "minimum": 1, "description": "Pages to fetch"}
+    assert properties["narrowed"] == {"type": "string", "allOf": [{"type": "integer", "minimum": 1, "description": "How many"}]}
+
+
+def test_unresolvable_refs_are_left_intact():
+    schema = {
+        "type": "object",
+        "$defs": {"A": {"title": "A", "type": "object", "properties": {"b": {"type": "string"}}}},
+        "properties": {
+            "a": {"$ref": "#/$defs/A"},
+            "b": {"$ref": "#/$defs/A/properties/b"},
+            "root": {"$ref": "#"},
+        },
+    }
+    compacted = compact_schema(schema)
+    assert compacted["properties"] == schema["properties"]
+    assert compacted["$defs"] == {"A": {"type": "object", "properties": {"b": {"type": "string"}}}}
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from langgraph_mcp import mcp_wrapper as mcp
+from langgraph_mcp import server_limits
+from langgraph_mcp.server_limits import ServerBusyError, ServerLimiter, TokenBucket
+
+
+def test_limiter_queues_rejects_and_times_out():
+    limiter = ServerLimiter({"max_concurrent": 1, "max_queue": 1, "queue_timeout": 0.3}, remote=False)
+
+    async def hold(seconds):
+        async with limiter.slot("stub"):
+            await asyncio.sleep(seconds)
+
+    async def scenario():
+        first = asyncio.create_task(hold(0.5))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(hold(0))
+        await asyncio.sleep(0)
+        assert limiter.stats.in_flight == 1 and limiter.stats.queued == 1
+        with pytest.raises(ServerBusyError, match="Too many"):
+            await hold(0)
+        with pytest.raises(ServerBusyError, match="Timed out"):
+            await queued
+        await first
+
+    asyncio.run(scenario())
+    stats = limiter.stats
+    assert (stats.admitted, stats.rejected, stats.timed_out, stats.max_queued) == (1, 1, 1, 1)
+    assert stats.in_flight == 0 and stats.queued == 0
+
+
+def test_rate_limit_applies_to_remote_transports_only(monkeypatch):
+    now = 100.0
+    monkeypatch.setattr(server_limits.time, "monotonic", lambda: now)
+    bucket = TokenBucket(rate=10, burst=2)
+    # 2 from the burst, then one every 0.1 seconds
+    assert [round(bucket.reserve(), 3) for _ in range(4)] == [0.0, 0.0, 0.1, 0.2]
+    now += 0.5
+    assert bucket.reserve() == 0.0
+
+    limits = {"rate": 10, "burst": 2}
+    assert ServerLimiter(limits, remote=True).bucket is not None
+    assert ServerLimiter(limits, remote=False).bucket is None
+
+
+def test_apply_limits_concurrent_tool_calls(stub_server_config):
+    config = {**stub_server_config, "limits": {"max_concurrent": 1}}
+    tool_calls = [
+        {"name": "sleep", "args": {"seconds": 0.3}, "id": f"call_{i}", "type": "tool_call"}
+        for i in range(3)
+    ]
+
+    async def scenario():
+        await mcp.get_tools("stub", config)
+        messages = await mcp.run_tool_calls("stub", config, tool_calls)
+        stats = mcp.get_server_limits().describe()["stub"]
+        await mcp.get_session_pool().close()
+        return messages, stats
+
+    messages, stats = asyncio.run(scenario())
+    assert all(not message.content.startswith("Error") for message in messages)
+    # the three calls ran one at a time: two of them waited for the first
+    assert stats["max_queued"] == 2 and stats["in_flight"] == 0 and stats["rejected"] == 0
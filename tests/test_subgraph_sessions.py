@@ -0,0 +1,114 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from langgraph_mcp.mcp_react_graph import to_connection
+from langgraph_mcp.planner_style import graph as planner_style
+from langgraph_mcp.planner_style.state import PlannerResult, State, Task
+from langgraph_mcp.subgraph_sessions import SubgraphSessionManager, SubgraphSessionsBusyError
+
+
+def _counting_factory(events: list):
+    @asynccontextmanager
+    async def factory(model, expert, expert_config):
+        agent = object()
+        events.append(("open", expert))
+        try:
+            yield agent
+        finally:
+            events.append(("close", expert))
+    return factory
+
+
+def test_lease_reuses_session_per_thread():
+    events: list = []
+
+    async def scenario():
+        manager = SubgraphSessionManager(_counting_factory(events))
+        async with manager.lease("t1", "m", "playwright", {"command": "npx"}) as first:
+            pass
+        async with manager.lease("t1", "m", "playwright", {"command": "npx"}) as second:
+            pass
+        async with manager.lease("t2", "m", "playwright", {"command": "npx"}) as other:
+            pass
+        await manager.close()
+        return first, second, other
+
+    first, second, other = asyncio.run(scenario())
+    assert first is second and other is not first
+    assert events.count(("open", "playwright")) == 2
+    assert events.count(("close", "playwright")) == 2
+
+
+def test_cap_evicts_least_recently_used_idle_session():
+    events: list = []
+
+    async def scenario():
+        manager = SubgraphSessionManager(_counting_factory(events), max_sessions=1)
+        async with manager.lease("t1", "m", "a", {}):
+            pass
+        async with manager.lease("t2", "m", "b", {}):
+            pass
+        described = manager.describe()
+        await manager.close()
+        return described
+
+    described = asyncio.run(scenario())
+    assert described["open"] == 1
+    assert events == [("open", "a"), ("close", "a"), ("open", "b"), ("close", "b")]
+
+
+def test_idle_sessions_are_reaped():
+    events: list = []
+
+    async def scenario():
+        manager = SubgraphSessionManager(_counting_factory(events))
+        async with manager.lease("t1", "m", "a", {"pool": {"idle_timeout": 0}}):
+            pass
+        await asyncio.sleep(0.01)
+        reaped = await manager.reap_idle()
+        await manager.close()
+        return reaped
+
+    assert asyncio.run(scenario()) == 1
+    assert events == [("open", "a"), ("close", "a")]
+
+
+def test_waiting_for_a_session_times_out():
+    events: list = []
+
+    async def scenario():
+        manager = SubgraphSessionManager(_counting_factory(events), max_sessions=1, queue_timeout=0.05)
+        async with manager.lease("t1", "m", "a", {}):
+            with pytest.raises(SubgraphSessionsBusyError, match="too many concurrent browser sessions"):
+                await manager.lease("t2", "m", "a", {}).__aenter__()
+            with pytest.raises(SubgraphSessionsBusyError, match="in use"):
+                await manager.lease("t1", "m", "a", {}).__aenter__()
+        described = manager.describe()
+        await manager.close()
+        return described
+
+    assert asyncio.run(scenario()) == {"open": 1, "in_use": 0, "max_sessions": 1}
+    assert events == [("open", "a"), ("close", "a")]
+
+
+def test_busy_subgraph_sessions_are_reported_to_the_planner(monkeypatch):
+    async def busy(*args):
+        raise SubgraphSessionsBusyError("Timed out waiting for a subgraph session: too many concurrent browser sessions")
+
+    monkeypatch.setattr(planner_style, "run_subgraph", busy)
+    plan = PlannerResult(decision="replace", plan=[Task(expert="playwright", task="Open a page")], next_task=0)
+    state = State(messages=[HumanMessage(content="open it")], planner_result=plan)
+    config = {"configurable": {"mcp_server_config": {"playwright": {"command": "npx"}}}}
+
+    result = asyncio.run(planner_style.execute_subgraph_task(state, config=config))
+    assert "task_completed" not in result
+    assert "The expert playwright is unavailable" in result["messages"][0].content
+    assert planner_style.decide_execute_task_edge(State(messages=result["messages"], planner_result=plan)) == "planner"
+
+
+def test_to_connection_keeps_connection_keys_and_infers_transport():
+    connection = to_connection({"command": "npx", "args": ["@playwright/mcp"], "description": "browser", "pool": {}})
+    assert connection == {"command": "npx", "args": ["@playwright/mcp"], "transport": "stdio"}
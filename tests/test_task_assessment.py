@@ -0,0 +1,35 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from langgraph_mcp.with_planner.assessment import assess_by_rules
+
+TAG = "[::TASK_COMPLETE::]"
+
+
+def _step(*results):
+    calls = [{"name": name, "args": {}, "id": f"c{i}"} for i, (name, _) in enumerate(results)]
+    return [
+        HumanMessage(content="send the report"),
+        AIMessage(content="", tool_calls=calls),
+        *[ToolMessage(content=content, name=name, tool_call_id=f"c{i}") for i, (name, content) in enumerate(results)],
+    ]
+
+
+def test_all_failed_tool_calls_mean_not_complete():
+    messages = _step(("send_mail", "Error: invalid recipient"), ("lookup", "Error: timeout"))
+    assert assess_by_rules(messages, {}, TAG) is False
+
+
+def test_completing_tool_success_means_complete():
+    config = {"assessment": {"completing_tools": ["send_mail"]}}
+    messages = _step(("lookup", "Error: timeout"), ("send_mail", '{"status": "sent"}'))
+    assert assess_by_rules(messages, config, TAG) is True
+
+
+def test_uncertain_outcomes_escalate():
+    messages = _step(("lookup", '{"rows": 3}'))
+    assert assess_by_rules(messages, {}, TAG) is None
+    assert assess_by_rules([AIMessage(content="[::IDK::] no tool applies")], {}, TAG) is None
+
+
+def test_task_complete_tag_means_complete():
+    assert assess_by_rules([AIMessage(content=f"{TAG} The report was sent.")], None, TAG) is True
@@ -0,0 +1,83 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from langgraph_mcp import mcp_wrapper as mcp
+from langgraph_mcp.planner_style import graph as planner_style
+from langgraph_mcp.planner_style.state import PlannerResult, State, Task
+from langgraph_mcp.tool_prefetch import get_prefetch_stats, planned_experts
+from langgraph_mcp.utils import register_chat_model_provider
+
+PLAN_ARGS = json.dumps({"decision": "replace", "plan": [{"expert": "stub", "task": "Echo hello"}], "next_task": 0})
+
+
+def test_planned_experts_waits_for_complete_names():
+    assert planned_experts('{"decision": "replace", "plan": [{"expert": "sql') == []
+    assert planned_experts('{"decision": "replace", "plan": [{"expert": "sqlite", "task": "Cou') == ["sqlite"]
+    assert planned_experts('not json') == []
+
+
+class StreamingPlanner(BaseChatModel):
+    """Streams PLAN_ARGS as tool call chunks, slowly, and records whether the prefetch started meanwhile."""
+
+    prefetching_before_end: list = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "streaming-planner"
+
+    def bind_tools(self, tools, *, tool_choice=None, **kwargs):
+        return self.bind(**kwargs)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message = AIMessage(content="", tool_calls=[{"name": "PlannerResult", "args": json.loads(PLAN_ARGS), "id": "call_1"}])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        pieces = [PLAN_ARGS[i:i + 16] for i in range(0, len(PLAN_ARGS), 16)]
+        for i, piece in enumerate(pieces):
+            await asyncio.sleep(0.05)
+            chunk = {"name": "PlannerResult" if i == 0 else None, "args": piece, "id": "call_1" if i == 0 else None, "index": 0}
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[chunk]))
+        self.prefetching_before_end.append(
+            any(task.get_name() == "tool-prefetch:stub" for task in asyncio.all_tasks())
+        )
+
+
+def test_planner_prefetches_the_planned_expert_and_cancels_wrong_guesses(stub_server_config, hanging_server_config):
+    planner_model = StreamingPlanner()
+    register_chat_model_provider("prefetch-test", lambda model, **kwargs: planner_model)
+    config = {"configurable": {
+        "mcp_server_config": {"stub": stub_server_config, "hanging": hanging_server_config},
+        "planner_model": "prefetch-test/planner",
+        "speculative_tool_prefetch": True,
+    }}
+    # the previous plan's current task is assigned to the hanging expert, so it gets guessed first
+    previous = PlannerResult(decision="replace", plan=[Task(expert="hanging", task="Wait")], next_task=0)
+    state = State(messages=[HumanMessage(content="echo hello")], planner_result=previous)
+    before = get_prefetch_stats()
+
+    async def scenario():
+        mcp.get_tool_catalog().invalidate("stub")  # cached by other tests
+        result = await planner_style.planner(state, config=config)
+        # execute_task joins the prefetch of the chosen expert
+        tools = await mcp.get_tools("stub", stub_server_config)
+        await asyncio.sleep(0.1)
+        sessions = mcp.get_session_pool().describe()["servers"]
+        await mcp.get_session_pool().close()
+        return result, tools, sessions
+
+    result, tools, sessions = asyncio.run(scenario())
+    after = get_prefetch_stats()
+    assert result["planner_result"].plan[0].expert == "stub"
+    assert planner_model.prefetching_before_end == [True]
+    assert "echo" in [tool["function"]["name"] for tool in tools]
+    assert after["started"] - before["started"] == 2
+    assert after["used"] - before["used"] == 1
+    assert after["cancelled"] - before["cancelled"] == 1
+    # the wrong guess was cancelled before its session opened
+    assert sessions.get("hanging", {"open": 0})["open"] == 0
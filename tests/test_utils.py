@@ -0,0 +1,95 @@
+import asyncio
+
+from langgraph_mcp.utils import aclose_http_clients, clear_model_cache, get_model_cache_stats, load_chat_model, register_chat_model_provider
+
+
+def test_load_chat_model_memoizes_clients():
+    clear_model_cache()
+    first = load_chat_model("lm-studio/qwen")
+    second = load_chat_model("lm-studio/qwen")
+    other = load_chat_model("lm-studio/qwen", temperature=0.0)
+
+    assert first is second
+    assert other is not first
+    stats = get_model_cache_stats()
+    assert stats["hits"] >= 1
+    assert stats["models"].count("lm-studio/qwen") == 2
+
+
+def test_models_on_the_same_base_url_share_http_clients():
+    first = load_chat_model("lm-studio/qwen")
+    second = load_chat_model("lm-studio/llama")
+
+    assert first.http_client is second.http_client
+    assert "http://localhost:1234/v1" in get_model_cache_stats()["http_pools"]
+
+
+def test_async_http_clients_are_shared_per_event_loop():
+    async def load():
+        first = load_chat_model("lm-studio/qwen")
+        second = load_chat_model("lm-studio/llama")
+        assert first.http_async_client is second.http_async_client
+        client = first.http_async_client
+        await aclose_http_clients()
+        return first, client
+
+    first, client = asyncio.run(load())
+    other, other_client = asyncio.run(load())
+    assert other is not first and other_client is not client
+    assert client.is_closed
+    assert first.http_client is other.http_client
+
+
+def test_registered_provider_builds_models():
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+    built = []
+
+    def factory(model, **kwargs):
+        built.append(model)
+        return FakeListChatModel(responses=[model])
+
+    register_chat_model_provider("scripted", factory)
+    model = load_chat_model("scripted/planner")
+
+    assert load_chat_model("scripted/planner") is model
+    assert built == ["planner"]
+    assert model.invoke("hi").content == "planner"
+    register_chat_model_provider("scripted", factory)  # re-registering drops the memoized models
+    assert load_chat_model("scripted/planner") is not model
+
+
+def test_stream_model_response_reports_leading_tag_early():
+    import asyncio
+    from typing import TypedDict
+
+    from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+    from langchain_core.messages import AIMessage
+    from langgraph.graph import START, StateGraph
+
+    from langgraph_mcp.utils import stream_model_response
+
+    class S(TypedDict):
+        text: str
+
+    model = GenericFakeChatModel(messages=iter([AIMessage(content="[TASK_COMPLETE] The profile was fetched.")]))
+
+    async def node(state: S, config) -> S:
+        response = await stream_model_response(model, "go", config, tags=["[ASK_USER]", "[TASK_COMPLETE]"])
+        return {"text": response.content}
+
+    builder = StateGraph(S)
+    builder.add_node("node", node)
+    builder.add_edge(START, "node")
+    graph = builder.compile()
+
+    async def scenario():
+        return [chunk async for chunk in graph.astream({"text": ""}, stream_mode=["custom", "messages", "values"])]
+
+    chunks = asyncio.run(scenario())
+    modes = [mode for mode, _ in chunks]
+    custom = [data for mode, data in chunks if mode == "custom"]
+    assert custom == [{"node": "node", "tag": "[TASK_COMPLETE]"}]
+    # the tag is reported before the message finished streaming
+    assert modes.index("custom") < len(modes) - 1 - modes[::-1].index("messages")
+    assert chunks[-1] == ("values", {"text": "[TASK_COMPLETE] The profile was fetched."})
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import sys
+
+from starlette.testclient import TestClient
+
+from langgraph_mcp import mcp_wrapper as mcp
+from langgraph_mcp.warm_start import WarmStart, get_readiness, load_mcp_server_config, start_warm_start
+
+
+def test_warm_start_opens_sessions_and_prefetches_catalogs(tmp_path, monkeypatch, stub_server_config):
+    monkeypatch.setenv("LANGGRAPH_MCP_INDEX_DIR", str(tmp_path))
+    config = {
+        "stub": stub_server_config,
+        "broken": {"transport": "stdio", "command": sys.executable, "args": ["-c", "raise SystemExit(1)"]},
+        "cold": {**stub_server_config, "warm_start": False},
+    }
+
+    async def scenario():
+        warm_start = WarmStart(config, timeout=10)
+        assert warm_start.readiness()["ready"] is False
+        warm_start.start()
+        assert await warm_start.wait(timeout=30)
+        readiness = warm_start.readiness()
+        pool = mcp.get_session_pool()
+        opened = pool.stats.opened
+        # the first turn finds the session open and the catalog cached
+        await mcp.get_tools("stub", stub_server_config)
+        await mcp.apply("stub", stub_server_config, mcp.RunTool("echo", text="hi"))
+        reopened = pool.stats.opened - opened
+        await pool.close()
+        return readiness, reopened
+
+    readiness, reopened = asyncio.run(scenario())
+    servers = readiness["servers"]
+    assert readiness["ready"] is True and readiness["healthy"] is False
+    assert servers["stub"]["state"] == "ready" and servers["stub"]["tools"] >= 4
+    assert servers["broken"]["state"] == "failed" and servers["broken"]["error"]
+    assert servers["cold"]["state"] == "skipped"
+    assert reopened == 0
+
+
+def test_warmed_sessions_outlive_the_idle_timeout(tmp_path, monkeypatch, stub_server_config):
+    monkeypatch.setenv("LANGGRAPH_MCP_INDEX_DIR", str(tmp_path))
+    config = {**stub_server_config, "pool": {"idle_timeout": 0}}
+
+    async def scenario():
+        warm_start = WarmStart({"stub": config}, timeout=10)
+        await warm_start.warm()
+        pool = mcp.get_session_pool()
+        evicted = await pool.evict_idle()
+        warm = warm_start.readiness()
+        await pool.close()  # e.g. the server process died
+        closed = warm_start.readiness()
+        return evicted, warm, closed
+
+    evicted, warm, closed = asyncio.run(scenario())
+    assert evicted == 0
+    assert warm["healthy"] is True and warm["servers"]["stub"]["state"] == "ready"
+    assert closed["ready"] is True and closed["healthy"] is False
+    assert closed["servers"]["stub"]["state"] == "evicted"
+
+
+def test_load_mcp_server_config_accepts_assistant_configs(tmp_path, stub_server_config):
+    path = tmp_path / "assistant.json"
+    path.write_text(json.dumps({"configurable": {"mcp_server_config": {"stub": stub_server_config}}}))
+    assert load_mcp_server_config(path) == {"stub": stub_server_config}
+    path.write_text(json.dumps({"stub": stub_server_config}))
+    assert load_mcp_server_config(path) == {"stub": stub_server_config}
+
+
+def test_ready_route_reports_warm_up(tmp_path, monkeypatch, stub_server_config):
+    from langgraph_mcp.http_app import app
+
+    path = tmp_path / "servers.json"
+    path.write_text(json.dumps({"stub": stub_server_config}))
+    monkeypatch.setenv("LANGGRAPH_MCP_WARM_START", str(path))
+    monkeypatch.setenv("LANGGRAPH_MCP_INDEX_DIR", str(tmp_path))
+
+    async def wait_for_warm_up():
+        await start_warm_start().wait(timeout=30)
+
+    with TestClient(app) as client:
+        first = client.get("/ready")
+        assert first.status_code in (200, 503)
+        client.portal.call(wait_for_warm_up)
+        response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["servers"]["stub"]["state"] == "ready"
+
+
+def test_ready_without_warm_start():
+    async def scenario():
+        return get_readiness()
+
+    assert asyncio.run(scenario()) == {"ready": True, "healthy": True, "servers": {}}